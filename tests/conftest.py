@@ -0,0 +1,109 @@
+"""
+测试公共 Fixtures
+
+提供本地替身HTTP服务器，用于在无网络环境下测试各类API客户端；
+以及构造有效API条目的工厂
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, urlsplit, parse_qs
+
+import pytest
+
+
+class StandinRequest:
+    """替身服务器收到的请求"""
+    def __init__(self, method: str, path: str, headers: dict, body: bytes):
+        parts = urlsplit(path)
+        self.method = method
+        self.path = parts.path
+        self.query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        self.headers = headers
+        self.body = body
+
+
+class StandinServer:
+    """
+    本地替身HTTP服务器
+
+    handler 接收 StandinRequest，返回 (状态码, 响应头字典, 响应体bytes)
+    """
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+        self._lock = threading.Lock()
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def _handle(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                request = StandinRequest(self.command, self.path,
+                                         dict(self.headers.items()), body)
+                with server._lock:
+                    server.requests.append(request)
+                status, headers, payload = server.handler(request)
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                if self.command != 'HEAD':
+                    self.wfile.write(payload)
+
+            do_GET = do_POST = do_HEAD = _handle
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever,
+                                        kwargs={"poll_interval": 0.05}, daemon=True)
+        self._thread.start()
+
+    @property
+    def request_count(self) -> int:
+        with self._lock:
+            return len(self.requests)
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def standin_server():
+    """返回启动替身服务器的工厂函数，测试结束后自动关闭"""
+    servers = []
+
+    def start(handler):
+        server = StandinServer(handler)
+        servers.append(server)
+        return server
+
+    yield start
+
+    for server in servers:
+        server.close()
+
+
+@pytest.fixture(scope="session")
+def api_entry():
+    """
+    返回构造有效API条目的工厂函数
+
+    api_entry("名称", auth="apiKey", comment="...")，关键字参数覆盖或补充默认字段；
+    默认 URL 随名称不同，按名称+URL 识别条目的测试因此不会意外重合
+    """
+    def make(name, **fields):
+        entry = {"name": name, "description": "测试服务", "auth": None, "https": True,
+                 "cors": "yes", "category": "Mapping Services",
+                 "url": f"https://example.com/{quote(name)}"}
+        entry.update(fields)
+        return entry
+
+    return make
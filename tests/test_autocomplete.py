@@ -0,0 +1,69 @@
+"""
+自动补全测试用例
+
+测试 autocomplete.py 中的前缀补全、热度排序与预计算结果
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.autocomplete import Autocompleter, normalize_key
+from utils.search_apis import load_all_apis
+
+REPO_API_DIR = Path(__file__).parent.parent / "api"
+
+
+class TestAutocompleter:
+    """前缀补全测试"""
+
+    def test_names_categories_and_tokens(self, api_entry):
+        completer = Autocompleter([api_entry("高德地图 JS API"), api_entry("Mapbox"),
+                                   api_entry("OpenWeatherMap", category="Weather APIs")])
+        assert completer.complete("map") == ["Mapbox", "Mapping Services"]
+        assert completer.complete("js") == ["高德地图 JS API"]
+        assert completer.complete("wea") == ["Weather APIs"]
+        assert completer.complete("zzz") == []
+
+    def test_chinese_prefix(self):
+        completer = Autocompleter(load_all_apis(REPO_API_DIR))
+        assert "高德地图POI API" in completer.complete("高德")
+        assert completer.complete("彩云") == ["彩云天气API"]
+
+    def test_case_and_width_insensitive(self, api_entry):
+        completer = Autocompleter([api_entry("Stadia Maps")])
+        assert completer.complete("ＳＴＡ") == ["Stadia Maps"]
+
+    def test_kinds(self, api_entry):
+        completer = Autocompleter([api_entry("Mapbox")])
+        assert completer.complete_with_kind("ma") == [("Mapbox", "name"),
+                                                      ("Mapping Services", "category")]
+
+    def test_popularity_ranking(self, api_entry):
+        apis = [api_entry(name, category="Other") for name in ("Map A", "Map B", "Map C")]
+        completer = Autocompleter(apis, popularity={"Map C": 10, "Map A": 5})
+        assert completer.complete("map", k=3) == ["Map C", "Map A", "Map B"]
+
+    def test_precomputed_top_k_matches_scan(self, api_entry):
+        random.seed(7)
+        words = ["map", "maps", "geo", "天气", "tile", "route"]
+        apis = [api_entry(f"{random.choice(words)} {random.choice(words)} {i}")
+                for i in range(3000)]
+        popularity = {api["name"]: random.random() for api in apis}
+        completer = Autocompleter(apis, popularity=popularity, k=5, scan_threshold=16)
+        assert completer._top
+        for prefix in ["m", "map", "maps g", "天", "geo tile", "route 1"]:
+            lo, hi = completer._range(normalize_key(prefix))
+            expected = [completer.suggestions[r] for r in completer._select(lo, hi, 5)]
+            assert completer.complete_with_kind(prefix) == expected
+
+    def test_keystroke_budget(self, api_entry):
+        apis = [api_entry(f"provider {i:06d} maps") for i in range(50000)]
+        completer = Autocompleter(apis)
+        start = time.perf_counter()
+        for prefix in ["p", "pro", "provider 0", "provider 04", "maps"] * 200:
+            completer.complete(prefix)
+        assert (time.perf_counter() - start) / 1000 < 0.001
@@ -0,0 +1,135 @@
+"""
+批量地理编码测试用例
+
+测试 batch_geocode.py 中的地址规范化、缓存、限速与断点续跑逻辑
+"""
+
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.batch_geocode import (
+    normalize_address,
+    GeocodeCache,
+    Geocoder,
+    GeocodeError,
+    run_batch,
+)
+
+
+@pytest.fixture
+def geocoder_server(standin_server):
+    """本地替身地理编码服务（Nominatim 响应格式）"""
+    def handler(req):
+        query = req.query.get("q", "")
+        if query == "nowhere":
+            return 200, {}, b"[]"
+        if query == "boom":
+            return 500, {}, b""
+        body = [{"lat": "39.9", "lon": "116.4", "display_name": query}]
+        return 200, {}, json.dumps(body).encode()
+    return standin_server(handler)
+
+
+def _geocoder(server, tmp_path, rate=1000.0, concurrency=4):
+    cache = GeocodeCache(tmp_path / "cache.sqlite")
+    return Geocoder("OpenStreetMap Nominatim", cache, url=server.url + "/search?q={query}",
+                    rate=rate, concurrency=concurrency)
+
+
+def _read_output(path):
+    return [json.loads(line) for line in Path(path).read_text(encoding='utf-8').splitlines()]
+
+
+class TestNormalizeAddress:
+    """地址规范化测试"""
+
+    def test_case_and_whitespace(self):
+        assert normalize_address("  10 Downing St ,  London ") == "10 downing st,london"
+
+    def test_fullwidth_characters(self):
+        assert normalize_address("北京市，东城区。") == normalize_address("北京市,东城区")
+
+
+class TestRunBatch:
+    """批量流程测试"""
+
+    def test_duplicates_hit_upstream_once(self, geocoder_server, tmp_path):
+        geocoder = _geocoder(geocoder_server, tmp_path)
+        lines = ["Berlin\n", "berlin \n", "BERLIN\n", "Paris\n", "nowhere\n"]
+        stats = run_batch(lines, tmp_path / "out.jsonl", geocoder)
+
+        records = _read_output(tmp_path / "out.jsonl")
+        assert [r["line"] for r in records] == [1, 2, 3, 4, 5]
+        assert records[1]["address"] == "berlin "
+        assert records[0]["result"]["lat"] == 39.9
+        assert records[4]["result"] is None
+        assert geocoder_server.request_count == 3
+        assert stats["processed"] == 5
+
+    def test_blank_lines_not_sent(self, geocoder_server, tmp_path):
+        lines = ["Berlin\n", "\n", "  \t\n", " , \n", "Paris\n", "\n"]
+        stats = run_batch(lines, tmp_path / "out.jsonl", _geocoder(geocoder_server, tmp_path))
+        records = _read_output(tmp_path / "out.jsonl")
+        assert [r["line"] for r in records] == [1, 2, 3, 4, 5, 6]
+        assert [r["result"] is None for r in records] == [False, True, True, True, False, True]
+        assert not any("error" in r for r in records)
+        assert geocoder_server.request_count == 2
+        assert stats["skipped"] == 4
+
+    def test_persistent_cache_across_runs(self, geocoder_server, tmp_path):
+        run_batch(["Rome\n"], tmp_path / "a.jsonl", _geocoder(geocoder_server, tmp_path))
+        geocoder = _geocoder(geocoder_server, tmp_path)
+        stats = run_batch(["rome\n"], tmp_path / "b.jsonl", geocoder)
+        assert stats["cache_hits"] == 1
+        assert geocoder_server.request_count == 1
+
+    def test_resume_skips_completed_lines(self, geocoder_server, tmp_path):
+        output = tmp_path / "out.jsonl"
+        first = {"line": 1, "address": "a", "result": None}
+        output.write_text(json.dumps(first) + "\n" + '{"line": 2, "addr', encoding='utf-8')
+
+        stats = run_batch(io.StringIO("a\nb\nc\n"), output, _geocoder(geocoder_server, tmp_path))
+        records = _read_output(output)
+        assert [r["line"] for r in records] == [1, 2, 3]
+        assert stats["resumed"] == 1
+        assert [r.query["q"] for r in geocoder_server.requests] in (["b", "c"], ["c", "b"])
+
+    def test_resume_retries_failed_lines(self, geocoder_server, tmp_path):
+        """失败的行不算完成，重新运行时会重试"""
+        output = tmp_path / "out.jsonl"
+        geocoder = _geocoder(geocoder_server, tmp_path)
+        run_batch(["Oslo\n", "boom\n", "Lima\n"], output, geocoder)
+        assert [("error" in r) for r in _read_output(output)] == [False, True, False]
+
+        stats = run_batch(["Oslo\n", "retry\n", "Lima\n"], output, geocoder)
+        records = _read_output(output)
+        assert stats["resumed"] == 2
+        assert stats["errors"] == 0
+        assert sorted(r["line"] for r in records) == [1, 2, 3]
+        assert not any("error" in r for r in records)
+        assert records[-1]["address"] == "retry"
+
+    def test_errors_recorded_not_cached(self, geocoder_server, tmp_path):
+        geocoder = _geocoder(geocoder_server, tmp_path)
+        stats = run_batch(["boom\n"], tmp_path / "out.jsonl", geocoder)
+        assert stats["errors"] == 1
+        assert "error" in _read_output(tmp_path / "out.jsonl")[0]
+        assert geocoder.cache.get("OpenStreetMap Nominatim", "boom") == (False, None)
+
+    def test_rate_limit(self, geocoder_server, tmp_path):
+        geocoder = _geocoder(geocoder_server, tmp_path, rate=20.0, concurrency=4)
+        geocoder.bucket.try_acquire(geocoder.bucket.capacity)
+        start = time.monotonic()
+        run_batch([f"city {i}\n" for i in range(4)], tmp_path / "out.jsonl", geocoder)
+        assert time.monotonic() - start >= 0.15
+
+    def test_unknown_provider(self, tmp_path):
+        with pytest.raises(GeocodeError):
+            Geocoder("Unknown", GeocodeCache(tmp_path / "c.sqlite"))
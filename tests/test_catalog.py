@@ -0,0 +1,140 @@
+"""
+API 目录库测试用例
+
+测试 catalog.py 中的不可变快照、查询构建器与原子重新加载
+"""
+
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.catalog import Catalog, CatalogSnapshot, freeze
+
+REPO_API_DIR = Path(__file__).parent.parent / "api"
+
+
+@pytest.fixture
+def api_dir(tmp_path, api_entry):
+    root = tmp_path / "api"
+    (root / "weather").mkdir(parents=True)
+    (root / "poi").mkdir()
+    (root / "weather" / "weather_apis.json").write_text(json.dumps([
+        api_entry("Sunny", category="Weather APIs", auth="apiKey", description="天气预报服务"),
+        api_entry("Rainy", category="Weather APIs"),
+        api_entry("Cloudy", category="Weather APIs", auth="apiKey"),
+    ], ensure_ascii=False), encoding='utf-8')
+    (root / "poi" / "poi_apis.json").write_text(json.dumps([
+        api_entry("Places", category="POI Queries", description="weather-aware places"),
+    ]), encoding='utf-8')
+    return root
+
+
+class TestSnapshot:
+    """不可变快照测试"""
+
+    def test_entries_are_read_only(self, api_dir):
+        snapshot = Catalog(api_dir).snapshot
+        with pytest.raises(TypeError):
+            snapshot.entries[0]['name'] = "changed"
+        with pytest.raises(AttributeError):
+            snapshot.version = 99
+
+    def test_freeze_nested(self):
+        frozen = freeze({"a": [1, {"b": 2}]})
+        assert frozen["a"][1]["b"] == 2
+        assert isinstance(frozen["a"], tuple)
+
+    def test_real_catalog_loads(self):
+        catalog = Catalog(REPO_API_DIR)
+        assert len(catalog) > 0
+        assert "Weather APIs" in catalog.snapshot.categories
+
+    def test_text_query_uses_pinyin_index(self):
+        names = [api['name'] for api in Catalog(REPO_API_DIR).query().text("caiyun")]
+        assert names == ["彩云天气API"]
+
+
+class TestQuery:
+    """查询构建器测试"""
+
+    def test_text_matches_name_description_category(self, api_dir):
+        catalog = Catalog(api_dir)
+        names = [api['name'] for api in catalog.query().text("WEATHER").run()]
+        assert names == ["Places", "Sunny", "Rainy", "Cloudy"]
+
+    def test_category_and_facets_compose(self, api_dir):
+        catalog = Catalog(api_dir)
+        base = catalog.query().category("weather")
+        assert base.count() == 3
+        assert [api['name'] for api in base.where(auth="apiKey")] == ["Sunny", "Cloudy"]
+        assert base.count() == 3  # 基础查询不受影响
+
+    def test_limit_offset(self, api_dir):
+        query = Catalog(api_dir).query().category("weather")
+        assert [api['name'] for api in query.offset(1).limit(1).run()] == ["Rainy"]
+        assert query.offset(5).run() == ()
+
+    def test_facet_counts(self, api_dir):
+        counts = Catalog(api_dir).query().category("weather").facet_counts("auth")
+        assert counts == {"apiKey": 2, None: 1}
+
+    def test_chinese_text(self, api_dir):
+        assert [api['name'] for api in Catalog(api_dir).query().text("天气")] == ["Sunny"]
+
+    def test_explicit_empty_snapshot(self, api_dir):
+        """显式传入的空快照不会被当作未指定"""
+        query = Catalog(api_dir).query()
+        empty = Catalog(api_dir, autoload=False).snapshot
+        assert query.run(empty) == ()
+        assert query.count(empty) == 0
+        assert query.facet_counts("auth", empty) == {}
+
+
+class TestReload:
+    """重新加载测试"""
+
+    def test_reload_swaps_snapshot_atomically(self, api_dir, api_entry):
+        catalog = Catalog(api_dir)
+        old = catalog.snapshot
+        (api_dir / "poi" / "poi_apis.json").write_text(json.dumps([
+            api_entry("Places", category="POI Queries"),
+            api_entry("Shops", category="POI Queries"),
+        ]), encoding='utf-8')
+
+        new = catalog.reload()
+        assert catalog.snapshot is new
+        assert new.version == old.version + 1
+        assert len(old) == 4 and len(new) == 5
+        assert catalog.query().category("poi").run(old)[0]['name'] == "Places"
+
+    def test_concurrent_readers_during_reload(self, api_dir):
+        catalog = Catalog(api_dir)
+        errors = []
+        stop = threading.Event()
+
+        def reader():
+            while not stop.is_set():
+                snapshot = catalog.snapshot
+                if len(catalog.query().run(snapshot)) != len(snapshot):
+                    errors.append(snapshot.version)
+
+        threads = [threading.Thread(target=reader) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for _ in range(20):
+            catalog.reload()
+        stop.set()
+        for t in threads:
+            t.join()
+        assert errors == []
+        assert catalog.version == 21
+
+    def test_empty_without_autoload(self, api_dir):
+        catalog = Catalog(api_dir, autoload=False)
+        assert len(catalog) == 0
+        assert isinstance(catalog.snapshot, CatalogSnapshot)
@@ -0,0 +1,105 @@
+"""
+目录差异测试用例
+
+测试 catalog_diff.py 中的条目标识、差异计算、变更流与 git 版本读取
+"""
+
+import io
+import json
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.catalog_diff import (
+    entry_key,
+    content_hash,
+    diff_catalogs,
+    apply_changes,
+    write_change_stream,
+    read_change_stream,
+    load_catalog_at_revision,
+)
+from utils.catalog import Catalog
+
+
+class TestIdentity:
+    """条目标识测试"""
+
+    def test_key_normalization(self, api_entry):
+        a = api_entry("Open  Weather", url="https://API.Example.com/docs/")
+        b = api_entry("open weather", url="http://api.example.com/docs")
+        assert entry_key(a) == entry_key(b)
+
+    def test_hash_ignores_field_order_and_source_file(self, api_entry):
+        a = api_entry("A")
+        b = dict(reversed(list(a.items())), source_file="api/x.json")
+        assert content_hash(a) == content_hash(b)
+        assert content_hash(a) != content_hash(api_entry("A", comment="new"))
+
+
+class TestDiff:
+    """差异计算测试"""
+
+    def test_add_remove_modify(self, api_entry):
+        old = [api_entry("A"), api_entry("B"), api_entry("C")]
+        new = [api_entry("A"), api_entry("B", cors="no"), api_entry("D")]
+        changes = diff_catalogs(old, new)
+        assert [(c["op"], c["key"].split("|")[0]) for c in changes] == [
+            ("modify", "b"), ("add", "d"), ("remove", "c")]
+        assert changes[0]["fields"] == ["cors"]
+
+    def test_identical_catalogs(self, api_entry):
+        assert diff_catalogs([api_entry("A")], [api_entry("A", source_file="moved.json")]) == []
+
+    def test_apply_reproduces_new_state(self, api_entry):
+        old = [api_entry("A"), api_entry("B"), api_entry("C")]
+        new = [api_entry("A", comment="x"), api_entry("C"), api_entry("E")]
+        state = {entry_key(e): e for e in old}
+        buffer = io.StringIO()
+        write_change_stream(diff_catalogs(old, new), buffer)
+        buffer.seek(0)
+        apply_changes(state, read_change_stream(buffer))
+        assert state == {entry_key(e): e for e in new}
+
+    def test_works_with_catalog_snapshots(self, tmp_path, api_entry):
+        api_dir = tmp_path / "api"
+        api_dir.mkdir()
+        path = api_dir / "a.json"
+        path.write_text(json.dumps([api_entry("A")]), encoding='utf-8')
+        catalog = Catalog(api_dir)
+        old = catalog.snapshot
+        path.write_text(json.dumps([api_entry("A"), api_entry("B")]), encoding='utf-8')
+        changes = diff_catalogs(old.entries, catalog.reload().entries)
+        assert [c["op"] for c in changes] == ["add"]
+        assert "source_file" not in changes[0]["entry"]
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="需要 git")
+class TestGitRevisions:
+    """git 版本读取测试"""
+
+    def test_diff_between_revisions(self, tmp_path, api_entry):
+        def git(*args):
+            subprocess.run(["git", "-C", str(tmp_path), *args], check=True, capture_output=True)
+
+        git("init", "-q")
+        git("config", "user.email", "test@example.com")
+        git("config", "user.name", "test")
+        (tmp_path / "api" / "weather").mkdir(parents=True)
+        path = tmp_path / "api" / "weather" / "weather_apis.json"
+        path.write_text(json.dumps([api_entry("A"), api_entry("B")], ensure_ascii=False),
+                        encoding='utf-8')
+        git("add", ".")
+        git("commit", "-qm", "v1")
+        path.write_text(json.dumps([api_entry("B", auth="apiKey")]), encoding='utf-8')
+        git("commit", "-qam", "v2")
+
+        old = load_catalog_at_revision("HEAD~1", repo=str(tmp_path))
+        new = load_catalog_at_revision("HEAD", repo=str(tmp_path))
+        assert old[0]["source_file"] == "api/weather/weather_apis.json"
+        assert [c["op"] for c in diff_catalogs(old, new)] == ["modify", "remove"]
@@ -0,0 +1,192 @@
+"""
+距离矩阵规划测试用例
+
+测试 distance_matrix.py 中的瓦片规划、结果拼装、重试与缓存逻辑
+"""
+
+import json
+import math
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.distance_matrix import (
+    MATRIX_LIMITS,
+    choose_block,
+    plan_tiles,
+    MatrixEngine,
+    MatrixError,
+    make_ors_fetcher,
+)
+
+
+def _fake_distance(o, d):
+    return abs(o[0] - d[0]) * 1000 + abs(o[1] - d[1])
+
+
+def _fetch_factory(calls, limits=None):
+    def fetch(origins, destinations):
+        if limits:
+            assert len(origins) <= limits["max_origins"]
+            assert len(destinations) <= limits["max_destinations"]
+            assert len(origins) * len(destinations) <= limits["max_elements"]
+        calls.append((len(origins), len(destinations)))
+        return [_fake_distance(o, d) for o in origins for d in destinations]
+    return fetch
+
+
+def _points(n, offset=0):
+    return [(float(i + offset), float(i * 2)) for i in range(n)]
+
+
+LIMITS = {"max_origins": 25, "max_destinations": 25, "max_elements": 100, "rate": 1000}
+
+
+class TestPlanning:
+    """瓦片规划测试"""
+
+    def test_google_block(self):
+        limits = MATRIX_LIMITS["Google Maps Distance Matrix API"]
+        a, b = choose_block(1000, 1000, limits["max_origins"], limits["max_destinations"],
+                            limits["max_elements"])
+        assert a * b == 100
+
+    def test_tiles_cover_matrix_exactly(self):
+        tiles = plan_tiles(37, 53, LIMITS)
+        covered = sum((o1 - o0) * (d1 - d0) for o0, o1, d0, d1 in tiles)
+        assert covered == 37 * 53
+        assert all((o1 - o0) * (d1 - d0) <= 100 for o0, o1, d0, d1 in tiles)
+
+    def test_narrow_matrix_uses_wide_tiles(self):
+        assert choose_block(1, 500, 25, 25, 100) == (1, 25)
+        assert len(plan_tiles(0, 10, LIMITS)) == 0
+
+
+class TestMatrixEngine:
+    """执行引擎测试"""
+
+    def test_assembles_contiguous_result(self):
+        calls = []
+        origins, destinations = _points(30), _points(41, offset=5)
+        engine = MatrixEngine(_fetch_factory(calls, LIMITS), LIMITS)
+        result = engine.compute(origins, destinations)
+
+        assert (result.rows, result.cols) == (30, 41)
+        assert len(result.data) == 30 * 41
+        assert result.data.typecode == 'd'
+        for i in (0, 17, 29):
+            for j in (0, 20, 40):
+                assert result.get(i, j) == _fake_distance(origins[i], destinations[j])
+        assert list(result.row(3)) == result.to_lists()[3]
+
+    def test_duplicate_points_computed_once(self):
+        calls = []
+        origins = [(1.0, 1.0), (2.0, 2.0), (1.0, 1.0)]
+        destinations = [(3.0, 3.0), (3.0, 3.0)]
+        result = MatrixEngine(_fetch_factory(calls), LIMITS).compute(origins, destinations)
+        assert calls == [(2, 1)]
+        assert result.to_lists() == [[2002.0, 2002.0], [1001.0, 1001.0], [2002.0, 2002.0]]
+
+    def test_expand_with_repeated_runs(self):
+        origins = _points(4) + _points(2)
+        destinations = _points(3, offset=5) + _points(3, offset=5)[::-1] + _points(2, offset=5)
+        result = MatrixEngine(_fetch_factory([]), LIMITS).compute(origins, destinations)
+        assert result.to_lists() == [[_fake_distance(o, d) for d in destinations]
+                                     for o in origins]
+
+    def test_repeated_problem_served_from_cache(self):
+        calls = []
+        engine = MatrixEngine(_fetch_factory(calls), LIMITS)
+        engine.compute(_points(20), _points(20))
+        requests = len(calls)
+        engine.compute(_points(20), _points(20))
+        assert len(calls) == requests
+        assert engine.stats["cache_hits"] == 400
+
+    def test_added_point_requests_only_new_pairs(self):
+        calls = []
+        engine = MatrixEngine(_fetch_factory(calls), LIMITS)
+        engine.compute(_points(20), _points(20))
+        calls.clear()
+        origins, destinations = _points(21), _points(20) + [(99.0, 99.0)]
+        result = engine.compute(origins, destinations)
+        assert sum(o * d for o, d in calls) == 20 + 21
+        assert result.to_lists() == [[_fake_distance(o, d) for d in destinations]
+                                     for o in origins]
+
+    def test_overlapping_problem_reuses_pairs(self):
+        calls = []
+        engine = MatrixEngine(_fetch_factory(calls), LIMITS)
+        engine.compute(_points(7), _points(30))
+        calls.clear()
+        result = engine.compute(_points(12), _points(30)[::-1])
+        assert sum(o * d for o, d in calls) == 5 * 30
+        assert result.get(0, 0) == _fake_distance(_points(12)[0], _points(30)[-1])
+
+    def test_cache_is_bounded(self):
+        calls = []
+        engine = MatrixEngine(_fetch_factory(calls), LIMITS, cache_pairs=50)
+        engine.compute(_points(10), _points(10))
+        calls.clear()
+        engine.compute(_points(10), _points(10))
+        assert sum(o * d for o, d in calls) >= 50
+
+    def test_only_failed_tiles_retried(self):
+        calls = []
+        failures = {"left": 2}
+        lock = threading.Lock()
+        inner = _fetch_factory(calls)
+
+        def flaky(origins, destinations):
+            with lock:
+                if origins[0] == (0.0, 0.0) and destinations[0] == (0.0, 0.0) and failures["left"]:
+                    failures["left"] -= 1
+                    raise OSError("transient")
+            return inner(origins, destinations)
+
+        engine = MatrixEngine(flaky, LIMITS, retry_delay=0)
+        result = engine.compute(_points(20), _points(20))
+        assert engine.stats["retries"] == 2
+        assert len(calls) == len(plan_tiles(20, 20, LIMITS))
+        assert not any(math.isnan(v) for v in result.data)
+
+    def test_persistent_failure_raises_with_partial_result(self):
+        def fetch(origins, destinations):
+            if origins[0] == (0.0, 0.0):
+                raise OSError("down")
+            return [1.0] * (len(origins) * len(destinations))
+
+        engine = MatrixEngine(fetch, LIMITS, max_retries=1, retry_delay=0)
+        with pytest.raises(MatrixError) as excinfo:
+            engine.compute(_points(40), _points(5))
+        assert excinfo.value.failed_tiles
+        assert math.isnan(excinfo.value.result.get(0, 0))
+        assert excinfo.value.result.get(39, 0) == 1.0
+
+    def test_none_values_become_nan(self):
+        engine = MatrixEngine(lambda o, d: [None] * (len(o) * len(d)), LIMITS)
+        assert math.isnan(engine.compute(_points(1), _points(1)).get(0, 0))
+
+
+class TestProviderAdapters:
+    """提供商适配测试"""
+
+    def test_ors_fetcher_against_standin(self, standin_server):
+        def handler(req):
+            payload = json.loads(req.body)
+            durations = [[float(s * 10 + d) for d in payload["destinations"]]
+                         for s in payload["sources"]]
+            return 200, {"Content-Type": "application/json"}, json.dumps(
+                {"durations": durations}).encode()
+
+        server = standin_server(handler)
+        fetch = make_ors_fetcher("key", base_url=server.url + "/v2/matrix")
+        engine = MatrixEngine(fetch, {**MATRIX_LIMITS["OpenRouteService"], "rate": 1000})
+        result = engine.compute(_points(2), _points(3, offset=10))
+        assert result.to_lists() == [[2.0, 3.0, 4.0], [12.0, 13.0, 14.0]]
+        assert server.requests[0].headers["Authorization"] == "key"
+        assert server.requests[0].path == "/v2/matrix/driving-car"
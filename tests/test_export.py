@@ -0,0 +1,161 @@
+"""
+批量导出测试用例
+
+测试 export_apis.py 中的增量 JSON 读取、流水线与三种导出格式
+"""
+
+import csv
+import io
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.export_apis import (
+    DEFAULT_FIELDS,
+    iter_json_array,
+    iter_entries,
+    export,
+    write_columnar,
+    read_columnar,
+    benchmark,
+)
+
+
+@pytest.fixture
+def api_dir(tmp_path, api_entry):
+    directory = tmp_path / "api"
+    directory.mkdir()
+    maps = [api_entry("API 1", https=False),
+            api_entry("API 2", auth="apiKey", comment="需要注册")]
+    weather = [api_entry("API 3", https=False, category="Weather APIs"), {"name": "坏条目"}]
+    (directory / "maps.json").write_text(json.dumps(maps, ensure_ascii=False), encoding='utf-8')
+    (directory / "weather.json").write_text(json.dumps(weather, ensure_ascii=False, indent=2),
+                                            encoding='utf-8')
+    return directory
+
+
+class TestIterJsonArray:
+    """增量 JSON 数组读取测试"""
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 7, 1024])
+    def test_matches_json_load(self, chunk_size, api_entry):
+        """任意分块大小都与 json.loads 结果一致"""
+        data = [api_entry(f"API {i}") for i in range(20)] + [12345, "字符串", [1, 2], None]
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+        assert list(iter_json_array(io.StringIO(text), chunk_size)) == data
+
+    def test_empty_array(self):
+        assert list(iter_json_array(io.StringIO("  [ ]  "))) == []
+
+    def test_rejects_non_array(self):
+        with pytest.raises(ValueError):
+            list(iter_json_array(io.StringIO('{"name": "x"}')))
+
+    @pytest.mark.parametrize("text", ['[,{"a": 1}]', '[{"a": 1},,{"a": 2}]', '[{"a": 1},]',
+                                      '[{"a": 1} {"a": 2}]', '[1 2]', '[,]'])
+    def test_rejects_malformed_commas(self, text):
+        for chunk_size in (1, 1024):
+            with pytest.raises(ValueError):
+                list(iter_json_array(io.StringIO(text), chunk_size))
+
+    def test_truncated(self):
+        with pytest.raises(ValueError):
+            list(iter_json_array(io.StringIO('[{"name": "x"}, {"na'), 4))
+
+
+class TestExport:
+    """导出流水线测试"""
+
+    def test_ndjson(self, api_dir):
+        out = io.StringIO()
+        stats = export(iter_entries(str(api_dir)), "ndjson", out)
+        assert stats["rows"] == 3
+        assert stats["invalid"] == 1
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert [r["name"] for r in rows] == ["API 1", "API 2", "API 3"]
+        assert list(rows[0]) == DEFAULT_FIELDS
+        assert rows[1]["comment"] == "需要注册"
+        assert rows[0]["source_file"].endswith("maps.json")
+
+    def test_invalid_entries_counted_with_bounded_messages(self):
+        entries = ({"name": f"Bad {i}"} for i in range(20))
+        stats = export(entries, "ndjson", io.StringIO())
+        assert (stats["rows"], stats["invalid"]) == (0, 20)
+        assert len(stats["errors"]) == 5
+
+    def test_malformed_file_rejected(self, api_dir):
+        (api_dir / "broken.json").write_text('[{"name": "x"},,]', encoding='utf-8')
+        with pytest.raises(ValueError, match="broken.json"):
+            export(iter_entries(str(api_dir)), "ndjson", io.StringIO())
+
+    def test_csv_projection_and_category(self, api_dir):
+        out = io.StringIO()
+        stats = export(iter_entries(str(api_dir)), "csv", out,
+                       fields=["name", "https", "auth"], category="mapping")
+        assert stats["rows"] == 2
+        rows = list(csv.reader(io.StringIO(out.getvalue())))
+        assert rows == [["name", "https", "auth"], ["API 1", "false", ""],
+                        ["API 2", "true", "apiKey"]]
+
+    def test_columnar_roundtrip(self, api_dir):
+        out = io.BytesIO()
+        export(iter_entries(str(api_dir)), "columnar", out)
+        out.seek(0)
+        rows = list(read_columnar(out))
+        assert len(rows) == 3
+        assert rows[1]["auth"] == "apiKey"
+        assert rows[0]["auth"] is None
+        assert rows[0]["https"] is False and rows[1]["https"] is True
+        assert rows[2]["category"] == "Weather APIs"
+
+    def test_columnar_row_groups(self):
+        """跨多个行组的数据完整还原，包括空值和非 ASCII 文本"""
+        fields = ["name", "https", "comment"]
+        rows = [[f"服务{i}", i % 3 == 0, None if i % 2 else f"备注{i}"] for i in range(1000)]
+        out = io.BytesIO()
+        assert write_columnar(iter(rows), out, fields, row_group_size=64) == 1000
+        out.seek(0)
+        assert [[r[f] for f in fields] for r in read_columnar(out)] == rows
+
+    def test_unknown_format(self, api_dir):
+        with pytest.raises(ValueError):
+            export(iter_entries(str(api_dir)), "xml", io.StringIO())
+
+    def test_constant_memory(self, tmp_path, api_entry):
+        """峰值内存不随目录大小增长"""
+        def peak_for(n_rows, fmt):
+            directory = tmp_path / f"big{n_rows}"
+            directory.mkdir(exist_ok=True)
+            with open(directory / "big.json", 'w', encoding='utf-8') as f:
+                f.write("[")
+                for i in range(n_rows):
+                    entry = api_entry(f"API {i}", comment="x" * 50)
+                    f.write(("," if i else "") + json.dumps(entry))
+                f.write("]")
+            tracemalloc.start()
+            stats = export(iter_entries(str(directory)), fmt, _Sink())
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            assert stats["rows"] == n_rows
+            return peak
+
+        for fmt in ("ndjson", "columnar"):
+            assert peak_for(15000, fmt) < peak_for(5000, fmt) * 1.2
+
+    def test_benchmark(self):
+        results = benchmark(500)
+        assert set(results) == {"csv", "ndjson", "columnar"}
+        assert all(r["rows_per_sec"] > 0 for r in results.values())
+        assert results["columnar"]["bytes"] < results["ndjson"]["bytes"]
+
+
+class _Sink:
+    """丢弃写入内容的输出流"""
+
+    def write(self, data):
+        return len(data)
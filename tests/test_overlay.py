@@ -0,0 +1,162 @@
+"""
+叠加目录测试用例
+
+测试 overlay.py 中的合并规则、按根缓存，以及 load_all_apis、验证器和 Catalog 的集成
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.overlay import RootCache, merge_roots, load_overlay, roots_from_env, ROOTS_ENV
+from utils.search_apis import load_all_apis
+from utils.validate_apis import validate_all_api_files
+from utils.catalog import Catalog
+
+
+def _write(path, entries):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(entries, ensure_ascii=False), encoding='utf-8')
+
+
+@pytest.fixture
+def roots(tmp_path, api_entry):
+    public = tmp_path / "public"
+    private = tmp_path / "private"
+    _write(public / "mapping" / "maps.json",
+           [api_entry("腾讯地图"), api_entry("高德地图"), api_entry("OpenStreetMap")])
+    _write(private / "mapping" / "enterprise.json",
+           [api_entry("腾讯地图 ", auth="apiKey", comment="企业密钥"), api_entry("内部地图")])
+    return public, private
+
+
+class TestMergeRoots:
+    """合并规则测试"""
+
+    def test_later_root_wins_in_place(self, api_entry):
+        merged, shadowed = merge_roots([[api_entry("A"), api_entry("B")],
+                                        [api_entry("a", auth="apiKey")]])
+        assert [e["name"] for e in merged] == ["a", "B"]
+        assert merged[0]["auth"] == "apiKey"
+        assert [s.identity for s in shadowed] == ["a"]
+
+    def test_new_entries_appended(self, api_entry):
+        merged, shadowed = merge_roots([[api_entry("A")], [api_entry("C")]])
+        assert [e["name"] for e in merged] == ["A", "C"]
+        assert shadowed == []
+
+    def test_duplicates_within_root_kept(self, api_entry):
+        merged, _ = merge_roots([[api_entry("A"), api_entry("A")],
+                                 [api_entry("B"), api_entry("B")]])
+        assert [e["name"] for e in merged] == ["A", "A", "B", "B"]
+
+    def test_override_replaces_all_earlier_duplicates(self, api_entry):
+        merged, shadowed = merge_roots([[api_entry("A"), api_entry("B"), api_entry("A")],
+                                        [api_entry("A", comment="new")]])
+        assert [e["name"] for e in merged] == ["A", "B"]
+        assert merged[0]["comment"] == "new"
+        assert len(shadowed) == 2
+
+    def test_three_roots(self, api_entry):
+        merged, _ = merge_roots([[api_entry("A", comment="1")], [api_entry("A", comment="2")],
+                                 [api_entry("A", comment="3")]])
+        assert [e["comment"] for e in merged] == ["3"]
+
+
+class TestLoadOverlay:
+    """加载与缓存测试"""
+
+    def test_load_all_apis_with_roots(self, roots):
+        public, private = roots
+        apis = load_all_apis([public, private])
+        assert [a["name"] for a in apis] == ["腾讯地图 ", "高德地图", "OpenStreetMap", "内部地图"]
+        assert apis[0]["comment"] == "企业密钥"
+        assert apis[0]["source_file"].endswith("enterprise.json")
+
+    def test_single_root_unchanged(self, roots):
+        public, _ = roots
+        assert [a["name"] for a in load_all_apis(str(public))] == \
+            ["腾讯地图", "高德地图", "OpenStreetMap"]
+
+    def test_roots_cached_independently(self, roots, api_entry):
+        public, private = roots
+        cache = RootCache()
+        load_overlay([public, private], cache)
+        assert cache.loads == 2
+        load_overlay([public, private], cache)
+        assert cache.loads == 2
+
+        _write(private / "mapping" / "enterprise.json", [api_entry("内部地图"), api_entry("新地图")])
+        merged, shadowed = load_overlay([public, private], cache)
+        assert cache.loads == 3  # 只重新解析私有目录
+        assert shadowed == []
+        assert [a["name"] for a in merged][-2:] == ["内部地图", "新地图"]
+
+    def test_returned_entries_are_copies(self, roots):
+        public, _ = roots
+        cache = RootCache()
+        first, _ = load_overlay(public, cache)
+        first[0]["name"] = "被修改"
+        second, _ = load_overlay(public, cache)
+        assert second[0]["name"] == "腾讯地图"
+
+    def test_roots_from_env(self, monkeypatch):
+        monkeypatch.setenv(ROOTS_ENV, os.pathsep.join(["api", "private"]))
+        assert roots_from_env() == [Path("api"), Path("private")]
+        monkeypatch.delenv(ROOTS_ENV)
+        assert roots_from_env() == [Path("api")]
+
+
+class TestIntegration:
+    """验证器与 Catalog 集成测试"""
+
+    def test_validator_reports_shadowing(self, roots, capsys):
+        assert validate_all_api_files(list(roots))
+        output = capsys.readouterr().out
+        assert "覆盖了" in output
+        assert "enterprise.json" in output
+
+    def test_validator_fails_on_invalid_overlay(self, roots):
+        public, private = roots
+        _write(private / "bad.json", [{"name": "坏条目"}])
+        assert not validate_all_api_files([public, private])
+
+    def test_catalog_refresh(self, roots, api_entry):
+        public, private = roots
+        catalog = Catalog([public, private])
+        assert catalog.search("腾讯")[0]["auth"] == "apiKey"
+
+        assert catalog.refresh() is catalog.snapshot
+        assert catalog.version == 1
+
+        _write(private / "mapping" / "enterprise.json", [api_entry("内部地图")])
+        catalog.refresh()
+        assert catalog.version == 2
+        assert catalog.search("腾讯")[0]["auth"] is None
+
+    def test_reload_ignores_fingerprints(self, roots):
+        """内容变化但大小和修改时间不变时，reload() 和 load_all_apis 仍读到新内容"""
+        public, _ = roots
+        path = public / "mapping" / "maps.json"
+        catalog = Catalog(public)
+        stat = path.stat()
+        text = path.read_text(encoding='utf-8')
+        path.write_text(text.replace("高德地图", "百度地图"), encoding='utf-8')
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert path.stat().st_size == stat.st_size
+
+        assert catalog.refresh().entries[1]["name"] == "高德地图"  # 指纹未变，跳过
+        assert catalog.reload().entries[1]["name"] == "百度地图"
+        assert load_all_apis(public)[1]["name"] == "百度地图"
+
+    def test_catalogs_do_not_share_cache(self, roots):
+        public, private = roots
+        first = Catalog([public, private])
+        second = Catalog([public, private])
+        assert first._root_cache is not second._root_cache
+        assert first._root_cache.loads == second._root_cache.loads == 2
@@ -0,0 +1,131 @@
+"""
+API 延迟探测测试用例
+
+测试 probe_apis.py 中的统计、探测与历史记录逻辑
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.probe_apis import (
+    percentile,
+    run_probes,
+    ProbeHistory,
+    format_stats,
+)
+
+
+class TestPercentile:
+    """百分位数测试"""
+
+    def test_empty(self):
+        assert percentile([], 50) is None
+
+    def test_interpolation(self):
+        values = [10, 20, 30, 40]
+        assert percentile(values, 0) == 10
+        assert percentile(values, 100) == 40
+        assert percentile(values, 50) == 25
+
+    def test_unsorted_input(self):
+        assert percentile([3, 1, 2], 50) == 2
+
+
+class TestRunProbes:
+    """探测运行器测试"""
+
+    def test_latency_injection_ranks_providers(self, standin_server, api_entry):
+        fast = standin_server(lambda req: (200, {}, b"ok"))
+
+        def slow_handler(req):
+            time.sleep(0.05)
+            return 200, {}, b"ok"
+
+        slow = standin_server(slow_handler)
+        results = run_probes([api_entry("fast", url=fast.url), api_entry("slow", url=slow.url)],
+                             requests_per_api=4, concurrency=4)
+
+        assert results["fast"]["n"] == 4
+        assert results["slow"]["error_rate"] == 0.0
+        assert results["slow"]["p50"] >= 50
+        assert results["fast"]["p50"] < results["slow"]["p50"]
+        assert fast.request_count == 4 and slow.request_count == 4
+
+    def test_error_rate(self, standin_server, api_entry):
+        server = standin_server(lambda req: (503, {}, b"down"))
+        results = run_probes([api_entry("broken", url=server.url)], requests_per_api=3)
+        assert results["broken"]["errors"] == 3
+        assert results["broken"]["error_rate"] == 1.0
+        assert results["broken"]["p50"] is None
+
+    def test_category_filter(self, standin_server, api_entry):
+        server = standin_server(lambda req: (200, {}, b"ok"))
+        apis = [api_entry("a", url=server.url, category="Weather APIs"),
+                api_entry("b", url=server.url, category="POI Queries")]
+        results = run_probes(apis, category="weather", requests_per_api=1)
+        assert list(results) == ["a"]
+
+    def test_bounded_concurrency(self, standin_server, api_entry):
+        state = {"active": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def handler(req):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.02)
+            with lock:
+                state["active"] -= 1
+            return 200, {}, b"ok"
+
+        server = standin_server(handler)
+        run_probes([api_entry(f"api{i}", url=server.url) for i in range(4)],
+                   requests_per_api=3, concurrency=2)
+        assert state["peak"] <= 2
+
+
+class TestProbeHistory:
+    """滚动历史测试"""
+
+    def _stats(self, ts, p50=1.0):
+        return {"timestamp": ts, "n": 1, "errors": 0, "error_rate": 0.0,
+                "p50": p50, "p95": p50, "p99": p50}
+
+    def test_roundtrip(self, tmp_path):
+        path = tmp_path / "history.json"
+        history = ProbeHistory(path)
+        history.record("a", self._stats(1, 5.0))
+        history.save()
+
+        reloaded = ProbeHistory(path)
+        assert reloaded.latest("a")["p50"] == 5.0
+        assert reloaded.latest("missing") is None
+        assert set(json.loads(path.read_text())["a"]) == {"t", "p50", "p95", "p99", "error_rate", "n"}
+
+    def test_corrupt_file_treated_as_empty(self, tmp_path):
+        path = tmp_path / "history.json"
+        for content in (b'{"a": {"t": [1', b"[]", b"\xff\xfe"):
+            path.write_bytes(content)
+            history = ProbeHistory(path)
+            assert history.latest("a") is None
+            history.record("a", self._stats(1))
+            history.save()
+            assert ProbeHistory(path).latest("a")["timestamp"] == 1
+
+    def test_rolling_window(self, tmp_path):
+        history = ProbeHistory(tmp_path / "h.json", max_points=3)
+        for ts in range(5):
+            history.record("a", self._stats(ts, float(ts)))
+        series = history.series("a")
+        assert [point["timestamp"] for point in series] == [2, 3, 4]
+        assert history.latest("a")["p50"] == 4.0
+
+    def test_format_stats(self):
+        text = format_stats(self._stats(0, 12.34))
+        assert "p50 12.3ms" in text
+        assert "错误率 0.0%" in text
@@ -0,0 +1,242 @@
+"""
+服务商选择器测试用例
+
+测试 provider_selector.py 中的衰减统计、熔断器与故障转移，
+故障转移部分使用本地替身服务器模拟故障和变慢的服务商
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.provider_selector import (
+    CLOSED,
+    OPEN,
+    HALF_OPEN,
+    ProviderSelector,
+    FailoverClient,
+    ProviderError,
+    ClientRequestError,
+    AllProvidersFailed,
+    make_http_call,
+    selector_for_category,
+)
+from utils.search_apis import load_all_apis
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestSelector:
+    """统计与熔断测试"""
+
+    def test_prefers_lower_latency(self, clock):
+        selector = ProviderSelector(["慢", "快"], clock=clock)
+        selector.record("慢", True, 300)
+        selector.record("快", True, 50)
+        assert selector.candidates() == ["快", "慢"]
+
+    def test_untried_providers_first(self, clock):
+        selector = ProviderSelector(["A", "B"], clock=clock)
+        selector.record("A", True, 10)
+        assert selector.candidates()[0] == "B"
+
+    def test_errors_penalize_score(self, clock):
+        selector = ProviderSelector(["A", "B"], clock=clock, max_consecutive_failures=100,
+                                    error_threshold=1.1)
+        for _ in range(4):
+            selector.record("A", True, 50)
+            selector.record("A", False, 50)
+            selector.record("B", True, 100)
+        assert selector.candidates() == ["B", "A"]
+
+    def test_stats_decay(self, clock):
+        selector = ProviderSelector(["A"], half_life=10, clock=clock,
+                                    max_consecutive_failures=100, error_threshold=1.1)
+        for _ in range(10):
+            selector.record("A", False, 500)
+        clock.now += 100  # 10 个半衰期
+        selector.record("A", True, 20)
+        health = selector.health["A"]
+        assert health.error_rate < 0.02
+        assert health.latency_ms < 25
+
+    def test_consecutive_failures_trip(self, clock):
+        selector = ProviderSelector(["A", "B"], clock=clock, max_consecutive_failures=3)
+        for _ in range(3):
+            selector.record("A", False, 5)
+        assert selector.health["A"].state == OPEN
+        assert selector.candidates() == ["B"]
+
+    def test_error_rate_trips(self, clock):
+        selector = ProviderSelector(["A"], clock=clock, min_weight=5, error_threshold=0.5,
+                                    max_consecutive_failures=100)
+        for ok in (True, False, True, False, False):
+            selector.record("A", ok, 5)
+        assert selector.health["A"].state == OPEN
+
+    def test_half_open_single_trial(self, clock):
+        selector = ProviderSelector(["A", "B"], clock=clock, cooldown=10)
+        for _ in range(3):
+            selector.record("A", False, 5)
+        clock.now += 10
+        assert selector.candidates()[0] == "A"
+        assert selector.acquire("A")
+        assert selector.health["A"].state == HALF_OPEN
+        assert not selector.acquire("A")  # 只放行一个试探请求
+        assert selector.candidates() == ["B"]
+
+        selector.record("A", True, 5)
+        assert selector.health["A"].state == CLOSED
+        assert selector.health["A"].error_rate == 0
+
+    def test_failed_trial_reopens(self, clock):
+        selector = ProviderSelector(["A"], clock=clock, cooldown=10)
+        for _ in range(3):
+            selector.record("A", False, 5)
+        clock.now += 10
+        assert selector.acquire("A")
+        selector.record("A", False, 5)
+        assert selector.health["A"].state == OPEN
+        assert selector.candidates() == []
+
+    def test_concurrent_records(self):
+        selector = ProviderSelector(["A", "B"], half_life=1e9, max_consecutive_failures=10**9,
+                                    error_threshold=1.1)
+
+        def worker():
+            for i in range(1000):
+                selector.record("A" if i % 2 else "B", i % 4 == 1, 10)
+                selector.candidates()
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert selector.health["A"].weight == pytest.approx(4000)
+        assert selector.health["A"].error_rate == pytest.approx(0.5)
+
+    def test_selector_for_category(self):
+        apis = load_all_apis(str(Path(__file__).parent.parent / "api"))
+        selector = selector_for_category(apis, "weather apis")
+        assert len(selector.health) == 8
+        with pytest.raises(ValueError):
+            selector_for_category(apis, "不存在的分类")
+
+
+class TestFailover:
+    """替身服务器上的故障转移测试"""
+
+    @pytest.fixture
+    def fleet(self, standin_server):
+        behaviour = {"primary": "ok", "backup": "ok"}
+
+        def make_handler(name):
+            def handler(req):
+                mode = behaviour[name]
+                if mode == "error":
+                    return 503, {}, b"unavailable"
+                if mode == "slow":
+                    time.sleep(0.5)
+                if mode == "bad_request":
+                    return 400, {}, b"bad"
+                return 200, {}, name.encode()
+            return handler
+
+        servers = {name: standin_server(make_handler(name)) for name in behaviour}
+        entries = [{"name": name, "url": server.url} for name, server in servers.items()]
+        return behaviour, servers, entries
+
+    def _client(self, entries, **options):
+        selector = ProviderSelector(entries, **options)
+        call = make_http_call(lambda entry: entry["url"] + "/data", timeout=0.1)
+        return selector, FailoverClient(selector, call)
+
+    def test_fails_over_to_backup(self, fleet):
+        behaviour, servers, entries = fleet
+        selector, client = self._client(entries)
+        behaviour["primary"] = "error"
+
+        results = [client.request() for _ in range(10)]
+        assert all(body == b"backup" for _, body in results)
+        # 出错的服务商评分变差，之后的请求直接发往备用服务商
+        assert servers["primary"].request_count == 1
+        assert selector.health["primary"].error_rate == 1.0
+
+    def test_failover_is_fast(self, fleet):
+        behaviour, _, entries = fleet
+        _, client = self._client(entries)
+        behaviour["primary"] = "error"
+        client.request()
+        start = time.perf_counter()
+        for _ in range(20):
+            client.request()
+        assert (time.perf_counter() - start) / 20 < 0.05
+
+    def test_slow_provider_times_out(self, fleet):
+        behaviour, _, entries = fleet
+        selector, client = self._client(entries)
+        behaviour["primary"] = "slow"
+        start = time.perf_counter()
+        names = [client.request()[0] for _ in range(3)]
+        assert names == ["backup"] * 3
+        assert time.perf_counter() - start < 1.0
+
+    def test_recovery_after_cooldown(self, fleet):
+        behaviour, _, entries = fleet
+        selector, client = self._client(entries, cooldown=0.2, max_consecutive_failures=1)
+        behaviour["primary"] = "error"
+        for _ in range(5):
+            client.request()
+        assert selector.health["primary"].state == OPEN
+
+        behaviour["primary"] = "ok"
+        time.sleep(0.25)
+        name, _ = client.request()
+        assert name == "primary"
+        assert selector.health["primary"].state == CLOSED
+
+    def test_all_failed(self, fleet):
+        behaviour, _, entries = fleet
+        _, client = self._client(entries)
+        behaviour.update(primary="error", backup="error")
+        with pytest.raises(AllProvidersFailed) as excinfo:
+            client.request()
+        assert set(excinfo.value.errors) == {"primary", "backup"}
+
+    def test_client_error_not_retried(self, fleet):
+        behaviour, servers, entries = fleet
+        selector, client = self._client(entries)
+        behaviour.update(primary="bad_request", backup="bad_request")
+        with pytest.raises(ClientRequestError):
+            client.request()
+        assert servers["primary"].request_count + servers["backup"].request_count == 1
+        assert all(h.weight == 0 for h in selector.health.values())
+
+    def test_custom_call_errors(self, clock):
+        selector = ProviderSelector(["A", "B"], clock=clock)
+
+        def call(entry):
+            if entry["name"] == "A":
+                raise ProviderError("超时")
+            return "ok"
+
+        client = FailoverClient(selector, call)
+        assert client.request() == ("B", "ok")
+        assert selector.health["A"].error_rate == 1.0
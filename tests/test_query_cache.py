@@ -0,0 +1,110 @@
+"""
+查询结果缓存测试用例
+
+测试 query_cache.py 中的 LRU 淘汰、版本失效与命中统计，以及 Catalog 中的缓存
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.query_cache import QueryCache, make_key
+from utils.catalog import Catalog
+
+
+class TestQueryCache:
+    """LRU 缓存测试"""
+
+    def test_key_normalization(self):
+        assert make_key("search", "  Weather  API ") == make_key("search", "weather api")
+        assert make_key("q", "x", a=1, b=2) == make_key("q", "x", b=2, a=1)
+        assert make_key("q", "x", a=1) != make_key("q", "x", a=2)
+
+    def test_hit_and_miss_statistics(self):
+        cache = QueryCache()
+        calls = []
+        for _ in range(3):
+            cache.get_or_compute("k", 1, lambda: calls.append(1) or ("v",))
+        assert calls == [1]
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (2, 1, 0.6667)
+
+    def test_lru_eviction(self):
+        cache = QueryCache(max_entries=2)
+        cache.get_or_compute("a", 1, lambda: 1)
+        cache.get_or_compute("b", 1, lambda: 2)
+        cache.get_or_compute("a", 1, lambda: 1)
+        cache.get_or_compute("c", 1, lambda: 3)
+        assert cache.get_or_compute("a", 1, lambda: "recomputed") == 1
+        assert cache.get_or_compute("b", 1, lambda: "recomputed") == "recomputed"
+        assert cache.stats()["evictions"] == 2
+
+    def test_new_version_invalidates(self):
+        cache = QueryCache()
+        cache.get_or_compute("k", 1, lambda: "old")
+        assert cache.get_or_compute("k", 2, lambda: "new") == "new"
+        assert cache.stats()["invalidations"] == 1
+
+    def test_stale_version_bypasses_cache(self):
+        cache = QueryCache()
+        cache.get_or_compute("k", 2, lambda: "current")
+        assert cache.get_or_compute("k", 1, lambda: "stale") == "stale"
+        assert cache.get_or_compute("k", 2, lambda: "unused") == "current"
+
+
+class TestCatalogCache:
+    """Catalog 查询缓存测试"""
+
+    @pytest.fixture
+    def api_dir(self, tmp_path):
+        root = tmp_path / "api"
+        root.mkdir()
+        entries = [{"name": f"Weather {i}", "description": "天气", "auth": None, "https": True,
+                    "cors": "yes", "category": "Weather APIs", "url": "https://example.com"}
+                   for i in range(3)]
+        (root / "weather.json").write_text(json.dumps(entries, ensure_ascii=False),
+                                           encoding='utf-8')
+        return root
+
+    def test_hot_query_returns_same_object(self, api_dir):
+        catalog = Catalog(api_dir)
+        first = catalog.search("Weather")
+        assert catalog.search(" weather ") is first
+        assert catalog.filter_by_category("weather") == first
+        assert catalog.cache_stats()["hits"] == 1
+
+    def test_reload_invalidates(self, api_dir):
+        catalog = Catalog(api_dir)
+        assert len(catalog.search("weather")) == 3
+        (api_dir / "weather.json").write_text("[]", encoding='utf-8')
+        catalog.reload()
+        assert catalog.search("weather") == ()
+        assert catalog.cache_stats()["invalidations"] == 1
+
+    def test_limit_and_offset_are_part_of_key(self, api_dir):
+        query = Catalog(api_dir).query().text("weather")
+        assert len(query.limit(1).run()) == 1
+        assert len(query.limit(2).run()) == 2
+        assert query.offset(2).run()[0]["name"] == "Weather 2"
+        assert query.count() == 3
+
+    def test_variant_category_does_not_poison_cache(self, api_dir):
+        """空白或全角写法先查询，不影响随后的规范写法"""
+        catalog = Catalog(api_dir)
+        assert len(catalog.query().category(" weather").run()) == 3
+        assert len(catalog.query().category("ｗｅａｔｈｅｒ").run()) == 3
+        assert len(catalog.filter_by_category("weather")) == 3
+
+    def test_blank_text_matches_key(self, api_dir):
+        catalog = Catalog(api_dir)
+        assert catalog.query().text("   ").run() == catalog.query().run()
+
+    def test_unhashable_facets(self, api_dir):
+        query = Catalog(api_dir).query()
+        assert query.where(tags=["a", "b"]).run() == ()
+        with pytest.raises(TypeError):
+            query.where(extra={"a": 1})
@@ -0,0 +1,105 @@
+"""
+搜索索引测试用例
+
+测试 search_index.py 中的拼音、分词与别名查询
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.search_index import SearchIndex, segment, to_pinyin, analyze
+from utils.search_apis import get_search_index, load_all_apis, search_apis, search_page
+
+REPO_API_DIR = Path(__file__).parent.parent / "api"
+
+
+@pytest.fixture(scope="module")
+def index():
+    return SearchIndex(load_all_apis(REPO_API_DIR))
+
+
+def _names(index, query):
+    return [api['name'] for api in index.search(query)]
+
+
+class TestAnalysis:
+    """文本分析测试"""
+
+    def test_segment_with_unknown_run(self):
+        assert segment("彩云天气") == ["彩云", "天气"]
+        assert segment("提供地点搜索") == ["提供", "地点", "搜索"]
+
+    def test_pinyin(self):
+        assert to_pinyin("高德地图") == ["gao", "de", "di", "tu"]
+        assert to_pinyin("A高") == ["gao"]
+
+    def test_analyze_tokens(self):
+        tokens = analyze("OpenStreetMap 彩云天气API")
+        assert {"open", "street", "map", "openstreetmap", "osm"} <= tokens
+        assert {"caiyun", "cy", "tianqi", "tq", "caiyuntianqi", "彩云", "云天"} <= tokens
+
+
+class TestLookup:
+    """索引查询测试"""
+
+    def test_full_pinyin(self, index):
+        assert _names(index, "caiyun") == ["彩云天气API"]
+        assert "高德地图POI API" in _names(index, "gaode")
+
+    def test_pinyin_prefix_and_initials(self, index):
+        assert "彩云天气API" in _names(index, "caiy")
+        assert "心知天气API" in _names(index, "xztq")
+
+    def test_spaced_pinyin(self, index):
+        assert _names(index, "cai yun") == ["彩云天气API"]
+
+    def test_aliases(self, index):
+        assert "高德地图 JS API" in _names(index, "amap")
+        assert "和风天气API" in _names(index, "qweather")
+        assert "OpenStreetMap Tiles" in _names(index, "osm")
+
+    def test_chinese_words(self, index):
+        names = _names(index, "地点搜索")
+        assert "Google Places API" in names
+
+    def test_english_words_and_camel_case(self, index):
+        assert "OpenStreetMap Nominatim" in _names(index, "nominatim")
+        assert "OpenStreetMap Tiles" in _names(index, "street")
+        assert _names(index, "WEATHER") == _names(index, "weather")
+
+    def test_combined_terms(self, index):
+        assert _names(index, "baidu poi") == ["百度地图POI API"]
+
+    def test_no_match(self, index):
+        assert _names(index, "zzzz") == []
+        assert _names(index, "   ") == []
+
+
+class TestLibrarySearch:
+    """search_apis 等库函数与交互搜索共用同一套匹配规则"""
+
+    def test_substring_or_index(self, index):
+        assert _names(index, "caiyun") == ["彩云天气API"]
+        assert len(_names(index, "eather")) > 0
+        assert "HERE Geocoding & Search" in _names(index, "&")
+
+    def test_search_apis_matches_index_search(self, index):
+        apis = index.apis
+        for query in ("caiyun", "gaode", "amap", "eather", "&", "地点搜索", "zzzz"):
+            assert search_apis(query, apis) == index.search(query)
+        page, _ = search_page("amap", apis, page_size=20)
+        assert "高德地图 JS API" in [api['name'] for api in page]
+
+    def test_index_built_once_per_list(self):
+        apis = load_all_apis(REPO_API_DIR)
+        first = get_search_index(apis)
+        search_apis("caiyun", apis)
+        assert get_search_index(apis) is first
+        apis.append(dict(apis[0], name="彩云备用"))
+        rebuilt = get_search_index(apis)
+        assert rebuilt is not first
+        assert "彩云备用" in [api['name'] for api in search_apis("caiyun", apis)]
@@ -0,0 +1,113 @@
+"""
+惰性搜索与分页测试用例
+
+测试 search_apis.py 中的生成器搜索、limit/offset、游标分页和交互分页
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import search_apis as sa
+
+
+@pytest.fixture
+def make_apis(api_entry):
+    def make(n, category="Mapping Services"):
+        prefix = "Map" if category == "Mapping Services" else "Weather"
+        return [api_entry(f"{prefix} {i}", category=category) for i in range(n)]
+    return make
+
+
+class CountingList(list):
+    """记录被读取了多少个元素的列表"""
+    def __iter__(self):
+        self.pulled = 0
+        for item in list.__iter__(self):
+            self.pulled += 1
+            yield item
+
+
+class TestLazySearch:
+    """生成器搜索测试"""
+
+    def test_list_variants_unchanged(self, make_apis):
+        apis = make_apis(5) + make_apis(3, category="Weather APIs")
+        assert len(sa.search_apis("map", apis)) == 5
+        assert len(sa.filter_by_category("weather", apis)) == 3
+
+    def test_limit_stops_early(self, make_apis):
+        apis = CountingList(make_apis(1000))
+        results = list(sa.iter_search_apis("map", apis, limit=5))
+        assert [r["name"] for r in results] == [f"Map {i}" for i in range(5)]
+        assert apis.pulled == 5
+
+    def test_offset(self, make_apis):
+        apis = CountingList(make_apis(1000))
+        results = list(sa.iter_filter_by_category("mapping", apis, offset=10, limit=3))
+        assert [r["name"] for r in results] == ["Map 10", "Map 11", "Map 12"]
+        assert apis.pulled == 13
+
+    def test_is_lazy(self, make_apis):
+        apis = CountingList(make_apis(100))
+        results = sa.iter_search_apis("map", apis)
+        next(results)
+        assert apis.pulled == 1
+
+
+class TestCursorPaging:
+    """游标分页测试"""
+
+    def test_walk_all_pages(self, make_apis):
+        apis = make_apis(4, "Weather APIs") + make_apis(25) + make_apis(2, "Weather APIs")
+        seen, cursor, pages = [], None, 0
+        while True:
+            page, cursor = sa.category_page("mapping", apis, cursor, page_size=10)
+            seen.extend(page)
+            pages += 1
+            if cursor is None:
+                break
+        assert pages == 3
+        assert seen == apis[4:29]
+
+    def test_exact_multiple_has_no_empty_page(self, make_apis):
+        page, cursor = sa.search_page("map", make_apis(10), page_size=10)
+        assert len(page) == 10
+        assert cursor is None
+
+    def test_cursor_points_at_next_match(self, make_apis):
+        apis = make_apis(3) + make_apis(5, "Weather APIs") + make_apis(1)
+        page, cursor = sa.search_page("map", apis, page_size=3)
+        assert cursor == 8
+        assert sa.search_page("map", apis, cursor, page_size=3) == ([apis[8]], None)
+
+
+class TestInteractivePaging:
+    """交互分页测试"""
+
+    class _History:
+        def latest(self, name):
+            return None
+
+    def test_iter_pages(self):
+        pages = list(sa.iter_pages(range(25), 10))
+        assert [len(p) for p, _ in pages] == [10, 10, 5]
+        assert [more for _, more in pages] == [True, True, False]
+        assert [p for p, _ in sa.iter_pages(range(20), 10)][-1] == list(range(10, 20))
+
+    def test_show_pages_stops_on_q(self, monkeypatch, capsys, make_apis):
+        apis = CountingList(make_apis(1000))
+        monkeypatch.setattr("builtins.input", lambda prompt: "q")
+        sa.show_pages(sa.iter_search_apis("map", apis), self._History(), page_size=10)
+        output = capsys.readouterr().out
+        assert output.count("名称:") == 10
+        assert apis.pulled == 11
+
+    def test_show_pages_next(self, monkeypatch, capsys, make_apis):
+        answers = iter(["n", "n"])
+        monkeypatch.setattr("builtins.input", lambda prompt: next(answers))
+        sa.show_pages(iter(make_apis(25)), self._History(), page_size=10)
+        assert capsys.readouterr().out.count("名称:") == 25
@@ -0,0 +1,168 @@
+"""
+替身服务商集群测试用例
+
+测试 standin_fleet.py 中的认证模拟、故障/延迟/限流注入以及压测驱动
+"""
+
+import asyncio
+import json
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from urllib.parse import quote
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.standin_fleet import StandinConfig, StandinFleet, drive_load
+from utils.probe_apis import run_probes
+from utils.search_apis import load_all_apis
+
+REPO_API_DIR = str(Path(__file__).parent.parent / "api")
+
+
+def _get(url, headers=None):
+    """返回 (状态码, 响应头, 解析后的响应体)"""
+    request = urllib.request.Request(url, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, response.headers, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        with e:
+            return e.code, e.headers, json.loads(e.read())
+
+
+@pytest.fixture
+def start_fleet():
+    fleets = []
+
+    def start(apis, config=None, overrides=None):
+        fleet = StandinFleet(apis, config, overrides).start_in_thread()
+        fleets.append(fleet)
+        return fleet
+
+    yield start
+
+    for fleet in fleets:
+        fleet.stop_thread()
+
+
+class TestAuth:
+    """认证方式模拟测试"""
+
+    def test_api_key(self, start_fleet, api_entry):
+        provider = start_fleet([api_entry("高德", auth="apiKey")])["高德"]
+        assert _get(provider.url + "/v3/geo")[0] == 401
+        assert _get(provider.url + "/v3/geo?key=wrong")[0] == 401
+        status, _, body = _get(provider.url + f"/v3/geo?address={quote('北京')}&key={provider.api_key}")
+        assert status == 200
+        assert body == {"provider": "高德", "path": "/v3/geo", "query": {"address": "北京"}}
+        assert _get(provider.url + f"/?ak={provider.api_key}")[0] == 200
+        assert _get(provider.url, {"X-API-Key": provider.api_key})[0] == 200
+
+    def test_neighbouring_provider_key_rejected(self, start_fleet, api_entry):
+        fleet = start_fleet([api_entry("彩云天气API", auth="apiKey"),
+                             api_entry("和风天气API", auth="apiKey")])
+        caiyun, qweather = fleet["彩云天气API"], fleet["和风天气API"]
+        assert caiyun.api_key != qweather.api_key
+        assert _get(caiyun.url + f"/?key={qweather.api_key}")[0] == 401
+        assert _get(qweather.url, {"X-API-Key": caiyun.api_key})[0] == 401
+
+    def test_oauth(self, start_fleet, api_entry):
+        provider = start_fleet([api_entry("Sentinel Hub", auth="OAuth")])["Sentinel Hub"]
+        assert _get(provider.url)[0] == 401
+        _, headers = provider.credentials()
+        assert _get(provider.url, headers)[0] == 200
+
+    @pytest.mark.parametrize("auth", ["oauth", "OAUTH", "apikey"])
+    def test_auth_is_case_insensitive(self, start_fleet, auth, api_entry):
+        provider = start_fleet([api_entry("Sentinel Hub", auth=auth)])["Sentinel Hub"]
+        assert _get(provider.url)[0] == 401
+        params, headers = provider.credentials()
+        assert params or headers
+        assert _get(provider.url + provider.request_target(), headers)[0] == 200
+
+    def test_no_auth(self, start_fleet, api_entry):
+        provider = start_fleet([api_entry("OSM")])["OSM"]
+        assert _get(provider.url + "/tiles/1/2/3")[0] == 200
+
+
+class TestInjection:
+    """故障、延迟与限流注入测试"""
+
+    def test_error_rate(self, start_fleet, api_entry):
+        fleet = start_fleet([api_entry("A"), api_entry("B")],
+                            overrides={"A": StandinConfig(error_rate=1.0)})
+        assert _get(fleet["A"].url)[0] == 503
+        assert _get(fleet["B"].url)[0] == 200
+        assert fleet["A"].stats["errors"] == 1
+
+    def test_error_rate_is_reproducible(self, start_fleet, api_entry):
+        def outcomes():
+            fleet = start_fleet([api_entry("A")], StandinConfig(error_rate=0.3, seed=7))
+            result = [_get(fleet["A"].url)[0] for _ in range(30)]
+            fleet.stop_thread()
+            return result
+
+        first = outcomes()
+        assert first == outcomes()
+        assert 0 < first.count(503) < 30
+
+    def test_latency(self, start_fleet, api_entry):
+        provider = start_fleet([api_entry("慢")], StandinConfig(latency_ms=150))["慢"]
+        start = time.perf_counter()
+        _get(provider.url)
+        assert time.perf_counter() - start >= 0.15
+
+    def test_rate_limit(self, start_fleet, api_entry):
+        provider = start_fleet([api_entry("A")], StandinConfig(rate_limit=1, burst=2))["A"]
+        statuses = [_get(provider.url) for _ in range(4)]
+        assert [s for s, _, _ in statuses] == [200, 200, 429, 429]
+        assert statuses[2][1]["Retry-After"] == "1"
+
+    def test_invalid_error_rate(self):
+        with pytest.raises(ValueError):
+            StandinConfig(error_rate=1.5)
+
+
+class TestFleet:
+    """集群与压测测试"""
+
+    def test_fleet_from_catalog(self, start_fleet):
+        apis = load_all_apis(REPO_API_DIR)
+        fleet = start_fleet(apis)
+        assert len(fleet.providers) == len({api["name"] for api in apis})
+        results = run_probes(fleet.catalog(), requests_per_api=2, concurrency=8)
+        assert all(stats["errors"] == 0 for stats in results.values())
+
+    def test_drive_load(self, api_entry):
+        async def scenario():
+            apis = [api_entry("A", auth="apiKey"), api_entry("B", auth="OAuth"), api_entry("C")]
+            overrides = {"C": StandinConfig(error_rate=1.0)}
+            async with StandinFleet(apis, StandinConfig(latency_ms=1), overrides) as fleet:
+                return await drive_load(list(fleet.providers.values()), requests=300,
+                                        concurrency=10), fleet
+
+        report, fleet = asyncio.run(scenario())
+        total = report["total"]
+        assert total["n"] == 300
+        assert total["status"] == {200: 200, 503: 100}
+        assert total["throughput"] > 0
+        assert total["p50"] <= total["p95"] <= total["p99"]
+        assert report["providers"]["A"]["errors"] == 0
+        assert report["providers"]["B"]["errors"] == 0
+        assert report["providers"]["C"]["error_rate"] == 1.0
+        assert fleet["A"].stats["unauthorized"] == 0
+
+    def test_drive_load_counts_rate_limits(self, api_entry):
+        async def scenario():
+            config = StandinConfig(rate_limit=5, burst=5)
+            async with StandinFleet([api_entry("A")], config) as fleet:
+                return await drive_load(list(fleet.providers.values()), requests=50,
+                                        concurrency=5)
+
+        report = asyncio.run(scenario())
+        assert report["total"]["status"][429] >= 40
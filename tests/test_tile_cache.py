@@ -0,0 +1,212 @@
+"""
+地图瓦片缓存测试用例
+
+测试 tile_cache.py 中的瓦片坐标、磁盘缓存与条件请求逻辑
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import tile_cache
+from utils.tile_cache import (
+    lonlat_to_tile,
+    tiles_in_bbox,
+    provider_slug,
+    load_tile_providers,
+    TileCache,
+    TileFetcher,
+    TileFetchError,
+)
+from utils.rate_limit import TokenBucket
+
+
+@pytest.fixture
+def tile_server(standin_server):
+    """本地瓦片替身服务：内容取决于坐标，支持 ETag 条件请求"""
+    def handler(req):
+        if req.path.startswith("/missing"):
+            return 404, {}, b""
+        etag = f'"{req.path}"'
+        if req.headers.get("If-None-Match") == etag:
+            return 304, {"ETag": etag}, b""
+        return 200, {"ETag": etag, "Content-Type": "image/png"}, f"tile:{req.path}".encode()
+    return standin_server(handler)
+
+
+def _fetcher(server, tmp_path, max_bytes=10 ** 6, **kwargs):
+    providers = {"Local": {"name": "Local",
+                           "tile_url": server.url + "/{z}/{x}/{y}.png?key={api_key}"}}
+    return TileFetcher(TileCache(tmp_path / "cache", max_bytes), providers,
+                       api_keys={"Local": "secret"}, rate_limits={"Local": 1000}, **kwargs)
+
+
+class TestTileCoordinates:
+    """瓦片坐标测试"""
+
+    def test_world_tile(self):
+        assert lonlat_to_tile(0, 0, 0) == (0, 0)
+
+    def test_known_tile(self):
+        # 北京天安门，z=10
+        assert lonlat_to_tile(116.3975, 39.9087, 10) == (843, 388)
+
+    def test_bbox_across_zooms(self):
+        tiles = list(tiles_in_bbox(-180, -85, 180, 85, range(0, 3)))
+        assert len(tiles) == 1 + 4 + 16
+
+    def test_provider_slug(self):
+        assert provider_slug("OpenStreetMap Tiles").startswith("openstreetmap-tiles-")
+        assert provider_slug("高德地图") != ""
+        assert provider_slug("OpenStreetMap Tiles") == provider_slug("OpenStreetMap Tiles")
+
+    def test_provider_slug_unique_for_cjk_names(self):
+        names = ["高德地图 JS API", "百度地图 JS API", "腾讯地图 JS API"]
+        slugs = {provider_slug(name) for name in names}
+        assert len(slugs) == 3
+        assert all(slug.startswith("js-api-") for slug in slugs)
+
+    def test_catalog_tile_providers(self):
+        apis = [{"name": "A", "tile_url": "https://a/{z}/{x}/{y}"}, {"name": "B"}]
+        assert list(load_tile_providers(apis)) == ["A"]
+
+
+class TestTileFetcher:
+    """瓦片获取测试"""
+
+    def test_cache_hit_has_zero_upstream_calls(self, tile_server, tmp_path):
+        fetcher = _fetcher(tile_server, tmp_path)
+        first = fetcher.get_tile("Local", 3, 1, 2)
+        second = fetcher.get_tile("Local", 3, 1, 2)
+        assert first == second == b"tile:/3/1/2.png"
+        assert fetcher.upstream_calls == 1
+        assert tile_server.requests[0].query["key"] == "secret"
+
+    def test_cache_survives_restart(self, tile_server, tmp_path):
+        _fetcher(tile_server, tmp_path).get_tile("Local", 1, 0, 0)
+        fetcher = _fetcher(tile_server, tmp_path)
+        assert fetcher.get_tile("Local", 1, 0, 0) == b"tile:/1/0/0.png"
+        assert fetcher.upstream_calls == 0
+
+    def test_stale_tile_revalidated_with_etag(self, tile_server, tmp_path):
+        fetcher = _fetcher(tile_server, tmp_path, max_age=0)
+        fetcher.get_tile("Local", 2, 1, 1)
+        assert fetcher.get_tile("Local", 2, 1, 1) == b"tile:/2/1/1.png"
+        assert tile_server.requests[1].headers["If-None-Match"] == '"/2/1/1.png"'
+        assert fetcher.upstream_calls == 2
+
+    def test_upstream_error(self, standin_server, tmp_path):
+        server = standin_server(lambda req: (500, {}, b""))
+        with pytest.raises(TileFetchError):
+            _fetcher(server, tmp_path).get_tile("Local", 0, 0, 0)
+
+    def test_unknown_provider(self, tile_server, tmp_path):
+        with pytest.raises(TileFetchError):
+            _fetcher(tile_server, tmp_path).get_tile("Nope", 0, 0, 0)
+
+    def test_prefetch_then_serve_from_cache(self, tile_server, tmp_path):
+        fetcher = _fetcher(tile_server, tmp_path)
+        bbox = (116.0, 39.5, 117.0, 40.5)
+        stats = fetcher.prefetch("Local", bbox, range(5, 8), concurrency=4)
+        assert stats["failed"] == 0
+        assert stats["upstream_calls"] == stats["tiles"]
+
+        again = fetcher.prefetch("Local", bbox, range(5, 8))
+        assert again["upstream_calls"] == 0
+        assert tile_server.request_count == stats["tiles"]
+
+    def test_providers_with_same_ascii_tail_do_not_share_tiles(self, tile_server, tmp_path):
+        providers = {name: {"name": name,
+                            "tile_url": tile_server.url + f"/{prefix}/{{z}}/{{x}}/{{y}}"}
+                     for name, prefix in (("高德地图 JS API", "a"), ("百度地图 JS API", "b"))}
+        fetcher = TileFetcher(TileCache(tmp_path / "cache"), providers,
+                              rate_limits={name: 1000 for name in providers})
+        assert fetcher.get_tile("高德地图 JS API", 1, 0, 0) == b"tile:/a/1/0/0"
+        assert fetcher.get_tile("百度地图 JS API", 1, 0, 0) == b"tile:/b/1/0/0"
+
+    def test_tile_evicted_after_lookup_is_refetched(self, tile_server, tmp_path):
+        fetcher = _fetcher(tile_server, tmp_path)
+        fetcher.get_tile("Local", 4, 3, 2)
+        for path in (tmp_path / "cache" / "objects").rglob("*"):
+            if path.is_file():
+                path.unlink()
+        assert fetcher.get_tile("Local", 4, 3, 2) == b"tile:/4/3/2.png"
+        assert fetcher.upstream_calls == 2
+
+    def test_not_modified_after_eviction_is_refetched(self, tile_server, tmp_path):
+        fetcher = _fetcher(tile_server, tmp_path, max_age=0)
+        fetcher.get_tile("Local", 4, 3, 2)
+        for path in (tmp_path / "cache" / "objects").rglob("*"):
+            if path.is_file():
+                path.unlink()
+        assert fetcher.get_tile("Local", 4, 3, 2) == b"tile:/4/3/2.png"
+        assert "If-None-Match" in tile_server.requests[1].headers
+        assert "If-None-Match" not in tile_server.requests[2].headers
+
+    def test_cache_write_failure_does_not_abort_prefetch(self, tile_server, tmp_path,
+                                                         monkeypatch):
+        fetcher = _fetcher(tile_server, tmp_path)
+
+        def disk_full(*args, **kwargs):
+            raise OSError(28, "No space left on device")
+
+        monkeypatch.setattr(fetcher.cache, "put", disk_full)
+        with pytest.raises(TileFetchError):
+            fetcher.get_tile("Local", 0, 0, 0)
+        stats = fetcher.prefetch("Local", (116.0, 39.5, 117.0, 40.5), range(3, 5))
+        assert stats["failed"] == stats["tiles"] > 0
+
+
+class TestTileCache:
+    """磁盘缓存测试"""
+
+    def test_lru_eviction_by_size(self, tmp_path):
+        cache = TileCache(tmp_path, max_bytes=25)
+        cache.put(("p", 0, 0, 0), b"a" * 10)
+        cache.put(("p", 0, 0, 1), b"b" * 10)
+        cache.lookup(("p", 0, 0, 0))
+        cache.put(("p", 0, 0, 2), b"c" * 10)
+        assert cache.lookup(("p", 0, 0, 1)) is None
+        assert cache.lookup(("p", 0, 0, 0)) is not None
+        assert cache.total_bytes == 20
+
+    def test_identical_content_stored_once(self, tmp_path):
+        cache = TileCache(tmp_path)
+        cache.put(("p", 1, 0, 0), b"ocean")
+        cache.put(("p", 1, 1, 0), b"ocean")
+        assert cache.total_bytes == 5
+        assert len(list((tmp_path / "objects").rglob("*"))) == 2  # 1个子目录 + 1个对象
+
+    def test_lru_order_survives_restart(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(tile_cache, "ACCESS_WRITE_INTERVAL", 0.0)
+        cache = TileCache(tmp_path, max_bytes=25)
+        cache.put(("p", 0, 0, 0), b"a" * 10)
+        cache.put(("p", 0, 0, 1), b"b" * 10)
+        time.sleep(0.01)
+        cache.lookup(("p", 0, 0, 0))
+
+        cache = TileCache(tmp_path, max_bytes=25)
+        cache.put(("p", 0, 0, 2), b"c" * 10)
+        assert cache.lookup(("p", 0, 0, 1)) is None
+        assert cache.lookup(("p", 0, 0, 0)) is not None
+
+
+class TestTokenBucket:
+    """令牌桶测试"""
+
+    def test_burst_then_throttle(self):
+        bucket = TokenBucket(rate=50, capacity=2)
+        assert bucket.try_acquire()
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()
+        start = time.monotonic()
+        bucket.acquire()
+        assert time.monotonic() - start >= 0.01
+
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            TokenBucket(0)
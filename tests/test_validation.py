@@ -270,6 +270,25 @@ class TestValidateApiEntry:
         is_valid, message = validate_api_entry(invalid_entry)
         assert is_valid is False
 
+    def test_valid_tile_url(self, valid_api_entry):
+        """测试有效的瓦片地址模板"""
+        valid_api_entry["tile_url"] = "https://tile.example.com/{z}/{x}/{y}.png?key={api_key}"
+        is_valid, message = validate_api_entry(valid_api_entry)
+        assert is_valid is True
+
+    def test_tile_url_missing_placeholder(self, valid_api_entry):
+        """测试缺少占位符的瓦片地址模板应该失败"""
+        valid_api_entry["tile_url"] = "https://tile.example.com/{z}/{x}.png"
+        is_valid, message = validate_api_entry(valid_api_entry)
+        assert is_valid is False
+        assert "{y}" in message
+
+    def test_tile_url_invalid_scheme(self, valid_api_entry):
+        """测试非HTTP瓦片地址模板应该失败"""
+        valid_api_entry["tile_url"] = "ftp://tile.example.com/{z}/{x}/{y}.png"
+        is_valid, message = validate_api_entry(valid_api_entry)
+        assert is_valid is False
+
 
 # ============================================================
 # Test Cases: validate_api_file
@@ -0,0 +1,148 @@
+"""
+天气请求缓存测试用例
+
+测试 weather_cache.py 中的 geohash 分段、TTL 缓存与请求合并逻辑
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.weather_cache import (
+    geohash_encode,
+    geohash_center,
+    time_bucket,
+    WeatherClient,
+    WeatherFetchError,
+    make_url_fetcher,
+)
+
+
+class FakeClock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestBucketing:
+    """空间/时间分段测试"""
+
+    def test_geohash_reference_value(self):
+        assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+    def test_center_roundtrip(self):
+        lat, lon = geohash_center(geohash_encode(39.9087, 116.3975, 6))
+        assert abs(lat - 39.9087) < 0.01 and abs(lon - 116.3975) < 0.01
+        assert geohash_encode(lat, lon, 6) == geohash_encode(39.9087, 116.3975, 6)
+
+    def test_time_bucket(self):
+        assert time_bucket(7199, 3600) == 3600
+        assert time_bucket(7200, 3600) == 7200
+
+
+class TestWeatherClient:
+    """缓存与请求合并测试"""
+
+    def test_nearby_coordinates_share_cache(self):
+        calls = []
+        client = WeatherClient(lambda *args: calls.append(args) or {"temp": 20},
+                               precision=5, clock=FakeClock())
+        client.get("OpenWeatherMap", 39.90870, 116.39750)
+        client.get("OpenWeatherMap", 39.90880, 116.39760)
+        assert len(calls) == 1
+        assert client.stats["hits"] == 1
+
+    def test_provider_specific_ttl(self):
+        clock = FakeClock()
+        calls = []
+        client = WeatherClient(lambda *args: calls.append(args[0]) or {},
+                               ttls={"A": 60, "B": 600}, bucket_seconds=86400, clock=clock)
+        client.get("A", 0, 0)
+        client.get("B", 0, 0)
+        clock.now += 120
+        client.get("A", 0, 0)
+        client.get("B", 0, 0)
+        assert calls == ["A", "B", "A"]
+
+    def test_new_time_bucket_is_a_miss(self):
+        clock = FakeClock(3600 * 1000)
+        calls = []
+        client = WeatherClient(lambda *args: calls.append(args[3]) or {},
+                               bucket_seconds=3600, default_ttl=86400, clock=clock)
+        client.get("X", 10, 10)
+        client.get("X", 10, 10, timestamp=clock.now + 3600)
+        assert calls == [3600 * 1000, 3600 * 1001]
+
+    def test_concurrent_identical_requests_coalesce(self):
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_fetch(*args):
+            calls.append(args)
+            started.set()
+            release.wait(5)
+            return {"temp": 1}
+
+        client = WeatherClient(slow_fetch)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(client.get("P", 31.23, 121.47)))
+                   for _ in range(8)]
+        threads[0].start()
+        started.wait(5)
+        for t in threads[1:]:
+            t.start()
+        while client.stats["coalesced"] < 7:
+            time.sleep(0.001)
+        release.set()
+        for t in threads:
+            t.join()
+        assert len(calls) == 1
+        assert results == [{"temp": 1}] * 8
+
+    def test_errors_are_shared_and_not_cached(self):
+        attempts = []
+
+        def failing_fetch(*args):
+            attempts.append(args)
+            raise WeatherFetchError("down")
+
+        client = WeatherClient(failing_fetch)
+        for _ in range(2):
+            with pytest.raises(WeatherFetchError):
+                client.get("P", 1, 1)
+        assert len(attempts) == 2
+
+    def test_lru_bound(self):
+        client = WeatherClient(lambda *args: {}, max_entries=2, clock=FakeClock())
+        for lat in (0, 10, 20):
+            client.get("P", lat, 0)
+        client.get("P", 0, 0)
+        assert client.stats["upstream_calls"] == 4
+
+
+class TestUrlFetcher:
+    """地址模板请求测试"""
+
+    def test_fetch_against_standin(self, standin_server):
+        server = standin_server(lambda req: (200, {}, json.dumps(dict(req.query)).encode()))
+        fetch = make_url_fetcher({"Local": "k"},
+                                 templates={"Local": server.url + "/w?lat={lat}&lon={lon}&key={api_key}"})
+        client = WeatherClient(fetch)
+        body = client.get("Local", 30.0, 120.0)
+        assert body["key"] == "k"
+        assert abs(float(body["lat"]) - 30.0) < 0.05
+        client.get("Local", 30.0001, 120.0001)
+        assert server.request_count == 1
+
+    def test_unknown_provider(self):
+        with pytest.raises(WeatherFetchError):
+            make_url_fetcher({})("Nope", 0, 0, 0, "forecast")
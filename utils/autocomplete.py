@@ -0,0 +1,145 @@
+"""
+API 名称自动补全
+
+基于有序数组的前缀补全：名称、分类及名称中的词都作为补全键，
+查询时用二分查找定位前缀区间，不扫描整个目录。
+匹配条目较多的前缀区间在构建时预先计算 top-k 结果（按热度排序），
+其余前缀的区间很小，直接在区间内取前 k 个
+"""
+
+import heapq
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+|[㐀-鿿]+')
+PREFIX_END = '\U0010ffff'
+
+
+def _common_prefix_length(a: str, b: str) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def normalize_key(text: str) -> str:
+    """补全键的规范化：全角转半角、统一小写、合并空白"""
+    if not unicodedata.is_normalized('NFKC', text):
+        text = unicodedata.normalize('NFKC', text)
+    return ' '.join(text.lower().split())
+
+
+class Autocompleter:
+    """
+    前缀补全索引
+
+    Args:
+        apis: API条目的可迭代对象
+        popularity: API名称 -> 热度，用于排序；分类的热度为其下各API热度之和
+        k: 默认返回的补全数
+        scan_threshold: 前缀区间不超过该大小时直接在区间内选取，否则使用预计算结果
+    """
+    def __init__(self, apis: Iterable[dict], popularity: Optional[Dict[str, float]] = None,
+                 k: int = 10, scan_threshold: int = 64):
+        popularity = popularity or {}
+        self.k = k
+        self.scan_threshold = scan_threshold
+
+        weights: Dict[Tuple[str, str], float] = {}
+        terms = []
+        category_keys: Dict[str, str] = {}
+        for api in apis:
+            name, category = api['name'], api['category']
+            score = float(popularity.get(name, 0))
+            weights[(name, 'name')] = weights.get((name, 'name'), 0) + score
+            weights[(category, 'category')] = weights.get((category, 'category'), 0) + score
+            name_key = normalize_key(name)
+            terms.append((name_key, (name, 'name')))
+            for token in TOKEN_PATTERN.findall(name_key):
+                if token != name_key:
+                    terms.append((token, (name, 'name')))
+            if category not in category_keys:
+                category_keys[category] = normalize_key(category)
+                terms.append((category_keys[category], (category, 'category')))
+
+        # 按 (热度降序, 长度, 文本) 给每个补全项一个名次，名次越小越靠前
+        ordered = sorted(weights, key=lambda s: (-weights[s], len(s[0]), s[0], s[1]))
+        rank_of = {suggestion: rank for rank, suggestion in enumerate(ordered)}
+        self.suggestions: List[Tuple[str, str]] = ordered
+
+        terms = sorted(set((key, rank_of[suggestion]) for key, suggestion in terms),
+                       key=itemgetter(0))
+        self.keys: List[str] = [key for key, _ in terms]
+        self.ranks = array('I', (rank for _, rank in terms))
+        self._top: Dict[Tuple[int, int], Tuple[int, ...]] = {}
+        self._precompute()
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + PREFIX_END, lo)
+        return lo, hi
+
+    def _select(self, lo: int, hi: int, k: int) -> Tuple[int, ...]:
+        return tuple(heapq.nsmallest(k, set(self.ranks[lo:hi])))
+
+    def _precompute(self):
+        """
+        为区间大于 scan_threshold 的前缀预计算 top-k 名次
+
+        任一前缀对应的区间都是有序键数组上的一个 LCP 区间，
+        用一个栈自底向上遍历所有 LCP 区间，子区间的 top-k 合并到父区间，
+        结果按区间 (lo, hi) 存放，整体只需一次线性扫描
+        """
+        keys, ranks, k = self.keys, self.ranks, self.k
+        n = len(keys)
+
+        def _merge(a, b):
+            if not a or not b:
+                return a or b
+            if len(a) >= k and b[0] >= a[-1]:
+                return a
+            return sorted(set(a).union(b))[:k]
+
+        stack = [[0, 0, []]]  # [LCP 长度, 区间起点, 已合并的 top-k]
+        for i in range(1, n + 1):
+            lcp = _common_prefix_length(keys[i - 1], keys[i]) if i < n else 0
+            child = [ranks[i - 1]]
+            lo = i - 1
+            while lcp < stack[-1][0]:
+                depth, lo, top = stack.pop()
+                child = _merge(top, child)
+                if i - lo > self.scan_threshold:
+                    self._top[(lo, i)] = tuple(child)
+            if lcp > stack[-1][0]:
+                stack.append([lcp, lo, child])
+            else:
+                stack[-1][2] = _merge(stack[-1][2], child)
+        if n > self.scan_threshold:
+            self._top[(0, n)] = tuple(stack[0][2])
+
+    def complete_with_kind(self, prefix: str, k: Optional[int] = None) -> List[Tuple[str, str]]:
+        """
+        返回前缀的补全结果
+
+        Returns:
+            [(文本, 类型)]，类型为 'name' 或 'category'
+        """
+        k = k or self.k
+        prefix = normalize_key(prefix)
+        if not prefix:
+            return self.suggestions[:k]
+        lo, hi = self._range(prefix)
+        top = self._top.get((lo, hi))
+        if top is None or k > self.k:
+            top = self._select(lo, hi, k)
+        return [self.suggestions[rank] for rank in top[:k]]
+
+    def complete(self, prefix: str, k: Optional[int] = None) -> List[str]:
+        """返回前缀的补全文本列表"""
+        return [text for text, _ in self.complete_with_kind(prefix, k)]
@@ -0,0 +1,342 @@
+"""
+批量地理编码工具
+
+从文件或标准输入逐行读取地址，调用 POI Queries 分类中的地理编码服务：
+- 地址先规范化，重复地址只查询一次
+- 结果持久化到本地 SQLite 缓存
+- 按提供商进行令牌桶限速，并发数不超过提供商的限制
+- 结果按输入顺序逐行写出，中断后重新运行会从断点继续
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import unicodedata
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Set
+
+try:
+    from utils.rate_limit import TokenBucket
+except ImportError:  # 作为脚本直接运行
+    from rate_limit import TokenBucket
+
+
+DEFAULT_CACHE_FILE = ".geocode_cache.sqlite"
+USER_AGENT = "public-st-apis-batch-geocode/1.0"
+
+
+class GeocodeError(Exception):
+    """地理编码请求失败"""
+    pass
+
+
+# ============================================================
+# 响应解析
+# ============================================================
+
+def _parse_nominatim(data):
+    if not data:
+        return None
+    first = data[0]
+    return {"lat": float(first['lat']), "lon": float(first['lon']),
+            "label": first.get('display_name')}
+
+
+def _parse_mapbox(data):
+    features = data.get('features') or []
+    if not features:
+        return None
+    lon, lat = features[0]['geometry']['coordinates'][:2]
+    return {"lat": lat, "lon": lon,
+            "label": features[0].get('properties', {}).get('full_address')}
+
+
+def _parse_here(data):
+    items = data.get('items') or []
+    if not items:
+        return None
+    position = items[0]['position']
+    return {"lat": position['lat'], "lon": position['lng'], "label": items[0].get('title')}
+
+
+def _parse_amap(data):
+    geocodes = data.get('geocodes') or []
+    if not geocodes:
+        return None
+    lon, lat = geocodes[0]['location'].split(',')
+    return {"lat": float(lat), "lon": float(lon),
+            "label": geocodes[0].get('formatted_address')}
+
+
+# 各提供商的默认配置: 地址模板（占位符 {query} {api_key}）、每秒请求数、最大并发、解析函数
+GEOCODER_PRESETS = {
+    "OpenStreetMap Nominatim": {
+        "url": "https://nominatim.openstreetmap.org/search?format=json&limit=1&q={query}",
+        "rate": 1.0, "concurrency": 1, "parser": _parse_nominatim,
+    },
+    "Mapbox Geocoding": {
+        "url": "https://api.mapbox.com/search/geocode/v6/forward?q={query}&limit=1&access_token={api_key}",
+        "rate": 10.0, "concurrency": 8, "parser": _parse_mapbox,
+    },
+    "HERE Geocoding & Search": {
+        "url": "https://geocode.search.hereapi.com/v1/geocode?q={query}&limit=1&apiKey={api_key}",
+        "rate": 5.0, "concurrency": 5, "parser": _parse_here,
+    },
+    "高德地图POI API": {
+        "url": "https://restapi.amap.com/v3/geocode/geo?address={query}&key={api_key}",
+        "rate": 3.0, "concurrency": 3, "parser": _parse_amap,
+    },
+}
+
+
+# ============================================================
+# 地址规范化与缓存
+# ============================================================
+
+def normalize_address(address: str) -> str:
+    """
+    规范化地址，使写法不同的相同地址得到同一个缓存键
+
+    全角字符转半角、统一小写、合并空白、去掉逗号两侧空白和首尾标点
+    """
+    text = unicodedata.normalize('NFKC', address).lower()
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([,;])\s*', r'\1', text)
+    return text.strip(' ,;.。')
+
+
+class GeocodeCache:
+    """基于 SQLite 的持久化地理编码缓存，可在线程间共享"""
+    def __init__(self, path: str = DEFAULT_CACHE_FILE):
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS geocode ("
+            "provider TEXT NOT NULL, address TEXT NOT NULL, result TEXT, "
+            "PRIMARY KEY (provider, address))")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get(self, provider: str, address: str):
+        """
+        查询缓存
+
+        Returns:
+            (是否命中, 结果)；结果为 None 表示上游确认查无此地址
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM geocode WHERE provider = ? AND address = ?",
+                (provider, address)).fetchone()
+        if row is None:
+            return False, None
+        return True, json.loads(row[0])
+
+    def put(self, provider: str, address: str, result: Optional[dict]):
+        """写入缓存"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocode (provider, address, result) VALUES (?, ?, ?)",
+                (provider, address, json.dumps(result, ensure_ascii=False)))
+            self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+# ============================================================
+# 地理编码
+# ============================================================
+
+class Geocoder:
+    """单个提供商的地理编码客户端，带缓存和限速"""
+    def __init__(self, provider: str, cache: GeocodeCache, api_key: str = "",
+                 url: Optional[str] = None, rate: Optional[float] = None,
+                 concurrency: Optional[int] = None,
+                 parser: Optional[Callable] = None, timeout: float = 10.0):
+        preset = GEOCODER_PRESETS.get(provider, {})
+        self.provider = provider
+        self.cache = cache
+        self.api_key = api_key
+        self.url = url or preset.get('url')
+        if not self.url:
+            raise GeocodeError(f"未配置请求地址的提供商: {provider}")
+        self.concurrency = concurrency or preset.get('concurrency', 1)
+        self.parser = parser or preset.get('parser', _parse_nominatim)
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate or preset.get('rate', 1.0))
+        self._lock = threading.Lock()
+        self.stats = {"cache_hits": 0, "upstream_calls": 0}
+
+    def geocode(self, address: str) -> Optional[dict]:
+        """
+        地理编码一个已规范化的地址
+
+        Returns:
+            {"lat", "lon", "label"}，查无结果时返回 None
+        """
+        hit, result = self.cache.get(self.provider, address)
+        if hit:
+            with self._lock:
+                self.stats["cache_hits"] += 1
+            return result
+
+        self.bucket.acquire()
+        with self._lock:
+            self.stats["upstream_calls"] += 1
+        url = self.url.format(query=urllib.parse.quote(address), api_key=self.api_key)
+        request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                result = self.parser(json.loads(response.read().decode('utf-8')))
+        except urllib.error.HTTPError as e:
+            e.close()
+            raise GeocodeError(f"地理编码请求失败 ({e.code}): {address}")
+        except (urllib.error.URLError, OSError, ValueError, KeyError) as e:
+            raise GeocodeError(f"地理编码请求失败: {address} ({e})")
+        self.cache.put(self.provider, address, result)
+        return result
+
+
+def _load_completed(output_path: Path) -> Set[int]:
+    """
+    读取输出文件中已成功完成的输入行号
+
+    失败的记录（上游 5xx、超时、429 等）和中断时写了一半的末行会从文件中移除，
+    重新运行时对应的输入行会被重新请求；查无结果（result 为 null）视为已完成
+    """
+    if not output_path.exists():
+        return set()
+    completed = set()
+    temp_path = output_path.with_name(output_path.name + ".tmp")
+    with open(output_path, 'rb') as src, open(temp_path, 'wb') as dst:
+        for raw in src:
+            if not raw.endswith(b'\n'):
+                break
+            try:
+                record = json.loads(raw)
+            except ValueError:
+                continue
+            if record.get("error") or "line" not in record:
+                continue
+            completed.add(record["line"])
+            dst.write(raw)
+    os.replace(temp_path, output_path)
+    return completed
+
+
+def run_batch(lines: Iterable[str], output_path, geocoder: Geocoder,
+              window: Optional[int] = None) -> Dict[str, int]:
+    """
+    流式批量地理编码
+
+    输入按行读取，在途请求数不超过 window，结果按输入顺序逐行追加写出。
+    输出文件中成功的行视为已完成，重新运行时跳过对应的输入行；
+    失败的行会被移除并重试，重试结果追加在文件末尾（可按 line 字段排序）。
+    空行（规范化后为空）不发送请求，直接写出 result 为 null 的记录
+
+    Args:
+        lines: 地址行的可迭代对象（文件对象或标准输入）
+        output_path: 输出 NDJSON 文件路径
+        geocoder: 地理编码客户端
+        window: 最大在途请求数，默认为并发数的4倍
+
+    Returns:
+        统计字典
+    """
+    output_path = Path(output_path)
+    completed = _load_completed(output_path)
+    window = window or geocoder.concurrency * 4
+    stats = {"resumed": len(completed), "processed": 0, "errors": 0, "skipped": 0}
+
+    def _resolve(key):
+        try:
+            return geocoder.geocode(key), None
+        except GeocodeError as e:
+            return None, str(e)
+
+    with ThreadPoolExecutor(max_workers=geocoder.concurrency) as pool, \
+            open(output_path, 'a', encoding='utf-8') as out:
+        pending = deque()
+        inflight = {}
+
+        def _write_head():
+            line_no, address, key, future = pending.popleft()
+            if future is None:  # 空行
+                result, error = None, None
+                stats["skipped"] += 1
+            else:
+                result, error = future.result()
+                if inflight.get(key) is future:
+                    # 之后出现的相同地址直接命中 SQLite 缓存
+                    del inflight[key]
+            record = {"line": line_no, "address": address, "result": result}
+            if error:
+                record["error"] = error
+                stats["errors"] += 1
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            stats["processed"] += 1
+
+        for line_no, raw in enumerate(lines, 1):
+            if line_no in completed:
+                continue
+            address = raw.rstrip('\r\n')
+            key = normalize_address(address)
+            future = inflight.get(key)
+            if future is None and key:
+                future = inflight[key] = pool.submit(_resolve, key)
+            pending.append((line_no, address, key, future))
+            if len(pending) >= window:
+                _write_head()
+        while pending:
+            _write_head()
+
+    stats.update(geocoder.stats)
+    return stats
+
+
+# ============================================================
+# 入口点
+# ============================================================
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="批量地理编码")
+    parser.add_argument("--provider", default="OpenStreetMap Nominatim",
+                        choices=sorted(GEOCODER_PRESETS), help="地理编码提供商")
+    parser.add_argument("--input", default="-", help="地址文件，每行一个，'-' 表示标准输入")
+    parser.add_argument("--output", required=True, help="输出 NDJSON 文件")
+    parser.add_argument("--api-key", default="", help="提供商的API密钥")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_FILE, help="SQLite 缓存文件")
+    parser.add_argument("--rate", type=float, help="每秒请求数上限，默认使用提供商预设")
+    parser.add_argument("--concurrency", type=int, help="最大并发数，默认使用提供商预设")
+    args = parser.parse_args(argv)
+
+    cache = GeocodeCache(args.cache)
+    try:
+        geocoder = Geocoder(args.provider, cache, api_key=args.api_key,
+                            rate=args.rate, concurrency=args.concurrency)
+        if args.input == "-":
+            stats = run_batch(sys.stdin, args.output, geocoder)
+        else:
+            with open(args.input, 'r', encoding='utf-8') as f:
+                stats = run_batch(f, args.output, geocoder)
+    finally:
+        cache.close()
+
+    print(f"已处理 {stats['processed']} 行（跳过已完成 {stats['resumed']} 行、空行 {stats['skipped']} 行）, "
+          f"缓存命中 {stats['cache_hits']}, 上游请求 {stats['upstream_calls']}, "
+          f"失败 {stats['errors']}")
+    return 0 if stats['errors'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+"""
+API 目录库
+
+以库的形式嵌入API目录：目录只加载一次，生成不可变快照，
+可在多个线程间直接共享而无需复制；重新加载时原子地替换快照。
+查询结果缓存在与快照版本绑定的 LRU 缓存中
+"""
+
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, Iterator, Optional, Tuple
+
+try:
+    from utils.overlay import RootCache, as_roots, load_overlay, root_fingerprint
+    from utils.query_cache import QueryCache, make_key, normalize_query
+    from utils.search_index import SearchIndex
+except ImportError:  # 作为脚本直接运行
+    from overlay import RootCache, as_roots, load_overlay, root_fingerprint
+    from query_cache import QueryCache, make_key, normalize_query
+    from search_index import SearchIndex
+
+
+def freeze(value):
+    """递归地将 dict/list 转换为只读的 MappingProxyType/tuple"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+# ============================================================
+# 快照
+# ============================================================
+
+class CatalogSnapshot:
+    """
+    目录的不可变快照
+
+    entries 是只读条目的元组；加载时预先构建搜索索引（含拼音、分词）和分类索引，
+    查询时无需再做任何转换
+    """
+    __slots__ = ('entries', 'version', 'loaded_at', 'categories', 'search_index', '_by_category')
+
+    def __init__(self, apis, version: int):
+        entries = tuple(freeze(api) for api in apis)
+        by_category: Dict[str, list] = {}
+        for i, api in enumerate(entries):
+            by_category.setdefault(api['category'], []).append(i)
+
+        set_ = object.__setattr__
+        set_(self, 'entries', entries)
+        set_(self, 'version', version)
+        set_(self, 'loaded_at', time.time())
+        set_(self, 'categories', tuple(sorted(by_category)))
+        set_(self, 'search_index', SearchIndex(entries))
+        set_(self, '_by_category', MappingProxyType(
+            {cat: tuple(indices) for cat, indices in by_category.items()}))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CatalogSnapshot 是只读的")
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def category_indices(self, category: str) -> Tuple[int, ...]:
+        """
+        返回分类名包含 category 的条目序号，按原始顺序
+
+        两边都按 normalize_query 规范化（全半角、大小写、空白），与查询缓存键一致
+        """
+        category = normalize_query(category)
+        matched = [self._by_category[cat] for cat in self.categories
+                   if category in normalize_query(cat)]
+        if len(matched) == 1:
+            return matched[0]
+        return tuple(sorted(i for indices in matched for i in indices))
+
+    def text_matches(self, query: str) -> frozenset:
+        """返回与 query 匹配的条目序号，规则与 search_apis 相同（见 SearchIndex.matcher）"""
+        return frozenset(self.search_index.find(query))
+
+
+# ============================================================
+# 查询构建器
+# ============================================================
+
+class Query:
+    """
+    可组合的不可变查询
+
+    每个方法都返回新的 Query，因此同一个基础查询可以安全地在线程间复用:
+
+        catalog.query().text("天气").where(auth="apiKey").limit(5).run()
+    """
+    __slots__ = ('_catalog', '_text', '_category', '_facets', '_limit', '_offset')
+
+    def __init__(self, catalog: "Catalog", text: Optional[str] = None,
+                 category: Optional[str] = None, facets: Tuple[tuple, ...] = (),
+                 limit: Optional[int] = None, offset: int = 0):
+        self._catalog = catalog
+        self._text = text
+        self._category = category
+        self._facets = facets
+        self._limit = limit
+        self._offset = offset
+
+    def _replace(self, **changes) -> "Query":
+        fields = {name.lstrip('_'): getattr(self, name) for name in self.__slots__[1:]}
+        fields.update(changes)
+        return Query(self._catalog, **fields)
+
+    def text(self, query: str) -> "Query":
+        """名称、描述或分类匹配该文本（支持拼音、首字母和中文分词，见 SearchIndex）"""
+        return self._replace(text=query)
+
+    def category(self, category: str) -> "Query":
+        """分类名包含该文本（忽略大小写、全半角和多余空白）"""
+        return self._replace(category=category)
+
+    def where(self, **facets) -> "Query":
+        """
+        字段精确匹配，如 where(auth="apiKey", https=True)
+
+        列表取值按 freeze 转为元组，与快照中的只读条目比较；其他不可哈希的取值会被拒绝
+        """
+        frozen = []
+        for field, value in sorted(facets.items()):
+            value = freeze(value)
+            try:
+                hash(value)
+            except TypeError:
+                raise TypeError(f"where() 的取值必须可哈希: {field}={value!r}") from None
+            frozen.append((field, value))
+        return self._replace(facets=self._facets + tuple(frozen))
+
+    def limit(self, n: Optional[int]) -> "Query":
+        return self._replace(limit=n)
+
+    def offset(self, n: int) -> "Query":
+        return self._replace(offset=n)
+
+    def _iter_matches(self, snapshot: CatalogSnapshot) -> Iterator[int]:
+        if self._category is not None:
+            candidates = snapshot.category_indices(self._category)
+        else:
+            candidates = range(len(snapshot))
+        # 与 cache_key 使用相同的规范化，空白查询词等同于不限制
+        text = normalize_query(self._text)
+        matched = snapshot.text_matches(text) if text else None
+        for i in candidates:
+            if matched is not None and i not in matched:
+                continue
+            entry = snapshot.entries[i]
+            if all(entry.get(field) == value for field, value in self._facets):
+                yield i
+
+    def cache_key(self, kind: str = "query") -> tuple:
+        """规范化后的查询条件，用作结果缓存的键"""
+        return make_key(kind, self._text, category=normalize_query(self._category),
+                        facets=self._facets, limit=self._limit, offset=self._offset)
+
+    def _collect(self, snapshot: CatalogSnapshot) -> tuple:
+        matches = self._iter_matches(snapshot)
+        stop = None if self._limit is None else self._offset + self._limit
+        results = []
+        for n, i in enumerate(matches):
+            if stop is not None and n >= stop:
+                break
+            if n >= self._offset:
+                results.append(snapshot.entries[i])
+        return tuple(results)
+
+    def run(self, snapshot: Optional[CatalogSnapshot] = None) -> tuple:
+        """
+        在快照上执行查询，相同的查询直接返回缓存的结果
+
+        Args:
+            snapshot: 指定快照，默认使用目录当前的快照
+
+        Returns:
+            只读条目的元组
+        """
+        if snapshot is None:
+            snapshot = self._catalog.snapshot
+        return self._catalog.cache.get_or_compute(
+            self.cache_key(), snapshot.version, lambda: self._collect(snapshot))
+
+    def count(self, snapshot: Optional[CatalogSnapshot] = None) -> int:
+        """匹配的条目总数（忽略 limit/offset）"""
+        if snapshot is None:
+            snapshot = self._catalog.snapshot
+        return self._catalog.cache.get_or_compute(
+            self.cache_key("count"), snapshot.version,
+            lambda: sum(1 for _ in self._iter_matches(snapshot)))
+
+    def facet_counts(self, field: str, snapshot: Optional[CatalogSnapshot] = None) -> Dict:
+        """按字段值统计匹配条目数（忽略 limit/offset）"""
+        if snapshot is None:
+            snapshot = self._catalog.snapshot
+        counts: Dict = {}
+        for i in self._iter_matches(snapshot):
+            value = snapshot.entries[i].get(field)
+            counts[value] = counts.get(value, 0) + 1
+        return counts
+
+    def __iter__(self):
+        return iter(self.run())
+
+
+# ============================================================
+# 目录
+# ============================================================
+
+class Catalog:
+    """
+    可嵌入、线程安全的API目录
+
+    读取方通过 snapshot 属性拿到当前快照的引用，快照本身不可变；
+    reload() 在锁内构建新快照后一次性替换引用，读取方不会看到中间状态；
+    新快照的版本号变大，查询缓存随之失效。
+
+    api_dir 可以是多个叠加的目录根（见 overlay.py）。reload() 总是从磁盘重新读取；
+    refresh() 按文件指纹跳过未变化的根，解析结果缓存在本实例的 RootCache 中
+    """
+    def __init__(self, api_dir="api", autoload: bool = True, cache_size: int = 256):
+        self.api_dir = api_dir
+        self.cache = QueryCache(cache_size)
+        self._reload_lock = threading.Lock()
+        self._version = 0
+        self._fingerprints = None
+        self._root_cache = RootCache()
+        self._snapshot = CatalogSnapshot((), 0)
+        if autoload:
+            self.reload()
+
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def reload(self) -> CatalogSnapshot:
+        """从磁盘重新加载目录并原子地替换快照"""
+        with self._reload_lock:
+            return self._reload(force=True)
+
+    def _reload(self, force: bool) -> CatalogSnapshot:
+        fingerprints = self._current_fingerprints()
+        apis, _ = load_overlay(self.api_dir, self._root_cache, force=force)
+        self._version += 1
+        snapshot = CatalogSnapshot(apis, self._version)
+        self._snapshot = snapshot
+        self._fingerprints = fingerprints
+        return snapshot
+
+    def _current_fingerprints(self) -> tuple:
+        return tuple(root_fingerprint(root) for root in as_roots(self.api_dir))
+
+    def refresh(self) -> CatalogSnapshot:
+        """
+        只有目录文件发生变化时才重新加载，返回当前快照
+
+        变化按 (修改时间, 大小) 指纹判断，只重新解析变化了的根；
+        修改时间精度较粗时可能漏判，此时请使用 reload()
+        """
+        with self._reload_lock:
+            if self._current_fingerprints() == self._fingerprints:
+                return self._snapshot
+            return self._reload(force=False)
+
+    def query(self) -> Query:
+        """创建一个空查询"""
+        return Query(self)
+
+    def search(self, query: str) -> tuple:
+        """按文本搜索，等价于 query().text(query).run()"""
+        return self.query().text(query).run()
+
+    def filter_by_category(self, category: str) -> tuple:
+        """按分类过滤，等价于 query().category(category).run()"""
+        return self.query().category(category).run()
+
+    def cache_stats(self) -> dict:
+        """查询缓存的命中统计"""
+        return self.cache.stats()
+
+    def __len__(self) -> int:
+        return len(self._snapshot)
@@ -0,0 +1,196 @@
+"""
+API 目录差异工具
+
+按稳定标识（规范化名称 + 规范化URL）比较两个目录快照或两个 git 版本，
+在线性时间内得到新增、删除和修改的条目，并输出紧凑的变更流（NDJSON），
+供下游索引和缓存增量应用，而不必整体重建
+"""
+
+import argparse
+import hashlib
+import json
+import subprocess
+import sys
+import unicodedata
+from collections.abc import Mapping
+from pathlib import PurePosixPath
+from typing import Dict, IO, Iterable, Iterator, List, Optional
+
+
+# 加载时注入的字段，不参与内容比较
+VOLATILE_FIELDS = frozenset({'source_file'})
+
+
+# ============================================================
+# 条目标识
+# ============================================================
+
+def normalize_name(name: str) -> str:
+    """名称规范化：全角转半角、统一小写、合并空白"""
+    return ' '.join(unicodedata.normalize('NFKC', name).lower().split())
+
+
+def normalize_url(url: str) -> str:
+    """URL规范化：去掉协议、统一小写主机名、去掉末尾斜杠"""
+    url = url.strip()
+    scheme, sep, rest = url.partition('://')
+    if not sep:
+        rest = scheme
+    host, slash, path = rest.partition('/')
+    return (host.lower() + slash + path).rstrip('/')
+
+
+def entry_key(entry: Mapping) -> str:
+    """条目的稳定标识"""
+    return f"{normalize_name(entry['name'])}|{normalize_url(entry['url'])}"
+
+
+def _plain(value):
+    if isinstance(value, Mapping):
+        return {k: _plain(v) for k, v in value.items() if k not in VOLATILE_FIELDS}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return value
+
+
+def content_hash(entry: Mapping) -> str:
+    """条目内容的哈希（忽略 VOLATILE_FIELDS 与字段顺序）"""
+    canonical = json.dumps(_plain(entry), sort_keys=True, ensure_ascii=False,
+                           separators=(',', ':'))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+# ============================================================
+# 差异计算
+# ============================================================
+
+def diff_catalogs(old: Iterable[Mapping], new: Iterable[Mapping]) -> List[dict]:
+    """
+    计算两个目录之间的变更
+
+    Args:
+        old: 旧目录的条目
+        new: 新目录的条目
+
+    Returns:
+        变更列表，按新目录顺序给出 add/modify，最后给出 remove:
+            {"op": "add", "key": ..., "entry": {...}}
+            {"op": "modify", "key": ..., "entry": {...}, "fields": [...]}
+            {"op": "remove", "key": ...}
+    """
+    old_index: Dict[str, tuple] = {}
+    for entry in old:
+        old_index[entry_key(entry)] = (content_hash(entry), entry)
+
+    changes = []
+    seen = set()
+    for entry in new:
+        key = entry_key(entry)
+        seen.add(key)
+        previous = old_index.get(key)
+        if previous is None:
+            changes.append({"op": "add", "key": key, "entry": _plain(entry)})
+            continue
+        old_hash, old_entry = previous
+        if old_hash != content_hash(entry):
+            plain_old, plain_new = _plain(old_entry), _plain(entry)
+            fields = sorted(f for f in plain_old.keys() | plain_new.keys()
+                            if plain_old.get(f) != plain_new.get(f))
+            changes.append({"op": "modify", "key": key, "entry": plain_new, "fields": fields})
+
+    for key in old_index:
+        if key not in seen:
+            changes.append({"op": "remove", "key": key})
+    return changes
+
+
+def apply_changes(state: Dict[str, dict], changes: Iterable[dict]) -> Dict[str, dict]:
+    """
+    将变更流应用到以 entry_key 为键的状态字典（原地修改）
+
+    Returns:
+        修改后的 state
+    """
+    for change in changes:
+        if change["op"] == "remove":
+            state.pop(change["key"], None)
+        else:
+            state[change["key"]] = change["entry"]
+    return state
+
+
+def write_change_stream(changes: Iterable[dict], out: IO[str]) -> int:
+    """以 NDJSON 格式写出变更流，返回写出的变更数"""
+    count = 0
+    for change in changes:
+        out.write(json.dumps(change, ensure_ascii=False, separators=(',', ':')) + "\n")
+        count += 1
+    return count
+
+
+def read_change_stream(lines: Iterable[str]) -> Iterator[dict]:
+    """逐行读取 NDJSON 变更流"""
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+
+# ============================================================
+# git 版本
+# ============================================================
+
+def load_catalog_at_revision(revision: str, api_dir: str = "api",
+                             repo: str = ".") -> List[dict]:
+    """
+    读取某个 git 版本中的目录
+
+    Args:
+        revision: git 版本（提交、分支或标签）
+        api_dir: 目录在仓库中的相对路径
+        repo: 仓库路径
+
+    Returns:
+        API条目列表，每个条目带有 source_file 字段
+    """
+    listing = subprocess.run(
+        ["git", "-C", repo, "ls-tree", "-r", "--name-only", revision, "--", api_dir],
+        check=True, capture_output=True, text=True).stdout
+    apis = []
+    for path in sorted(listing.splitlines()):
+        if PurePosixPath(path).suffix != '.json':
+            continue
+        content = subprocess.run(
+            ["git", "-C", repo, "show", f"{revision}:{path}"],
+            check=True, capture_output=True).stdout
+        for api in json.loads(content.decode('utf-8')):
+            api['source_file'] = path
+            apis.append(api)
+    return apis
+
+
+# ============================================================
+# 入口点
+# ============================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="输出两个目录版本之间的变更流（NDJSON）")
+    parser.add_argument("old", help="旧的 git 版本")
+    parser.add_argument("new", nargs="?", help="新的 git 版本，默认为工作区")
+    parser.add_argument("--api-dir", default="api", help="目录路径")
+    args = parser.parse_args(argv)
+
+    # search_apis 经 overlay 依赖本模块的 normalize_name，因此在这里才导入
+    try:
+        from utils.search_apis import load_all_apis
+    except ImportError:  # 作为脚本直接运行
+        from search_apis import load_all_apis
+
+    old = load_catalog_at_revision(args.old, args.api_dir)
+    new = (load_catalog_at_revision(args.new, args.api_dir) if args.new
+           else load_all_apis(args.api_dir))
+    write_change_stream(diff_catalogs(old, new), sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
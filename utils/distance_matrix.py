@@ -0,0 +1,358 @@
+"""
+距离矩阵请求规划工具
+
+将 N×M 的距离/时间矩阵问题切分为符合 Spatial Intelligence 分类中
+各提供商单次请求上限的子矩阵（瓦片），在限速下并发执行，只重试失败的瓦片，
+并把结果拼装到一块连续的 array('d') 中，不为每个单元格创建 Python 对象。
+算过的起终点对按起点缓存，之后的问题只为缺失的起终点对规划请求
+"""
+
+import json
+import math
+import threading
+import time
+import urllib.parse
+import urllib.request
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from utils.rate_limit import TokenBucket
+except ImportError:  # 作为脚本直接运行
+    from rate_limit import TokenBucket
+
+
+Point = Tuple[float, float]   # (lat, lon)
+Tile = Tuple[int, int, int, int]  # (起点起始, 起点结束, 终点起始, 终点结束)
+Job = Tuple[List[int], List[int]]  # 一次请求的 (唯一起点序号, 唯一终点序号)
+
+# 各提供商单次请求的上限与默认速率，实际数值取决于账户套餐，可按需覆盖
+MATRIX_LIMITS = {
+    "Google Maps Distance Matrix API": {
+        "max_origins": 25, "max_destinations": 25, "max_elements": 100, "rate": 10.0},
+    "OpenRouteService": {
+        "max_origins": 3500, "max_destinations": 3500, "max_elements": 3500, "rate": 0.6},
+    "GraphHopper": {
+        "max_origins": 200, "max_destinations": 200, "max_elements": 10000, "rate": 1.0},
+}
+
+DEFAULT_CACHE_PAIRS = 1_000_000  # 缓存的起终点对上限
+
+
+class MatrixError(Exception):
+    """
+    矩阵计算失败，result 中保留已完成部分（失败单元格为 NaN）
+
+    failed_tiles 是失败请求的 (起点坐标列表, 终点坐标列表)
+    """
+    def __init__(self, message: str, failed_tiles: List[Tuple[List[Point], List[Point]]],
+                 result=None):
+        self.failed_tiles = failed_tiles
+        self.result = result
+        super().__init__(message)
+
+
+# ============================================================
+# 规划
+# ============================================================
+
+def choose_block(rows: int, cols: int, max_origins: int, max_destinations: int,
+                 max_elements: int) -> Tuple[int, int]:
+    """
+    选择瓦片尺寸，使请求数最少
+
+    Args:
+        rows: 起点数
+        cols: 终点数
+        max_origins: 单次请求的起点上限
+        max_destinations: 单次请求的终点上限
+        max_elements: 单次请求的起点×终点上限
+
+    Returns:
+        (每个瓦片的起点数, 每个瓦片的终点数)
+    """
+    best = None
+    for a in range(1, min(rows, max_origins, max_elements) + 1):
+        b = min(cols, max_destinations, max_elements // a)
+        if b < 1:
+            break
+        requests = math.ceil(rows / a) * math.ceil(cols / b)
+        candidate = (requests, -(a * b), a, b)
+        if best is None or candidate < best:
+            best = candidate
+    return best[2], best[3]
+
+
+def plan_tiles(rows: int, cols: int, limits: dict) -> List[Tile]:
+    """将 rows×cols 的矩阵切分为符合上限的瓦片列表"""
+    if rows == 0 or cols == 0:
+        return []
+    a, b = choose_block(rows, cols, limits['max_origins'], limits['max_destinations'],
+                        limits['max_elements'])
+    return [(o, min(o + a, rows), d, min(d + b, cols))
+            for o in range(0, rows, a) for d in range(0, cols, b)]
+
+
+def _dedupe(points: Sequence[Point]) -> Tuple[List[Point], List[int]]:
+    """去除重复坐标，返回 (唯一坐标列表, 原序号 -> 唯一序号)"""
+    index: Dict[Point, int] = {}
+    mapping = [index.setdefault(tuple(p), len(index)) for p in points]
+    return list(index), mapping
+
+
+def _runs(mapping: List[int]) -> List[List[int]]:
+    """将序号映射压缩为 [目标起点, 源起点, 长度] 的连续段，展开时按段切片复制"""
+    runs: List[List[int]] = []
+    for dst, src in enumerate(mapping):
+        if runs and runs[-1][1] + runs[-1][2] == src:
+            runs[-1][2] += 1
+        else:
+            runs.append([dst, src, 1])
+    return runs
+
+
+# ============================================================
+# 结果
+# ============================================================
+
+class MatrixResult:
+    """行优先存储在单个 array('d') 中的矩阵，缺失值为 NaN"""
+    def __init__(self, rows: int, cols: int, data: Optional[array] = None):
+        self.rows = rows
+        self.cols = cols
+        self.data = data if data is not None else array('d', [math.nan]) * (rows * cols)
+
+    def get(self, i: int, j: int) -> float:
+        return self.data[i * self.cols + j]
+
+    def row(self, i: int) -> memoryview:
+        """返回第 i 行的只读视图（不复制）"""
+        return memoryview(self.data)[i * self.cols:(i + 1) * self.cols].toreadonly()
+
+    def to_lists(self) -> List[List[float]]:
+        return [self.data[i * self.cols:(i + 1) * self.cols].tolist() for i in range(self.rows)]
+
+
+# ============================================================
+# 执行
+# ============================================================
+
+class MatrixEngine:
+    """
+    距离矩阵执行引擎
+
+    fetch(origins, destinations) 负责一次上游请求，返回行优先的
+    len(origins) * len(destinations) 个数值（不可达为 None 或 NaN）
+    """
+    def __init__(self, fetch: Callable[[List[Point], List[Point]], Sequence],
+                 limits: dict, rate: Optional[float] = None, concurrency: int = 4,
+                 max_retries: int = 3, retry_delay: float = 0.5,
+                 cache_pairs: int = DEFAULT_CACHE_PAIRS):
+        self.fetch = fetch
+        self.limits = limits
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.bucket = TokenBucket(rate or limits.get('rate', 1.0))
+        self.cache_pairs = cache_pairs
+        # 起点 -> {终点: 数值}，按起点 LRU 淘汰，总单元格数不超过 cache_pairs
+        self._rows: "OrderedDict[Point, Dict[Point, float]]" = OrderedDict()
+        self._cached_pairs = 0
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "retries": 0, "cache_hits": 0}
+
+    def _fill_from_cache(self, uniq_o: List[Point], uniq_d: List[Point],
+                         data: array) -> Dict[Tuple[int, ...], List[int]]:
+        """
+        用缓存的起终点对填充矩阵，返回 {缺失的终点序号: 起点序号列表}
+
+        缺失终点相同的起点归为一组，一起规划请求（新起点缺全部终点；
+        新增一个终点时，已有起点只缺这一个）
+        """
+        cols = len(uniq_d)
+        all_cols = tuple(range(cols))
+        groups: Dict[Tuple[int, ...], List[int]] = {}
+        hits = 0
+        with self._lock:
+            for i, origin in enumerate(uniq_o):
+                row = self._rows.get(origin)
+                if row is None:
+                    missing = all_cols
+                else:
+                    self._rows.move_to_end(origin)
+                    base = i * cols
+                    absent = []
+                    for j, destination in enumerate(uniq_d):
+                        value = row.get(destination)
+                        if value is None:
+                            absent.append(j)
+                        else:
+                            data[base + j] = value
+                    hits += cols - len(absent)
+                    missing = tuple(absent)
+                if missing:
+                    groups.setdefault(missing, []).append(i)
+            self.stats["cache_hits"] += hits
+        return groups
+
+    def _store(self, origins: List[Point], destinations: List[Point], block: array):
+        width = len(destinations)
+        with self._lock:
+            for r, origin in enumerate(origins):
+                row = self._rows.get(origin)
+                if row is None:
+                    row = self._rows[origin] = {}
+                else:
+                    self._rows.move_to_end(origin)
+                before = len(row)
+                row.update(zip(destinations, block[r * width:(r + 1) * width]))
+                self._cached_pairs += len(row) - before
+            while self._cached_pairs > self.cache_pairs and self._rows:
+                _, row = self._rows.popitem(last=False)
+                self._cached_pairs -= len(row)
+
+    def _run_tile(self, origins: List[Point], destinations: List[Point]) -> array:
+        self.bucket.acquire()
+        with self._lock:
+            self.stats["requests"] += 1
+        values = self.fetch(origins, destinations)
+        if len(values) != len(origins) * len(destinations):
+            raise ValueError(f"瓦片结果数量不符: expected {len(origins) * len(destinations)}, "
+                             f"got {len(values)}")
+        block = array('d', (math.nan if v is None else v for v in values))
+        self._store(origins, destinations, block)
+        return block
+
+    def compute(self, origins: Sequence[Point], destinations: Sequence[Point]) -> MatrixResult:
+        """
+        计算完整矩阵
+
+        重复坐标只计算一次，已缓存的起终点对不再请求，只为缺失部分规划瓦片；
+        失败的瓦片单独重试，超过重试次数后抛出 MatrixError
+
+        Args:
+            origins: 起点 (lat, lon) 列表
+            destinations: 终点 (lat, lon) 列表
+
+        Returns:
+            len(origins) × len(destinations) 的 MatrixResult
+        """
+        uniq_o, o_map = _dedupe(origins)
+        uniq_d, d_map = _dedupe(destinations)
+        cols = len(uniq_d)
+        unique = MatrixResult(len(uniq_o), cols)
+        data = unique.data
+
+        def _attempt(job: Job):
+            rows, columns = job
+            try:
+                block = self._run_tile([uniq_o[i] for i in rows], [uniq_d[j] for j in columns])
+            except Exception:
+                return job, False
+            width = len(columns)
+            runs = _runs(columns)
+            for r, i in enumerate(rows):
+                base, offset = i * cols, r * width
+                for b0, j0, n in runs:
+                    data[base + j0:base + j0 + n] = block[offset + b0:offset + b0 + n]
+            return job, True
+
+        pending: List[Job] = []
+        for columns, rows in self._fill_from_cache(uniq_o, uniq_d, data).items():
+            for o0, o1, d0, d1 in plan_tiles(len(rows), len(columns), self.limits):
+                pending.append((rows[o0:o1], list(columns[d0:d1])))
+
+        with ThreadPoolExecutor(max_workers=max(1, self.concurrency)) as pool:
+            for attempt in range(self.max_retries + 1):
+                if not pending:
+                    break
+                if attempt:
+                    with self._lock:
+                        self.stats["retries"] += len(pending)
+                    time.sleep(self.retry_delay * (2 ** (attempt - 1)))
+                pending = [job for job, ok in pool.map(_attempt, pending) if not ok]
+
+        result = self._expand(unique, o_map, d_map)
+        if pending:
+            failed = [([uniq_o[i] for i in rows], [uniq_d[j] for j in columns])
+                      for rows, columns in pending]
+            raise MatrixError(f"{len(pending)} 个瓦片在 {self.max_retries} 次重试后仍然失败",
+                              failed, result)
+        return result
+
+    @staticmethod
+    def _expand(unique: MatrixResult, o_map: List[int], d_map: List[int]) -> MatrixResult:
+        """将去重后的矩阵按原始顺序展开"""
+        if o_map == list(range(unique.rows)) and d_map == list(range(unique.cols)):
+            return unique
+        result = MatrixResult(len(o_map), len(d_map))
+        src, dst = unique.data, result.data
+        src_cols, cols = unique.cols, result.cols
+        runs = _runs(d_map)
+        built: Dict[int, int] = {}   # 唯一起点 -> 已展开的行在结果中的起点
+        for i, ui in enumerate(o_map):
+            base = i * cols
+            first = built.get(ui)
+            if first is not None:
+                dst[base:base + cols] = dst[first:first + cols]
+                continue
+            built[ui] = base
+            row = ui * src_cols
+            for d0, s0, n in runs:
+                dst[base + d0:base + d0 + n] = src[row + s0:row + s0 + n]
+        return result
+
+
+# ============================================================
+# 提供商适配
+# ============================================================
+
+def _request_json(url: str, payload: Optional[dict] = None,
+                  headers: Optional[dict] = None, timeout: float = 30.0):
+    data = None if payload is None else json.dumps(payload).encode('utf-8')
+    request = urllib.request.Request(url, data=data, headers={
+        "Content-Type": "application/json", **(headers or {})})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+
+def make_google_fetcher(api_key: str,
+                        base_url: str = "https://maps.googleapis.com/maps/api/distancematrix/json"):
+    """Google Distance Matrix，返回行程时间（秒）"""
+    def fetch(origins, destinations):
+        def _join(points):
+            return "|".join(f"{lat},{lon}" for lat, lon in points)
+        url = (f"{base_url}?origins={urllib.parse.quote(_join(origins))}"
+               f"&destinations={urllib.parse.quote(_join(destinations))}&key={api_key}")
+        body = _request_json(url)
+        return [element.get('duration', {}).get('value')
+                for row in body['rows'] for element in row['elements']]
+    return fetch
+
+
+def make_ors_fetcher(api_key: str, profile: str = "driving-car",
+                     base_url: str = "https://api.openrouteservice.org/v2/matrix"):
+    """OpenRouteService Matrix，返回行程时间（秒）"""
+    def fetch(origins, destinations):
+        locations = [[lon, lat] for lat, lon in list(origins) + list(destinations)]
+        payload = {"locations": locations,
+                   "sources": list(range(len(origins))),
+                   "destinations": list(range(len(origins), len(locations))),
+                   "metrics": ["duration"]}
+        body = _request_json(f"{base_url}/{profile}", payload, {"Authorization": api_key})
+        return [value for row in body['durations'] for value in row]
+    return fetch
+
+
+def make_graphhopper_fetcher(api_key: str, profile: str = "car",
+                             base_url: str = "https://graphhopper.com/api/1/matrix"):
+    """GraphHopper Matrix，返回行程时间（秒）"""
+    def fetch(origins, destinations):
+        payload = {"from_points": [[lon, lat] for lat, lon in origins],
+                   "to_points": [[lon, lat] for lat, lon in destinations],
+                   "out_arrays": ["times"], "profile": profile}
+        body = _request_json(f"{base_url}?key={api_key}", payload)
+        return [value for row in body['times'] for value in row]
+    return fetch
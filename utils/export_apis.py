@@ -0,0 +1,463 @@
+"""
+API 目录批量导出工具
+
+以生成器流水线导出目录：读取 → 验证（validate_api_entry）→ 投影/过滤 → 写出。
+支持 CSV、NDJSON 和一种仅依赖标准库的列式二进制格式（STCOL），
+数据逐条流过流水线，内存占用与目录大小无关
+"""
+
+import argparse
+import csv
+import io
+import json
+import struct
+import sys
+import time
+import tracemalloc
+from array import array
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, IO, Iterable, Iterator, List, Optional
+
+try:
+    from utils.validate_apis import validate_api_entry
+except ImportError:  # 作为脚本直接运行
+    from validate_apis import validate_api_entry
+
+
+DEFAULT_FIELDS = ['name', 'description', 'auth', 'https', 'cors', 'category', 'url',
+                  'comment', 'source_file']
+BOOL_FIELDS = frozenset({'https'})
+WHITESPACE = ' \t\r\n'
+MAX_REPORTED_ERRORS = 5     # export() 结果中保留的错误消息条数，其余只计数
+
+COLUMNAR_MAGIC = b"STCOL1\n\0"
+TYPE_STR = 0
+TYPE_BOOL = 1
+
+
+# ============================================================
+# 读取
+# ============================================================
+
+def iter_json_array(fp: IO[str], chunk_size: int = 1 << 16) -> Iterator:
+    """
+    增量解析 JSON 数组，逐个产出元素
+
+    每次只在缓冲区中保留尚未解析的部分，内存占用取决于单个元素的大小，
+    而不是整个文件。元素之间必须恰好有一个逗号，与 json.load 一样拒绝
+    [,{...}]、[{...},,{...}]、[{...},] 和 [{...} {...}]，抛出 ValueError
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    started = False
+    expect_value = True   # 下一个非空白字符应当是元素（或空数组的 ]）
+    count = 0
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            eof = True
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    while True:
+        while True:
+            while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            fill()
+        if pos >= len(buffer):
+            raise ValueError("JSON数组不完整")
+
+        char = buffer[pos]
+        if not started:
+            if char != '[':
+                raise ValueError("JSON根元素必须是数组")
+            started = True
+            pos += 1
+            continue
+        if char == ']':
+            if expect_value and count:
+                raise ValueError(f"JSON数组格式错误: 第 {count} 个元素后多余的逗号")
+            return
+        if not expect_value:
+            if char != ',':
+                raise ValueError(f"JSON数组格式错误: 第 {count} 个元素后缺少逗号")
+            expect_value = True
+            pos += 1
+            continue
+        if char == ',':
+            raise ValueError(f"JSON数组格式错误: 第 {count + 1} 个元素前多余的逗号")
+
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()
+                continue
+            if end == len(buffer) and not eof:
+                # 数字等标量可能被截断在缓冲区末尾，补充数据后重新解析
+                fill()
+                continue
+            break
+        pos = end
+        expect_value = False
+        count += 1
+        yield value
+
+
+def iter_entries(api_dir: str = "api") -> Iterator[dict]:
+    """
+    逐条读取目录中的API条目，附带 source_file 字段
+
+    文件不是合法的 JSON 数组时抛出 ValueError，消息中带有文件路径
+    """
+    for json_file in sorted(Path(api_dir).rglob("*.json")):
+        with open(json_file, 'r', encoding='utf-8') as f:
+            entries = iter_json_array(f)
+            while True:
+                try:
+                    entry = next(entries)
+                except StopIteration:
+                    break
+                except ValueError as e:
+                    raise ValueError(f"{json_file}: {e}") from e
+                if isinstance(entry, dict):
+                    entry['source_file'] = str(json_file)
+                yield entry
+
+
+# ============================================================
+# 验证、过滤与投影
+# ============================================================
+
+def validate_entries(entries: Iterable, on_invalid: Optional[Callable] = None) -> Iterator[dict]:
+    """
+    只放行通过 validate_api_entry 的条目
+
+    Args:
+        entries: 条目流
+        on_invalid: 收到无效条目时的回调 (条目, 消息)
+    """
+    for entry in entries:
+        if isinstance(entry, dict):
+            is_valid, message = validate_api_entry(entry)
+        else:
+            is_valid, message = False, f"条目类型无效: {type(entry).__name__}"
+        if is_valid:
+            yield entry
+        elif on_invalid is not None:
+            on_invalid(entry, message)
+
+
+def filter_entries(entries: Iterable[dict], category: Optional[str] = None,
+                   predicate: Optional[Callable[[dict], bool]] = None) -> Iterator[dict]:
+    """按分类（不区分大小写的子串匹配）和自定义条件过滤"""
+    category = category.lower() if category else None
+    for entry in entries:
+        if category and category not in entry['category'].lower():
+            continue
+        if predicate and not predicate(entry):
+            continue
+        yield entry
+
+
+def project(entries: Iterable[dict], fields: List[str]) -> Iterator[list]:
+    """将条目投影为按 fields 排列的行"""
+    for entry in entries:
+        yield [entry.get(field) for field in fields]
+
+
+# ============================================================
+# 写出
+# ============================================================
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+def write_csv(rows: Iterable[list], out: IO[str], fields: List[str]) -> int:
+    """逐行写出 CSV，返回行数"""
+    writer = csv.writer(out)
+    writer.writerow(fields)
+    count = 0
+    for row in rows:
+        writer.writerow([_csv_value(v) for v in row])
+        count += 1
+    return count
+
+
+def write_ndjson(rows: Iterable[list], out: IO[str], fields: List[str]) -> int:
+    """逐行写出 NDJSON，返回行数"""
+    count = 0
+    for row in rows:
+        out.write(json.dumps(dict(zip(fields, row)), ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def _bitmap(flags: List[bool]) -> bytes:
+    data = bytearray((len(flags) + 7) // 8)
+    for i, flag in enumerate(flags):
+        if flag:
+            data[i >> 3] |= 1 << (i & 7)
+    return bytes(data)
+
+
+def _unbitmap(data: bytes, n: int) -> List[bool]:
+    return [bool(data[i >> 3] & (1 << (i & 7))) for i in range(n)]
+
+
+def _u32_array(values) -> bytes:
+    arr = array('I', values)
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _write_row_group(out: BinaryIO, columns: List[list], types: List[int]):
+    n = len(columns[0])
+    out.write(struct.pack('<I', n))
+    for values, col_type in zip(columns, types):
+        out.write(_bitmap([v is not None for v in values]))
+        if col_type == TYPE_BOOL:
+            out.write(_bitmap([bool(v) for v in values]))
+            continue
+        offsets = [0]
+        chunks = []
+        for value in values:
+            if value is not None:
+                encoded = str(value).encode('utf-8')
+                chunks.append(encoded)
+                offsets.append(offsets[-1] + len(encoded))
+            else:
+                offsets.append(offsets[-1])
+        out.write(_u32_array(offsets))
+        out.write(b"".join(chunks))
+
+
+def write_columnar(rows: Iterable[list], out: BinaryIO, fields: List[str],
+                   row_group_size: int = 4096) -> int:
+    """
+    写出 STCOL 列式二进制格式，返回行数
+
+    格式（小端）:
+        文件头   MAGIC, u16 列数, 每列 [u16 名称长度, 名称UTF-8, u8 类型]
+        行组     u32 行数, 每列 [非空位图, 数据]，其中
+                 字符串列数据 = u32 偏移量数组(行数+1) + 拼接的UTF-8字节，
+                 布尔列数据 = 取值位图
+        结束     u32 0
+
+    内存中最多缓存 row_group_size 行
+    """
+    types = [TYPE_BOOL if field in BOOL_FIELDS else TYPE_STR for field in fields]
+    out.write(COLUMNAR_MAGIC)
+    out.write(struct.pack('<H', len(fields)))
+    for field, col_type in zip(fields, types):
+        name = field.encode('utf-8')
+        out.write(struct.pack('<H', len(name)) + name + struct.pack('<B', col_type))
+
+    count = 0
+    columns: List[list] = [[] for _ in fields]
+    for row in rows:
+        for column, value in zip(columns, row):
+            column.append(value)
+        count += 1
+        if len(columns[0]) >= row_group_size:
+            _write_row_group(out, columns, types)
+            columns = [[] for _ in fields]
+    if columns[0]:
+        _write_row_group(out, columns, types)
+    out.write(struct.pack('<I', 0))
+    return count
+
+
+def _read_exact(fp: BinaryIO, n: int) -> bytes:
+    data = fp.read(n)
+    if len(data) != n:
+        raise ValueError("STCOL 文件不完整")
+    return data
+
+
+def iter_row_groups(fp: BinaryIO) -> Iterator[Dict[str, list]]:
+    """逐个读取 STCOL 文件的行组，产出 {列名: 值列表}"""
+    if _read_exact(fp, len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+        raise ValueError("不是 STCOL 文件")
+    (n_columns,) = struct.unpack('<H', _read_exact(fp, 2))
+    schema = []
+    for _ in range(n_columns):
+        (length,) = struct.unpack('<H', _read_exact(fp, 2))
+        name = _read_exact(fp, length).decode('utf-8')
+        (col_type,) = struct.unpack('<B', _read_exact(fp, 1))
+        schema.append((name, col_type))
+
+    while True:
+        (n,) = struct.unpack('<I', _read_exact(fp, 4))
+        if n == 0:
+            return
+        bitmap_size = (n + 7) // 8
+        group = {}
+        for name, col_type in schema:
+            present = _unbitmap(_read_exact(fp, bitmap_size), n)
+            if col_type == TYPE_BOOL:
+                values = _unbitmap(_read_exact(fp, bitmap_size), n)
+                group[name] = [v if p else None for v, p in zip(values, present)]
+                continue
+            offsets = array('I')
+            offsets.frombytes(_read_exact(fp, 4 * (n + 1)))
+            if sys.byteorder != 'little':
+                offsets.byteswap()
+            blob = _read_exact(fp, offsets[-1])
+            group[name] = [blob[offsets[i]:offsets[i + 1]].decode('utf-8') if present[i] else None
+                           for i in range(n)]
+        yield group
+
+
+def read_columnar(fp: BinaryIO) -> Iterator[dict]:
+    """逐行读取 STCOL 文件"""
+    for group in iter_row_groups(fp):
+        names = list(group)
+        for values in zip(*group.values()):
+            yield dict(zip(names, values))
+
+
+# ============================================================
+# 流水线
+# ============================================================
+
+WRITERS = {"csv": write_csv, "ndjson": write_ndjson, "columnar": write_columnar}
+
+
+def export(entries: Iterable, fmt: str, out, fields: Optional[List[str]] = None,
+           category: Optional[str] = None) -> dict:
+    """
+    运行导出流水线
+
+    Args:
+        entries: 原始条目流，通常为 iter_entries()
+        fmt: csv / ndjson / columnar
+        out: 输出流，columnar 需要二进制流，其余需要文本流
+        fields: 导出的字段，默认 DEFAULT_FIELDS
+        category: 只导出该分类
+
+    Returns:
+        {"rows": 导出行数, "invalid": 无效条目数, "errors": 前 MAX_REPORTED_ERRORS 条错误消息}
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"不支持的格式: {fmt}")
+    fields = fields or DEFAULT_FIELDS
+    stats = {"invalid": 0, "errors": []}
+
+    def on_invalid(entry, message):
+        stats["invalid"] += 1
+        if len(stats["errors"]) < MAX_REPORTED_ERRORS:
+            stats["errors"].append(message)
+
+    valid = validate_entries(entries, on_invalid)
+    rows = project(filter_entries(valid, category), fields)
+    stats["rows"] = WRITERS[fmt](rows, out, fields)
+    return stats
+
+
+def _synthetic_entries(n: int) -> Iterator[dict]:
+    for i in range(n):
+        yield {"name": f"Provider {i}", "description": f"合成的第{i}个地图服务，用于基准测试",
+               "auth": "apiKey" if i % 2 else None, "https": bool(i % 3), "cors": "yes",
+               "category": ("Mapping Services", "Weather APIs", "POI Queries")[i % 3],
+               "url": f"https://provider{i}.example.com/docs", "comment": None}
+
+
+def benchmark(n_rows: int = 100000, formats=("csv", "ndjson", "columnar")) -> Dict[str, dict]:
+    """
+    用合成数据测量各格式的吞吐量和峰值内存
+
+    吞吐量和内存分两遍测量，避免 tracemalloc 的开销影响计时
+
+    Returns:
+        {格式: {"rows_per_sec": ..., "peak_kb": ..., "bytes": 输出字节数}}
+    """
+    results = {}
+    for fmt in formats:
+        out = _NullBinary() if fmt == "columnar" else _NullText()
+        start = time.perf_counter()
+        export(_synthetic_entries(n_rows), fmt, out)
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        export(_synthetic_entries(n_rows), fmt, _NullBinary() if fmt == "columnar" else _NullText())
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[fmt] = {"rows_per_sec": round(n_rows / elapsed), "peak_kb": peak // 1024,
+                        "bytes": out.size}
+    return results
+
+
+class _NullText(io.TextIOBase):
+    """只统计写入量的文本输出"""
+    size = 0
+
+    def write(self, s):
+        self.size += len(s.encode('utf-8'))
+        return len(s)
+
+
+class _NullBinary(io.RawIOBase):
+    """只统计写入量的二进制输出"""
+    size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.size += len(b)
+        return len(b)
+
+
+# ============================================================
+# 入口点
+# ============================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="导出API目录")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="ndjson", help="导出格式")
+    parser.add_argument("--output", default="-", help="输出文件，'-' 表示标准输出")
+    parser.add_argument("--fields", help="逗号分隔的字段列表")
+    parser.add_argument("--category", help="只导出该分类")
+    parser.add_argument("--api-dir", default="api", help="目录路径")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="用 N 行合成数据做基准测试")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        for fmt, result in benchmark(args.benchmark).items():
+            print(f"{fmt}: {result['rows_per_sec']} 行/秒, 峰值内存 {result['peak_kb']} KB, "
+                  f"输出 {result['bytes']} 字节")
+        return 0
+
+    fields = args.fields.split(',') if args.fields else None
+    binary = args.format == "columnar"
+    if args.output == "-":
+        out = sys.stdout.buffer if binary else sys.stdout
+        stats = export(iter_entries(args.api_dir), args.format, out, fields, args.category)
+    else:
+        mode, kwargs = ('wb', {}) if binary else ('w', {"encoding": "utf-8", "newline": ""})
+        with open(args.output, mode, **kwargs) as out:
+            stats = export(iter_entries(args.api_dir), args.format, out, fields, args.category)
+
+    print(f"已导出 {stats['rows']} 行，跳过无效条目 {stats['invalid']} 个", file=sys.stderr)
+    for message in stats['errors']:
+        print(f"  {message}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
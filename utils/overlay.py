@@ -0,0 +1,178 @@
+"""
+叠加目录
+
+将多个目录根按顺序叠加：靠后的根优先，例如在公开目录之上叠加
+内部服务商列表或企业密钥配置。同名条目在加载时通过合并索引一次性决议，
+查询时不再处理覆盖关系。
+
+load_overlay 默认每次都从磁盘读取；长期运行的 Catalog 持有自己的 RootCache，
+其 refresh() 按文件指纹判断各个根是否变化，修改较小的私有目录
+不会导致重新解析较大的公开目录
+
+叠加时条目的标识只看规范化后的名称（见 entry_identity），
+而不像 catalog_diff.entry_key 那样同时比较URL：覆盖条目的常见用途
+正是为同一个服务商换用企业版地址或密钥，URL 不同也应视为同一条目
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+try:
+    from utils.catalog_diff import normalize_name
+except ImportError:  # 作为脚本直接运行
+    from catalog_diff import normalize_name
+
+
+ROOTS_ENV = "ST_API_ROOTS"
+
+Roots = Union[str, os.PathLike, Sequence[Union[str, os.PathLike]]]
+
+
+def as_roots(api_dir: Roots) -> List[Path]:
+    """将单个目录或目录列表统一为目录列表（按优先级从低到高）"""
+    if isinstance(api_dir, (str, os.PathLike)):
+        return [Path(api_dir)]
+    return [Path(root) for root in api_dir]
+
+
+def roots_from_env(default: str = "api") -> List[Path]:
+    """
+    从环境变量 ST_API_ROOTS 读取目录根列表
+
+    多个根用 os.pathsep 分隔（Linux/macOS 为 ':'，Windows 为 ';'），
+    未设置时只使用 default
+    """
+    value = os.environ.get(ROOTS_ENV, "")
+    return as_roots([root for root in value.split(os.pathsep) if root] or default)
+
+
+def entry_identity(entry: dict) -> str:
+    """条目在叠加时的标识：规范化后的名称（不含URL，见模块说明）"""
+    return normalize_name(entry['name'])
+
+
+# ============================================================
+# 单个根的快照缓存
+# ============================================================
+
+def root_fingerprint(root: Path) -> Tuple[tuple, ...]:
+    """目录根的指纹：每个JSON文件的 (相对路径, 修改时间, 大小)"""
+    return tuple((str(path.relative_to(root)), stat.st_mtime_ns, stat.st_size)
+                 for path in sorted(root.rglob("*.json"))
+                 for stat in (path.stat(),))
+
+
+def _read_root(root: Path) -> Tuple[dict, ...]:
+    apis = []
+    for json_file in sorted(root.rglob("*.json")):
+        with open(json_file, 'r', encoding='utf-8') as f:
+            for api in json.load(f):
+                api['source_file'] = str(json_file)
+                apis.append(api)
+    return tuple(apis)
+
+
+class RootCache:
+    """
+    按目录根缓存解析结果
+
+    指纹未变化时直接复用上次解析的条目；返回的是条目的浅拷贝，
+    调用方修改条目不会影响缓存。指纹只含修改时间和大小，
+    在修改时间精度较粗的文件系统上可能漏判，需要确定读到最新内容时传入 force=True
+    """
+    def __init__(self):
+        self._entries: Dict[Path, Tuple[tuple, Tuple[dict, ...]]] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def load(self, root: Path, force: bool = False) -> List[dict]:
+        """
+        读取一个根的条目
+
+        Args:
+            root: 目录根
+            force: 忽略缓存，重新从磁盘读取
+        """
+        root = Path(root)
+        key = root.resolve()
+        fingerprint = root_fingerprint(root)
+        with self._lock:
+            cached = self._entries.get(key)
+        if force or cached is None or cached[0] != fingerprint:
+            cached = (fingerprint, _read_root(root))
+            with self._lock:
+                self._entries[key] = cached
+                self.loads += 1
+        return [dict(api) for api in cached[1]]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# ============================================================
+# 合并
+# ============================================================
+
+class Shadowed(NamedTuple):
+    """被覆盖的条目"""
+    identity: str
+    entry: dict
+    winner: dict
+
+
+def merge_roots(per_root: Iterable[Iterable[dict]]) -> Tuple[List[dict], List[Shadowed]]:
+    """
+    按优先级合并多个根的条目
+
+    靠后的根中与此前条目标识相同的条目整体替换之前的条目，
+    并保持被替换条目在目录中的位置；新条目追加在末尾。
+    同一个根内的重名条目不互相覆盖
+
+    Args:
+        per_root: 各个根的条目，按优先级从低到高
+
+    Returns:
+        (合并后的条目, 被覆盖的条目)
+    """
+    merged: List[Optional[dict]] = []
+    index: Dict[str, List[int]] = {}
+    shadowed: List[Shadowed] = []
+    for entries in per_root:
+        seen = set()
+        for entry in entries:
+            identity = entry_identity(entry)
+            positions = index.get(identity)
+            if positions and identity not in seen:
+                seen.add(identity)
+                for pos in positions:
+                    shadowed.append(Shadowed(identity, merged[pos], entry))
+                    merged[pos] = None
+                merged[positions[0]] = entry
+                index[identity] = [positions[0]]
+                continue
+            seen.add(identity)
+            index.setdefault(identity, []).append(len(merged))
+            merged.append(entry)
+    return [entry for entry in merged if entry is not None], shadowed
+
+
+def load_overlay(api_dir: Roots = "api", cache: Optional[RootCache] = None,
+                 force: bool = False) -> Tuple[List[dict], List[Shadowed]]:
+    """
+    加载并合并多个目录根
+
+    Args:
+        api_dir: 目录根或目录根列表，按优先级从低到高
+        cache: 根快照缓存，None 表示直接从磁盘读取
+        force: 使用缓存时仍然重新读取所有根（结果会写回缓存）
+
+    Returns:
+        (合并后的条目, 被覆盖的条目)
+    """
+    per_root = [cache.load(root, force) if cache is not None else list(_read_root(root))
+                for root in as_roots(api_dir)]
+    return merge_roots(per_root)
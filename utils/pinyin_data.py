@@ -0,0 +1,49 @@
+"""
+汉字拼音表
+
+覆盖目录中出现的汉字及常见地理/时空服务用字，多音字取本领域最常用的读音。
+目录新增未收录的汉字时，请在 _PINYIN_DATA 中补充（或安装 pypinyin 作为后备）
+"""
+
+_PINYIN_DATA = """
+一yi 三san 上shang 下xia 不bu 专zhuan 业ye 东dong 两liang 个ge 中zhong 丰feng 为wei 主zhu
+义yi 之zhi 乘cheng 于yu 云yun 互hu 交jiao 京jing 人ren 以yi 件jian 价jia 份fen 企qi 优you
+位wei 低di 体ti 使shi 供gong 便bian 保bao 信xin 候hou 偏pian 元yuan 先xian 光guang 免mian
+全quan 公gong 关guan 兴xing 具ju 内nei 册ce 军jun 农nong 决jue 况kuang 准zhun 减jian 出chu
+分fen 划hua 创chuang 利li 制zhi 前qian 力li 功gong 加jia 务wu 动dong 助zhu 包bao 化hua
+北bei 区qu 医yi 华hua 单dan 南nan 卫wei 危wei 厂chang 历li 县xian 参can 及ji 反fan 发fa
+取qu 变bian 口kou 可ke 台tai 史shi 号hao 各ge 合he 同tong 名ming 向xiang 含han 周zhou 和he 商shang
+嘉jia 四si 回hui 团tuan 围wei 国guo 图tu 圆yuan 在zai 地di 场chang 址zhi 坐zuo 型xing
+城cheng 域yu 基ji 堵du 增zeng 外wai 多duo 大da 天tian 太tai 套tao 好hao 如ru 字zi 守shou
+安an 定ding 实shi 家jia 密mi 富fu 察cha 对dui 导dao 寻xun 小xiao 少shao 局ju 层ceng 展zhan
+山shan 岛dao 州zhou 工gong 巴ba 市shi 布bu 帮bang 平ping 并bing 广guang 序xu 库ku 应ying
+底di 店dian 度du 建jian 开kai 式shi 强qiang 当dang 录lu 形xing 彩cai 径jing 微wei 德de 心xin
+快kuai 态tai 性xing 息xi 情qing 感gan 或huo 所suo 手shou 才cai 扫sao 托tuo 扩kuo 技ji 护hu
+报bao 拥yong 括kuo 持chi 指zhi 按an 换huan 据ju 授shou 接jie 提ti 搜sou 摩mo 支zhi 收shou
+放fang 政zheng 效xiao 教jiao 数shu 文wen 新xin 方fang 无wu 日ri 时shi 明ming 易yi 星xing
+春chun 显xian 晴qing 景jing 智zhi 更geng 最zui 月yue 有you 服fu 望wang 未wei 本ben 术shu
+机ji 权quan 杭hang 村cun 条tiao 来lai 析xi 果guo 查cha 标biao 栅zha 栏lan 校xiao 样yang 格ge 案an
+检jian 楼lou 模mo 次ci 欧ou 正zheng 步bu 殊shu 每mei 气qi 水shui 求qiu 江jiang 汐xi 汽qi 沙sha
+河he 油you 法fa 泊bo 注zhu 洋yang 洞dong 测ce 浪lang 海hai 深shen 温wen 湖hu 湿shi 源yuan
+滴di 潮chao 火huo 灾zai 点dian 然ran 照zhao 片pian 物wu 特te 狗gou 独du 率lv 玉yu 现xian
+球qiu 理li 瓦wa 生sheng 用yong 由you 申shen 电dian 界jie 百bai 的de 监jian 盖gai 直zhi 相xiang
+省sheng 矢shi 知zhi 矩ju 码ma 研yan 确que 示shi 离li 私si 种zhong 科ke 称cheng 移yi 程cheng
+穿chuan 空kong 站zhan 端duan 等deng 策ce 筛shai 简jian 算suan 管guan 类lei 米mi 精jing 紫zi
+索suo 级ji 纬wei 线xian 组zu 细xi 终zhong 经jing 绘hui 统tong 维wei 编bian 网wang 置zhi
+美mei 署shu 翻fan 者zhe 能neng 腾teng 自zi 航hang 船chuan 色se 艺yi 苹ping 英ying 范fan
+获huo 落luo 融rong 行xing 街jie 表biao 要yao 覆fu 规gui 视shi 角jiao 解jie 警jing 言yan
+计ji 认ren 让rang 议yi 讯xun 记ji 设she 证zheng 词ci 询xun 详xiang 语yu 请qing 谷gu 调diao
+象xiang 质zhi 账zhang 货huo 费fei 资zi 走zou 起qi 超chao 距ju 路lu 身shen 车che 转zhuan
+轨gui 软ruan 载zai 辆liang 边bian 过guo 近jin 返fan 还huan 这zhe 进jin 远yuan 迹ji 适shi
+选xuan 逆ni 逐zhu 途tu 通tong 速su 道dao 遥yao 遵zun 避bi 部bu 都du 酒jiu 里li 重zhong
+量liang 金jin 针zhen 钟zhong 钥yao 铁tie 银yin 键jian 镇zhen 长chang 门men 间jian 阳yang
+阴yin 阵zhen 附fu 降jiang 限xian 院yuan 险xian 隐yin 雨yu 雪xue 雾wu 需xu 震zhen 霾mai
+非fei 面mian 页ye 项xiang 预yu 领ling 风feng 飞fei 餐can 饭fan 馆guan 驶shi 驾jia 骑qi
+高gao 鸟niao 黄huang 齐qi 龙long 圳zhen 阿a 歌ge 港gang 桥qiao 学xue 影ying 像xiang 污wu
+染ran 环huan 境jing 付fu 西xi 米mi 吧ba 团tuan 宝bao 世shi 博bo 思si 维wei 通tong 达da
+"""
+
+PINYIN = {}
+for _item in _PINYIN_DATA.split():
+    PINYIN.setdefault(_item[0], _item[1:])
+del _item
@@ -0,0 +1,264 @@
+"""
+API 延迟探测工具
+
+此脚本以有限并发向目录中的每个API（或某一分类下的API）发送探测请求，
+统计 p50/p95/p99 延迟与错误率，并将结果追加到本地的滚动历史文件中
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+DEFAULT_HISTORY_FILE = ".probe_history.json"
+HISTORY_FIELDS = ('p50', 'p95', 'p99', 'error_rate', 'n')
+
+
+# ============================================================
+# 统计
+# ============================================================
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """
+    计算百分位数（线性插值）
+
+    Args:
+        values: 样本列表
+        pct: 百分位，取值 0-100
+
+    Returns:
+        百分位数值，样本为空时返回 None
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(latencies_ms: List[float], errors: int, total: int) -> dict:
+    """
+    汇总一个API的探测样本
+
+    Args:
+        latencies_ms: 成功请求的延迟（毫秒）
+        errors: 失败请求数
+        total: 请求总数
+
+    Returns:
+        统计字典
+    """
+    def _round(value):
+        return None if value is None else round(value, 1)
+
+    return {
+        "timestamp": int(time.time()),
+        "n": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "p50": _round(percentile(latencies_ms, 50)),
+        "p95": _round(percentile(latencies_ms, 95)),
+        "p99": _round(percentile(latencies_ms, 99)),
+    }
+
+
+# ============================================================
+# 探测
+# ============================================================
+
+def probe_once(url: str, method: str = "GET", timeout: float = 5.0,
+               headers: Optional[dict] = None) -> Tuple[bool, float]:
+    """
+    发送一次探测请求
+
+    Args:
+        url: 请求地址
+        method: HTTP方法
+        timeout: 超时时间（秒）
+        headers: 额外请求头
+
+    Returns:
+        (是否成功, 延迟毫秒)
+    """
+    request = urllib.request.Request(url, method=method, headers=headers or {})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            ok = response.status < 400
+    except urllib.error.HTTPError as e:
+        e.close()
+        ok = False
+    except (urllib.error.URLError, OSError, ValueError):
+        ok = False
+    return ok, (time.perf_counter() - start) * 1000.0
+
+
+def run_probes(apis: List[dict], category: Optional[str] = None,
+               requests_per_api: int = 5, concurrency: int = 8,
+               timeout: float = 5.0, method: str = "GET",
+               headers: Optional[dict] = None,
+               url_for: Optional[Callable[[dict], str]] = None) -> Dict[str, dict]:
+    """
+    以有限并发探测一组API
+
+    所有API的全部请求共享同一个线程池，因此同时在途的请求数不超过 concurrency
+
+    Args:
+        apis: API条目列表
+        category: 只探测该分类（不区分大小写的子串匹配），None 表示全部
+        requests_per_api: 每个API发送的请求数
+        concurrency: 最大并发请求数
+        timeout: 单次请求超时（秒）
+        method: HTTP方法
+        headers: 额外请求头
+        url_for: 从条目得到探测地址的函数，默认使用条目的 url 字段
+
+    Returns:
+        API名称 -> 统计字典
+    """
+    if category:
+        apis = [api for api in apis if category.lower() in api['category'].lower()]
+    url_for = url_for or (lambda api: api['url'])
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = [
+            (api['name'], pool.submit(probe_once, url_for(api), method, timeout, headers))
+            for api in apis
+            for _ in range(requests_per_api)
+        ]
+        samples: Dict[str, Tuple[List[float], List[bool]]] = {}
+        for name, future in futures:
+            ok, latency = future.result()
+            latencies, outcomes = samples.setdefault(name, ([], []))
+            outcomes.append(ok)
+            if ok:
+                latencies.append(latency)
+
+    return {
+        name: summarize(latencies, outcomes.count(False), len(outcomes))
+        for name, (latencies, outcomes) in samples.items()
+    }
+
+
+# ============================================================
+# 历史记录
+# ============================================================
+
+class ProbeHistory:
+    """
+    每个API的滚动延迟历史
+
+    文件按列存储以保持紧凑：{名称: {"t": [...], "p50": [...], ...}}，
+    每个API最多保留 max_points 个数据点；历史文件损坏或无法读取时视为空，
+    下次 save() 时覆盖
+    """
+    def __init__(self, path: str = DEFAULT_HISTORY_FILE, max_points: int = 288):
+        self.path = Path(path)
+        self.max_points = max_points
+        self.series_by_name: Dict[str, dict] = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict):
+            self.series_by_name = data
+
+    def record(self, name: str, stats: dict):
+        """追加一个数据点，超出容量时丢弃最旧的点"""
+        series = self.series_by_name.setdefault(
+            name, {"t": [], **{field: [] for field in HISTORY_FIELDS}})
+        series["t"].append(stats["timestamp"])
+        for field in HISTORY_FIELDS:
+            series[field].append(stats[field])
+        overflow = len(series["t"]) - self.max_points
+        if overflow > 0:
+            for column in series.values():
+                del column[:overflow]
+
+    def record_all(self, results: Dict[str, dict]):
+        """追加一轮探测的全部结果"""
+        for name, stats in results.items():
+            self.record(name, stats)
+
+    def series(self, name: str) -> List[dict]:
+        """返回某个API的全部历史数据点"""
+        series = self.series_by_name.get(name)
+        if not series:
+            return []
+        return [
+            {"timestamp": t, **{field: series[field][i] for field in HISTORY_FIELDS}}
+            for i, t in enumerate(series["t"])
+        ]
+
+    def latest(self, name: str) -> Optional[dict]:
+        """返回某个API最近一次的统计，没有记录时返回 None"""
+        series = self.series_by_name.get(name)
+        if not series or not series["t"]:
+            return None
+        return {"timestamp": series["t"][-1],
+                **{field: series[field][-1] for field in HISTORY_FIELDS}}
+
+    def save(self):
+        """原子地写回历史文件"""
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.series_by_name, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+
+def format_stats(stats: dict) -> str:
+    """将统计字典格式化为一行文本"""
+    def _ms(value):
+        return "-" if value is None else f"{value:.1f}ms"
+
+    return (f"p50 {_ms(stats['p50'])} / p95 {_ms(stats['p95'])} / "
+            f"p99 {_ms(stats['p99'])} | 错误率 {stats['error_rate'] * 100:.1f}%")
+
+
+# ============================================================
+# 入口点
+# ============================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    try:
+        from utils.search_apis import load_all_apis
+    except ImportError:  # 作为脚本直接运行
+        from search_apis import load_all_apis
+
+    parser = argparse.ArgumentParser(description="探测API延迟与错误率")
+    parser.add_argument("--category", help="只探测该分类")
+    parser.add_argument("--requests", type=int, default=5, help="每个API的请求数")
+    parser.add_argument("--concurrency", type=int, default=8, help="最大并发请求数")
+    parser.add_argument("--timeout", type=float, default=5.0, help="单次请求超时（秒）")
+    parser.add_argument("--method", default="GET", help="HTTP方法")
+    parser.add_argument("--history", default=DEFAULT_HISTORY_FILE, help="历史文件路径")
+    args = parser.parse_args(argv)
+
+    results = run_probes(load_all_apis(), category=args.category,
+                         requests_per_api=args.requests, concurrency=args.concurrency,
+                         timeout=args.timeout, method=args.method)
+
+    history = ProbeHistory(args.history)
+    history.record_all(results)
+    history.save()
+
+    ranked = sorted(results.items(),
+                    key=lambda item: (item[1]['p50'] is None, item[1]['p50'] or 0))
+    for name, stats in ranked:
+        print(f"{name}: {format_stats(stats)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+"""
+健康感知的服务商选择与故障转移
+
+在同一分类的多个服务商之间，按实时统计为每个请求挑选“当前最好的”一个：
+- 延迟和错误率按时间指数衰减（半衰期可配置），旧数据自动淡出
+- 每个服务商一个熔断器（closed / open / half-open），熔断期间直接跳过
+- 请求失败时立即切换到下一个候选，不做退避等待
+
+状态大小与服务商数量成正比；选择时只读取各服务商的状态，
+只有记录结果时才获取该服务商自己的锁
+"""
+
+import argparse
+import math
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Callable, Dict, Iterable, List, Optional
+
+try:
+    from utils.search_apis import load_all_apis
+except ImportError:  # 作为脚本直接运行
+    from search_apis import load_all_apis
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+DEFAULT_HALF_LIFE = 30.0        # 统计数据的半衰期（秒）
+DEFAULT_COOLDOWN = 10.0         # 熔断后多久允许试探（秒）
+DEFAULT_ERROR_THRESHOLD = 0.5   # 衰减错误率达到该值时熔断
+DEFAULT_MIN_WEIGHT = 5.0        # 按错误率熔断所需的最小（衰减后）样本量
+DEFAULT_MAX_CONSECUTIVE = 3     # 连续失败次数达到该值时熔断
+ERROR_PENALTY = 4.0             # 评分中错误率的惩罚系数
+
+
+class ProviderError(Exception):
+    """服务商调用失败，应当切换到下一个服务商"""
+    pass
+
+
+class ClientRequestError(Exception):
+    """请求本身有误（如 400/404），换服务商也无济于事，不计入健康统计"""
+    pass
+
+
+class AllProvidersFailed(Exception):
+    """所有候选服务商都不可用"""
+    def __init__(self, errors: Dict[str, str]):
+        self.errors = errors
+        detail = "; ".join(f"{name}: {error}" for name, error in errors.items())
+        super().__init__(f"所有服务商均不可用 ({detail or '无可用候选'})")
+
+
+# ============================================================
+# 单个服务商的健康状态
+# ============================================================
+
+class ProviderHealth:
+    """
+    单个服务商的衰减统计和熔断器
+
+    weight、latency_sum、error_sum 是按时间指数衰减的累计量，
+    平均延迟 = latency_sum / weight，错误率 = error_sum / weight
+    """
+    __slots__ = ('name', 'entry', 'weight', 'latency_sum', 'error_sum', 'updated_at',
+                 'consecutive_failures', 'state', 'opened_at', 'trial_in_flight', '_lock')
+
+    def __init__(self, name: str, entry: Optional[dict] = None):
+        self.name = name
+        self.entry = entry
+        self.weight = 0.0
+        self.latency_sum = 0.0
+        self.error_sum = 0.0
+        self.updated_at = None
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def latency_ms(self) -> Optional[float]:
+        weight = self.weight
+        return self.latency_sum / weight if weight else None
+
+    @property
+    def error_rate(self) -> float:
+        weight = self.weight
+        return self.error_sum / weight if weight else 0.0
+
+    def score(self) -> float:
+        """期望代价，越小越好；没有样本的服务商为 0，会被优先尝试"""
+        latency = self.latency_ms
+        if latency is None:
+            return 0.0
+        return latency * (1.0 + ERROR_PENALTY * self.error_rate)
+
+
+# ============================================================
+# 选择器
+# ============================================================
+
+class ProviderSelector:
+    """
+    按健康状况为每个请求排列候选服务商
+
+    Args:
+        providers: 服务商名称，或带 name 字段的目录条目
+        half_life: 统计半衰期（秒）
+        cooldown: 熔断持续时间（秒）
+        error_threshold: 熔断的衰减错误率阈值
+        min_weight: 按错误率熔断所需的最小样本量
+        max_consecutive_failures: 熔断的连续失败次数
+        clock: 时钟函数，测试时可替换
+    """
+    def __init__(self, providers: Iterable, half_life: float = DEFAULT_HALF_LIFE,
+                 cooldown: float = DEFAULT_COOLDOWN,
+                 error_threshold: float = DEFAULT_ERROR_THRESHOLD,
+                 min_weight: float = DEFAULT_MIN_WEIGHT,
+                 max_consecutive_failures: int = DEFAULT_MAX_CONSECUTIVE,
+                 clock: Callable[[], float] = time.monotonic):
+        self.health: Dict[str, ProviderHealth] = {}
+        for provider in providers:
+            if isinstance(provider, str):
+                self.health[provider] = ProviderHealth(provider)
+            else:
+                self.health[provider['name']] = ProviderHealth(provider['name'], provider)
+        if not self.health:
+            raise ValueError("至少需要一个服务商")
+        self.decay_rate = math.log(2) / half_life
+        self.cooldown = cooldown
+        self.error_threshold = error_threshold
+        self.min_weight = min_weight
+        self.max_consecutive_failures = max_consecutive_failures
+        self.clock = clock
+
+    def _available(self, health: ProviderHealth, now: float) -> bool:
+        state = health.state
+        if state == CLOSED:
+            return True
+        if state == OPEN:
+            return now - health.opened_at >= self.cooldown
+        return not health.trial_in_flight
+
+    def candidates(self) -> List[str]:
+        """
+        当前可用的服务商（不加锁）
+
+        熔断冷却结束、等待试探的服务商排在最前，以便尽快发现其恢复；
+        其余按评分从好到差排列
+        """
+        now = self.clock()
+        available = [h for h in self.health.values() if self._available(h, now)]
+        available.sort(key=lambda h: (h.state == CLOSED, h.score()))
+        return [h.name for h in available]
+
+    def acquire(self, name: str) -> bool:
+        """
+        请求前调用：熔断中的服务商只放行一个试探请求
+
+        Returns:
+            是否可以向该服务商发送请求
+        """
+        health = self.health[name]
+        if health.state == CLOSED:
+            return True
+        with health._lock:
+            if health.state == OPEN and self.clock() - health.opened_at >= self.cooldown:
+                health.state = HALF_OPEN
+                health.trial_in_flight = False
+            if health.state == HALF_OPEN and not health.trial_in_flight:
+                health.trial_in_flight = True
+                return True
+            return health.state == CLOSED
+
+    def record(self, name: str, ok: bool, latency_ms: float):
+        """记录一次请求的结果"""
+        health = self.health[name]
+        with health._lock:
+            now = self.clock()
+            if health.updated_at is not None:
+                decay = math.exp(-self.decay_rate * max(0.0, now - health.updated_at))
+                health.weight *= decay
+                health.latency_sum *= decay
+                health.error_sum *= decay
+            health.updated_at = now
+            health.weight += 1.0
+            health.latency_sum += latency_ms
+            if ok:
+                health.consecutive_failures = 0
+            else:
+                health.error_sum += 1.0
+                health.consecutive_failures += 1
+
+            if health.state == HALF_OPEN:
+                health.trial_in_flight = False
+                if ok:
+                    # 试探成功：恢复服务，清除熔断前的错误记录
+                    health.state = CLOSED
+                    health.error_sum = 0.0
+                else:
+                    self._trip(health, now)
+            elif health.state == CLOSED and not ok:
+                if (health.consecutive_failures >= self.max_consecutive_failures or
+                        (health.weight >= self.min_weight and
+                         health.error_sum / health.weight >= self.error_threshold)):
+                    self._trip(health, now)
+
+    def _trip(self, health: ProviderHealth, now: float):
+        health.state = OPEN
+        health.opened_at = now
+
+    def stats(self) -> Dict[str, dict]:
+        """各服务商的当前状态"""
+        result = {}
+        for name, health in self.health.items():
+            latency = health.latency_ms
+            result[name] = {
+                "state": health.state,
+                "latency_ms": round(latency, 2) if latency is not None else None,
+                "error_rate": round(health.error_rate, 4),
+                "weight": round(health.weight, 2),
+            }
+        return result
+
+
+# ============================================================
+# 故障转移客户端
+# ============================================================
+
+class FailoverClient:
+    """
+    按选择器的排序依次尝试服务商，直到有一个成功
+
+    call(entry, *args, **kwargs) 负责实际调用，失败时抛出 ProviderError
+    （或其他异常，同样视为服务商故障）；ClientRequestError 直接向上抛出
+    """
+    def __init__(self, selector: ProviderSelector, call: Callable,
+                 max_attempts: Optional[int] = None):
+        self.selector = selector
+        self.call = call
+        self.max_attempts = max_attempts
+
+    def request(self, *args, **kwargs):
+        """
+        发送请求
+
+        Returns:
+            (服务商名称, call 的返回值)
+
+        Raises:
+            AllProvidersFailed: 所有候选都失败或处于熔断中
+        """
+        errors: Dict[str, str] = {}
+        attempts = 0
+        for name in self.selector.candidates():
+            if self.max_attempts is not None and attempts >= self.max_attempts:
+                break
+            if not self.selector.acquire(name):
+                continue
+            attempts += 1
+            health = self.selector.health[name]
+            start = time.perf_counter()
+            try:
+                result = self.call(health.entry or {"name": name}, *args, **kwargs)
+            except ClientRequestError:
+                if health.state == HALF_OPEN:
+                    with health._lock:
+                        health.trial_in_flight = False
+                raise
+            except Exception as e:
+                self.selector.record(name, False, (time.perf_counter() - start) * 1000.0)
+                errors[name] = str(e) or type(e).__name__
+                continue
+            self.selector.record(name, True, (time.perf_counter() - start) * 1000.0)
+            return name, result
+        raise AllProvidersFailed(errors)
+
+
+def make_http_call(url_for: Callable[[dict], str], timeout: float = 2.0,
+                   headers_for: Optional[Callable[[dict], dict]] = None) -> Callable:
+    """
+    创建基于 HTTP GET 的调用函数
+
+    Args:
+        url_for: 由条目（及请求参数）生成请求地址，签名 url_for(entry, *args, **kwargs)
+        timeout: 单个服务商的超时（秒），决定慢服务商最多拖延多久才切换
+        headers_for: 由条目生成请求头（如认证信息）
+
+    Returns:
+        可传给 FailoverClient 的 call 函数，返回响应体 bytes
+    """
+    def call(entry, *args, **kwargs):
+        headers = headers_for(entry) if headers_for else {}
+        request = urllib.request.Request(url_for(entry, *args, **kwargs), headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return response.read()
+        except urllib.error.HTTPError as e:
+            e.close()
+            if 400 <= e.code < 500 and e.code not in (408, 429):
+                raise ClientRequestError(f"请求无效 ({e.code})")
+            raise ProviderError(f"HTTP {e.code}")
+        except (urllib.error.URLError, OSError) as e:
+            raise ProviderError(str(getattr(e, 'reason', e)))
+
+    return call
+
+
+def selector_for_category(apis: List[dict], category: str, **options) -> ProviderSelector:
+    """
+    为目录中的某个分类创建选择器
+
+    Args:
+        apis: API条目列表
+        category: 分类名（见 categories/categories.md），不区分大小写
+        options: 传给 ProviderSelector 的参数
+    """
+    entries = [api for api in apis if api['category'].lower() == category.lower()]
+    if not entries:
+        raise ValueError(f"分类中没有服务商: {category}")
+    return ProviderSelector(entries, **options)
+
+
+# ============================================================
+# 入口点
+# ============================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="按健康状况轮流请求某个分类中的服务商")
+    parser.add_argument("category", help="分类名，如 \"Weather APIs\"")
+    parser.add_argument("--requests", type=int, default=20, help="请求次数")
+    parser.add_argument("--timeout", type=float, default=2.0, help="单个服务商的超时（秒）")
+    args = parser.parse_args(argv)
+
+    selector = selector_for_category(load_all_apis(), args.category)
+    client = FailoverClient(selector, make_http_call(lambda entry: entry['url'],
+                                                     timeout=args.timeout))
+    for _ in range(args.requests):
+        try:
+            name, _ = client.request()
+            print(f"[OK] {name}")
+        except AllProvidersFailed as e:
+            print(f"[FAIL] {e}")
+    for name, stats in selector.stats().items():
+        latency = f"{stats['latency_ms']}ms" if stats['latency_ms'] is not None else "-"
+        print(f"{name}: {stats['state']}, 延迟 {latency}, 错误率 {stats['error_rate']:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+查询结果缓存
+
+有界的 LRU 缓存，键为规范化后的查询词和过滤条件；
+缓存与目录版本号绑定，目录重新加载（版本号变大）时整体失效
+"""
+
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+
+def normalize_query(text) -> str:
+    """查询词规范化：全角转半角、统一小写、合并空白"""
+    if text is None:
+        return ""
+    return ' '.join(unicodedata.normalize('NFKC', str(text)).lower().split())
+
+
+def make_key(kind: str, query=None, **filters) -> tuple:
+    """
+    生成缓存键
+
+    Args:
+        kind: 查询类型，如 search / category / query
+        query: 查询词
+        filters: 其他过滤条件，顺序无关
+
+    Returns:
+        可哈希的缓存键
+    """
+    return (kind, normalize_query(query), tuple(sorted(filters.items())))
+
+
+class QueryCache:
+    """
+    线程安全的 LRU 查询结果缓存
+
+    缓存的结果应当是不可变对象（如元组），命中时直接返回同一个对象
+    """
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self, version) -> bool:
+        """在锁内调用；版本变新时清空缓存，返回该版本是否可以使用缓存"""
+        if version == self._version:
+            return True
+        if self._version is None or version > self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+            return True
+        return False  # 旧快照上的查询不读写缓存
+
+    def get_or_compute(self, key: Hashable, version, compute: Callable[[], object]):
+        """
+        返回缓存的结果，未命中时调用 compute 计算并缓存
+
+        Args:
+            key: 缓存键，见 make_key
+            version: 目录版本号
+            compute: 计算结果的无参函数
+        """
+        with self._lock:
+            usable = self._check_version(version)
+            if usable and key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            if usable and self._check_version(version):
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """命中统计"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "size": len(self._entries),
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "version": self._version,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,59 @@
+"""
+速率限制工具
+
+提供线程安全的令牌桶，用于按提供商限制上游请求速率
+"""
+
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    线程安全的令牌桶
+
+    以 rate 个/秒的速度补充令牌，最多累积 capacity 个；
+    每次上游请求前获取一个令牌，令牌不足时阻塞等待
+    """
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError(f"rate 必须为正数，当前值: {rate}")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """尝试立即获取令牌，成功返回 True"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        获取令牌，必要时阻塞
+
+        令牌在锁内预扣（可以为负），等待时间由欠额决定，
+        因此并发调用者按到达顺序排队而不会互相争抢
+
+        Returns:
+            实际等待的秒数
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
@@ -4,55 +4,152 @@ API 搜索工具
 此脚本允许用户搜索特定的API或按分类浏览API
 """
 
-import json
 import os
-from pathlib import Path
+import threading
+from collections import OrderedDict
+from itertools import islice
 
+try:
+    from utils.autocomplete import Autocompleter
+    from utils.overlay import load_overlay, roots_from_env
+    from utils.probe_apis import ProbeHistory, format_stats
+    from utils.search_index import SearchIndex
+except ImportError:  # 作为脚本直接运行
+    from autocomplete import Autocompleter
+    from overlay import load_overlay, roots_from_env
+    from probe_apis import ProbeHistory, format_stats
+    from search_index import SearchIndex
 
-def load_all_apis():
-    """加载所有API数据"""
-    api_dir = Path("api")
-    all_apis = []
-    
-    for json_file in api_dir.rglob("*.json"):
-        with open(json_file, 'r', encoding='utf-8') as f:
-            apis = json.load(f)
-            # 添加文件来源信息
-            for api in apis:
-                api['source_file'] = str(json_file)
-            all_apis.extend(apis)
-    
+
+PAGE_SIZE = 10  # 交互模式下每页显示的API数量
+INDEX_CACHE_SIZE = 4  # 缓存搜索索引的API列表个数
+
+_indexes: "OrderedDict[int, SearchIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def load_all_apis(api_dir="api"):
+    """
+    加载所有API数据
+
+    api_dir 可以是目录列表，按顺序叠加，靠后目录中的同名API覆盖靠前的（见 overlay.py）
+    """
+    all_apis, _ = load_overlay(api_dir)
     return all_apis
 
 
+def get_search_index(apis):
+    """
+    返回 apis 的搜索索引
+
+    每个列表只在第一次搜索时分析一次（拼音、分词等），之后的查询直接复用；
+    按列表对象缓存最近 INDEX_CACHE_SIZE 个，列表的元素被增删或替换后自动重建
+    """
+    key = id(apis)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+    if (index is not None and len(index.apis) == len(apis) and
+            all(a is b for a, b in zip(index.apis, apis))):
+        return index
+
+    index = SearchIndex(apis)
+    with _indexes_lock:
+        _indexes[key] = index
+        _indexes.move_to_end(key)
+        while len(_indexes) > INDEX_CACHE_SIZE:
+            _indexes.popitem(last=False)
+    return index
+
+
+def _query_matcher(query, apis):
+    matches = get_search_index(apis).matcher(query)
+    return lambda i, api: matches(i)
+
+
+def _category_matcher(category):
+    category = category.lower()
+    return lambda i, api: category in api['category'].lower()
+
+
+def _iter_matches(predicate, apis, offset=0, limit=None):
+    matches = (api for i, api in enumerate(apis) if predicate(i, api))
+    stop = None if limit is None else offset + limit
+    return islice(matches, offset, stop)
+
+
+def iter_search_apis(query, apis, offset=0, limit=None):
+    """
+    根据查询词搜索API（惰性生成）
+
+    名称、描述或分类包含查询词，或按搜索索引匹配（拼音、首字母、中文分词、别名），
+    规则见 SearchIndex.matcher；找到 offset + limit 个结果后立即停止扫描
+    """
+    return _iter_matches(_query_matcher(query, apis), apis, offset, limit)
+
+
+def iter_filter_by_category(category, apis, offset=0, limit=None):
+    """按分类过滤API（惰性生成），找到 offset + limit 个结果后立即停止扫描"""
+    return _iter_matches(_category_matcher(category), apis, offset, limit)
+
+
 def search_apis(query, apis):
     """根据查询词搜索API"""
-    query = query.lower()
-    results = []
-    
-    for api in apis:
-        if (query in api['name'].lower() or 
-            query in api['description'].lower() or 
-            query in api['category'].lower()):
-            results.append(api)
-    
-    return results
+    return list(iter_search_apis(query, apis))
 
 
 def filter_by_category(category, apis):
     """按分类过滤API"""
-    category = category.lower()
+    return list(iter_filter_by_category(category, apis))
+
+
+def _page(predicate, apis, cursor, page_size):
     results = []
-    
-    for api in apis:
-        if category in api['category'].lower():
-            results.append(api)
-    
-    return results
+    for i in range(cursor or 0, len(apis)):
+        if predicate(i, apis[i]):
+            if len(results) == page_size:
+                return results, i
+            results.append(apis[i])
+    return results, None
+
+
+def search_page(query, apis, cursor=None, page_size=PAGE_SIZE):
+    """
+    按游标分页搜索
+
+    游标是下一页第一个结果在 apis 中的位置，翻页时从该位置继续扫描，
+    不必重新跳过前面的结果
+
+    Returns:
+        (本页结果, 下一页的游标；没有下一页时为 None)
+    """
+    return _page(_query_matcher(query, apis), apis, cursor, page_size)
+
+
+def category_page(category, apis, cursor=None, page_size=PAGE_SIZE):
+    """按游标分页浏览分类，返回值同 search_page"""
+    return _page(_category_matcher(category), apis, cursor, page_size)
+
 
+def iter_pages(results, page_size=PAGE_SIZE):
+    """
+    将结果流切分为页，逐页生成 (本页结果, 是否还有下一页)
 
-def display_api(api):
-    """显示API详细信息"""
+    只比当前页多读取一个结果用于判断是否还有下一页
+    """
+    results = iter(results)
+    page = list(islice(results, page_size))
+    while page:
+        lookahead = list(islice(results, 1))
+        yield page, bool(lookahead)
+        if not lookahead:
+            return
+        page = lookahead + list(islice(results, page_size - 1))
+
+
+def display_api(api, stats=None):
+    """显示API详细信息，stats 为该API最近一次的探测统计"""
     print(f"\n名称: {api['name']}")
     print(f"描述: {api['description']}")
     print(f"认证: {api['auth'] or 'None'}")
@@ -62,17 +159,59 @@ def display_api(api):
     print(f"URL: {api['url']}")
     if 'comment' in api:
         print(f"备注: {api['comment']}")
+    if stats:
+        print(f"延迟: {format_stats(stats)}")
     print("-" * 50)
 
 
+def show_pages(results, history, page_size=PAGE_SIZE):
+    """分页显示结果：输入 n 显示下一页，输入其他内容返回菜单"""
+    for number, (page, has_more) in enumerate(iter_pages(results, page_size), 1):
+        for api in page:
+            display_api(api, history.latest(api['name']))
+        if not has_more:
+            return
+        if input(f"\n第 {number} 页，n 下一页，q 返回: ").strip().lower() != 'n':
+            return
+
+
+def install_completer(completer):
+    """在支持 readline 的终端中启用 Tab 键补全"""
+    try:
+        import readline
+    except ImportError:  # Windows 等平台没有 readline
+        return False
+    
+    matches = []
+    
+    def complete(text, state):
+        if state == 0:
+            matches[:] = completer.complete(text)
+        return matches[state] if state < len(matches) else None
+    
+    readline.set_completer_delims('')
+    readline.set_completer(complete)
+    readline.parse_and_bind('tab: complete')
+    return True
+
+
 def main():
     print("Public ST APIs 搜索工具")
     print("=" * 30)
     
-    # 加载所有API
-    all_apis = load_all_apis()
+    # 加载所有API（ST_API_ROOTS 可指定叠加的私有目录）
+    all_apis = load_all_apis(roots_from_env())
     print(f"已加载 {len(all_apis)} 个API")
     
+    # 加载探测历史（由 probe_apis.py 生成）
+    history = ProbeHistory()
+    
+    # 搜索词支持 Tab 补全API名称和分类
+    install_completer(Autocompleter(all_apis))
+    
+    # 预先构建搜索索引，支持拼音（如 caiyun、gaode）和中文分词查询
+    get_search_index(all_apis)
+    
     while True:
         print("\n请选择操作:")
         print("1. 搜索API")
@@ -85,11 +224,10 @@ def main():
         if choice == '1':
             query = input("输入搜索词: ").strip()
             if query:
-                results = search_apis(query, all_apis)
-                print(f"\n找到 {len(results)} 个匹配的API:")
+                matches = search_apis(query, all_apis)
+                print(f"\n找到 {len(matches)} 个匹配的API:")
                 
-                for api in results:
-                    display_api(api)
+                show_pages(iter(matches), history)
         
         elif choice == '2':
             print("\n可用分类:")
@@ -102,11 +240,9 @@ def main():
                 cat_num = int(cat_choice) - 1
                 selected_cat = sorted(categories)[cat_num]
                 
-                results = filter_by_category(selected_cat, all_apis)
-                print(f"\n分类 '{selected_cat}' 下的 {len(results)} 个API:")
+                print(f"\n分类 '{selected_cat}' 下的API:")
                 
-                for api in results:
-                    display_api(api)
+                show_pages(iter_filter_by_category(selected_cat, all_apis), history)
                     
             except (ValueError, IndexError):
                 print("无效的选择")
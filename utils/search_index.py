@@ -0,0 +1,243 @@
+"""
+API 搜索索引
+
+在加载时为目录构建倒排索引，查询只做索引查找，不做逐条转换：
+- 中文文本按词典做正向最大匹配分词，并索引单字和双字
+- 中文词的全拼和首字母（如 彩云 -> caiyun / cy）
+- 英文单词、驼峰拆分（OpenStreetMap -> open street map）及常见别名（高德 -> amap）
+"""
+
+import re
+import unicodedata
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+try:
+    from utils.pinyin_data import PINYIN
+except ImportError:  # 作为脚本直接运行
+    from pinyin_data import PINYIN
+
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:  # 可选依赖，内置拼音表未收录的汉字才会用到
+    lazy_pinyin = None
+
+
+CJK_RUN = re.compile(r'[㐀-鿿]+')
+LATIN_WORD = re.compile(r'[a-z0-9]+')
+CAMEL_PART = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+')
+PREFIX_END = '\U0010ffff'
+MAX_WORD_LENGTH = 5
+INDEXED_FIELDS = ('name', 'description', 'category')
+
+# 分词词典：地理/时空服务领域的常用词
+LEXICON = frozenset("""
+地图 天气 地点 搜索 服务 地理 编码 地理编码 逆地理编码 反向地理编码 路径 规划 路径规划 路线
+导航 定位 位置 坐标 瓦片 矢量 卫星 影像 卫星影像 交通 路况 公交 驾车 步行 骑行 货车 预报
+天气预报 实时 历史 数据 空气 质量 空气质量 开发 平台 开放 接口 免费 商业 用途 密钥 申请
+注册 应用 高德 百度 腾讯 谷歌 彩云 和风 心知 兴趣点 周边 行政区 全球 支持 提供 查询 详情
+距离 矩阵 围栏 地理围栏 空间 分析 智能 时空 样式 移动端 小程序 地址 解析 服务商 分类
+""".split())
+
+# 别名：品牌的英文名、常见缩写
+ALIASES = {
+    "高德": ("amap", "autonavi"),
+    "百度": ("baidu",),
+    "腾讯": ("tencent", "qq"),
+    "和风": ("qweather", "hefeng"),
+    "心知": ("seniverse", "xinzhi"),
+    "彩云": ("caiyun",),
+    "谷歌": ("google",),
+    "openstreetmap": ("osm",),
+}
+
+
+# ============================================================
+# 文本分析
+# ============================================================
+
+def normalize_text(text: str) -> str:
+    """全角转半角并统一小写"""
+    return unicodedata.normalize('NFKC', text).lower()
+
+
+def to_pinyin(text: str) -> List[str]:
+    """
+    将汉字转换为拼音音节列表
+
+    优先使用内置拼音表，未收录的汉字在安装了 pypinyin 时由其补全，否则跳过
+    """
+    syllables = []
+    for char in text:
+        syllable = PINYIN.get(char)
+        if syllable is None and lazy_pinyin is not None:
+            syllable = lazy_pinyin(char)[0]
+        if syllable:
+            syllables.append(syllable)
+    return syllables
+
+
+def segment(run: str) -> List[str]:
+    """
+    对连续汉字做正向最大匹配分词
+
+    词典中没有的连续单字合并为一个词，如 彩云天气 -> [彩云, 天气]
+    """
+    words = []
+    unknown = ""
+    i = 0
+    while i < len(run):
+        for length in range(min(MAX_WORD_LENGTH, len(run) - i), 1, -1):
+            if run[i:i + length] in LEXICON:
+                if unknown:
+                    words.append(unknown)
+                    unknown = ""
+                words.append(run[i:i + length])
+                i += length
+                break
+        else:
+            unknown += run[i]
+            i += 1
+    if unknown:
+        words.append(unknown)
+    return words
+
+
+def _pinyin_tokens(word: str) -> List[str]:
+    syllables = to_pinyin(word)
+    if not syllables:
+        return []
+    return ["".join(syllables), "".join(s[0] for s in syllables)]
+
+
+def analyze(text: str) -> Set[str]:
+    """将一段文本分析为索引词集合"""
+    tokens: Set[str] = set()
+    for part in CAMEL_PART.findall(unicodedata.normalize('NFKC', text)):
+        tokens.add(part.lower())
+
+    normalized = normalize_text(text)
+    for word in LATIN_WORD.findall(normalized):
+        tokens.add(word)
+        tokens.update(ALIASES.get(word, ()))
+
+    for run in CJK_RUN.findall(normalized):
+        tokens.add(run)
+        tokens.update(run)
+        tokens.update(run[i:i + 2] for i in range(len(run) - 1))
+        tokens.update(_pinyin_tokens(run))
+        for word in segment(run):
+            tokens.add(word)
+            tokens.update(_pinyin_tokens(word))
+            tokens.update(ALIASES.get(word, ()))
+    return tokens
+
+
+def entry_tokens(api) -> Set[str]:
+    """条目的全部索引词：名称、描述、分类的分析结果，以及名称的英文连写"""
+    tokens: Set[str] = set()
+    for field in INDEXED_FIELDS:
+        tokens |= analyze(api.get(field) or "")
+    compact = "".join(LATIN_WORD.findall(normalize_text(api['name'])))
+    if compact:
+        tokens.add(compact)
+    return tokens
+
+
+# ============================================================
+# 索引
+# ============================================================
+
+class SearchIndex:
+    """
+    API目录的倒排索引
+
+    postings[i] 是 tokens[i] 出现的条目序号（升序）；
+    tokens 有序，英文/拼音查询词按前缀在其上二分查找。
+    texts[i] 是第 i 个条目小写后的名称、描述和分类，供子串匹配使用
+    """
+    def __init__(self, apis: Iterable[dict]):
+        self.apis = list(apis)
+        index: Dict[str, List[int]] = {}
+        for i, api in enumerate(self.apis):
+            for token in entry_tokens(api):
+                index.setdefault(token, []).append(i)
+        self.tokens: List[str] = sorted(index)
+        self.postings = [tuple(index[token]) for token in self.tokens]
+        self.texts = ["\0".join((api.get(field) or "").lower() for field in INDEXED_FIELDS)
+                      for api in self.apis]
+
+    def _exact(self, token: str) -> Set[int]:
+        i = bisect_left(self.tokens, token)
+        if i < len(self.tokens) and self.tokens[i] == token:
+            return set(self.postings[i])
+        return set()
+
+    def _prefix(self, prefix: str) -> Set[int]:
+        lo = bisect_left(self.tokens, prefix)
+        hi = bisect_left(self.tokens, prefix + PREFIX_END, lo)
+        matched: Set[int] = set()
+        for postings in self.postings[lo:hi]:
+            matched.update(postings)
+        return matched
+
+    def _match_all(self, words: List[str], runs: List[str]) -> Optional[Set[int]]:
+        result: Optional[Set[int]] = None
+        for word in words:
+            hits = self._prefix(word)
+            result = hits if result is None else result & hits
+            if not result:
+                return set()
+        for run in runs:
+            if len(run) == 1:
+                hits = self._prefix(run)
+            else:
+                hits = self._exact(run[:2])
+                for i in range(1, len(run) - 1):
+                    hits &= self._exact(run[i:i + 2])
+            result = hits if result is None else result & hits
+            if not result:
+                return set()
+        return result
+
+    def lookup(self, query: str) -> List[int]:
+        """
+        查询匹配的条目序号
+
+        英文和拼音词按前缀匹配，中文按双字匹配，多个词之间为“与”关系；
+        多个英文词无结果时再按连写重试（cai yun -> caiyun）
+
+        Returns:
+            升序排列的条目序号
+        """
+        normalized = normalize_text(query)
+        words = LATIN_WORD.findall(normalized)
+        runs = CJK_RUN.findall(normalized)
+        if not words and not runs:
+            return []
+        result = self._match_all(words, runs)
+        if not result and len(words) > 1:
+            result = self._match_all(["".join(words)], runs)
+        return sorted(result or ())
+
+    def matcher(self, query: str) -> Callable[[int], bool]:
+        """
+        返回按条目序号判断的匹配函数，这是各处搜索共用的匹配规则：
+        名称、描述或分类包含查询词（忽略大小写），或按 lookup 匹配（拼音、首字母、分词、别名）
+
+        索引只在创建匹配函数时查找一次，之后判断单个条目只需一次集合查询和一次子串查找，
+        因此可以用于惰性扫描
+        """
+        needle = query.lower()
+        hits = frozenset(self.lookup(query))
+        texts = self.texts
+        return lambda i: i in hits or needle in texts[i]
+
+    def find(self, query: str) -> List[int]:
+        """按 matcher 的规则查询匹配的条目序号，升序排列"""
+        matches = self.matcher(query)
+        return [i for i in range(len(self.apis)) if matches(i)]
+
+    def search(self, query: str) -> List[dict]:
+        """查询匹配的API条目，保持目录顺序"""
+        return [self.apis[i] for i in self.find(query)]
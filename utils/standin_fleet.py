@@ -0,0 +1,418 @@
+"""
+本地替身服务商集群
+
+读取目录，为每个API条目启动一个本地 asyncio HTTP 服务器，模拟其认证方式：
+- apiKey: 需要查询参数 key（或 apikey / api_key / ak / appid）或请求头 X-API-Key
+- OAuth: 需要请求头 Authorization: Bearer <token>
+- 无认证: 直接响应
+
+可注入延迟、错误率和限流（超出速率时返回 429），并提供异步压测驱动，
+统计吞吐量和 p50/p95/p99 延迟，用于在无网络环境下可重复地做性能测试
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+try:
+    from utils.probe_apis import summarize
+    from utils.rate_limit import TokenBucket
+    from utils.search_apis import load_all_apis
+    from utils.tile_cache import provider_slug
+except ImportError:  # 作为脚本直接运行
+    from probe_apis import summarize
+    from rate_limit import TokenBucket
+    from search_apis import load_all_apis
+    from tile_cache import provider_slug
+
+
+API_KEY_PARAMS = ('key', 'apikey', 'api_key', 'ak', 'appid')
+MAX_HEADER_LINES = 100
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 401: "Unauthorized",
+               429: "Too Many Requests", 503: "Service Unavailable"}
+
+
+class StandinConfig:
+    """
+    替身服务器的行为
+
+    Args:
+        latency_ms: 每个请求的固定延迟（毫秒）
+        jitter_ms: 在固定延迟上叠加的 [0, jitter_ms) 随机延迟
+        error_rate: 返回 503 的概率
+        rate_limit: 每秒允许的请求数，超出返回 429；None 表示不限流
+        burst: 限流的突发容量，默认等于 rate_limit
+        seed: 随机数种子，便于复现（与服务商名称组合，各服务商的序列互不相同）
+    """
+    __slots__ = ('latency_ms', 'jitter_ms', 'error_rate', 'rate_limit', 'burst', 'seed')
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 rate_limit: Optional[float] = None, burst: Optional[float] = None,
+                 seed: Optional[int] = None):
+        if not 0.0 <= error_rate <= 1.0:
+            raise ValueError(f"error_rate 必须在 0 到 1 之间，当前值: {error_rate}")
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.seed = seed
+
+
+# ============================================================
+# 单个替身服务器
+# ============================================================
+
+class StandinProvider:
+    """
+    模拟单个服务商的 HTTP 服务器
+
+    任意路径都返回 JSON: {"provider": 名称, "path": 路径, "query": 查询参数}；
+    凭据由名称确定性生成，见 credentials()。auth 取值不区分大小写（apiKey、OAuth）
+    """
+    def __init__(self, entry: dict, config: Optional[StandinConfig] = None):
+        self.entry = entry
+        self.name = entry['name']
+        self.auth = entry.get('auth')
+        self._auth_kind = (self.auth or '').lower()
+        self.config = config or StandinConfig()
+        self.api_key = f"key-{provider_slug(self.name)}"
+        self.token = f"token-{provider_slug(self.name)}"
+        # 每个服务商使用独立的随机序列，否则同一种子下各服务商会同时出错
+        seed = self.config.seed
+        self._random = random.Random(None if seed is None else f"{seed}:{self.name}")
+        self._bucket = (TokenBucket(self.config.rate_limit, self.config.burst)
+                        if self.config.rate_limit else None)
+        self._server = None
+        self.port = None
+        self.stats = {"requests": 0, "ok": 0, "unauthorized": 0, "rate_limited": 0, "errors": 0}
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def credentials(self) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """返回通过认证所需的 (查询参数, 请求头)"""
+        if self._auth_kind == "apikey":
+            return {"key": self.api_key}, {}
+        if self._auth_kind == "oauth":
+            return {}, {"Authorization": f"Bearer {self.token}"}
+        return {}, {}
+
+    def request_target(self, path: str = "/") -> str:
+        """带认证参数的请求路径"""
+        params, _ = self.credentials()
+        return f"{path}?{urlencode(params)}" if params else path
+
+    def authorized(self, query: Dict[str, List[str]], headers: Dict[str, str]) -> bool:
+        if self._auth_kind == "apikey":
+            keys = [headers.get('x-api-key')]
+            keys += [v for param in API_KEY_PARAMS for v in query.get(param, ())]
+            return self.api_key in keys
+        if self._auth_kind == "oauth":
+            return headers.get('authorization') == f"Bearer {self.token}"
+        return True
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _respond(self, method: str, target: str, headers: Dict[str, str]) -> Tuple[int, dict]:
+        self.stats["requests"] += 1
+        parts = urlsplit(target)
+        query = parse_qs(parts.query)
+        if not self.authorized(query, headers):
+            self.stats["unauthorized"] += 1
+            return 401, {"error": "缺少或无效的凭据", "auth": self.auth}
+        if self._bucket is not None and not self._bucket.try_acquire():
+            self.stats["rate_limited"] += 1
+            return 429, {"error": "请求过于频繁"}
+
+        config = self.config
+        delay = config.latency_ms
+        if config.jitter_ms:
+            delay += self._random.random() * config.jitter_ms
+        if delay > 0:
+            await asyncio.sleep(delay / 1000.0)
+        if config.error_rate and self._random.random() < config.error_rate:
+            self.stats["errors"] += 1
+            return 503, {"error": "服务暂时不可用"}
+
+        self.stats["ok"] += 1
+        params = {k: v[0] for k, v in query.items() if k not in API_KEY_PARAMS}
+        return 200, {"provider": self.name, "path": parts.path, "query": params}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, _version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await _write_response(writer, 400, {"error": "请求行无效"}, keep_alive=False)
+                    break
+                headers = await _read_headers(reader)
+                length = int(headers.get('content-length') or 0)
+                if length:
+                    await reader.readexactly(length)
+
+                status, body = await self._respond(method, target, headers)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await _write_response(writer, status, body, keep_alive,
+                                      retry_after=status == 429, head=method == 'HEAD')
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+    headers = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        key, _, value = line.decode('latin-1').partition(':')
+        headers[key.strip().lower()] = value.strip()
+    return headers
+
+
+async def _write_response(writer: asyncio.StreamWriter, status: int, body: dict,
+                          keep_alive: bool, retry_after: bool = False, head: bool = False):
+    payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+    lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+             "Content-Type: application/json; charset=utf-8",
+             f"Content-Length: {len(payload)}",
+             f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    if retry_after:
+        lines.append("Retry-After: 1")
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + (b'' if head else payload))
+    await writer.drain()
+
+
+# ============================================================
+# 集群
+# ============================================================
+
+class StandinFleet:
+    """
+    目录中每个条目一个替身服务器
+
+    Args:
+        apis: API条目列表
+        config: 默认行为
+        overrides: 服务商名称 -> 该服务商的行为
+    """
+    def __init__(self, apis: List[dict], config: Optional[StandinConfig] = None,
+                 overrides: Optional[Dict[str, StandinConfig]] = None):
+        overrides = overrides or {}
+        self.providers: Dict[str, StandinProvider] = {}
+        for api in apis:
+            self.providers[api['name']] = StandinProvider(api, overrides.get(api['name'], config))
+        self._loop = None
+        self._thread = None
+
+    def __getitem__(self, name: str) -> StandinProvider:
+        return self.providers[name]
+
+    async def start(self):
+        await asyncio.gather(*(provider.start() for provider in self.providers.values()))
+
+    async def stop(self):
+        await asyncio.gather(*(provider.stop() for provider in self.providers.values()))
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    def start_in_thread(self) -> "StandinFleet":
+        """在后台线程的事件循环中运行集群，供同步客户端（如 urllib）使用"""
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.start(), self._loop).result()
+        return self
+
+    def stop_thread(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = self._thread = None
+
+    def catalog(self) -> List[dict]:
+        """url 替换为替身服务器地址（含认证参数）的目录副本，可直接交给其他工具"""
+        entries = []
+        for provider in self.providers.values():
+            entry = dict(provider.entry)
+            entry['url'] = provider.url + provider.request_target()
+            entries.append(entry)
+        return entries
+
+
+# ============================================================
+# 压测驱动
+# ============================================================
+
+async def _http_get(reader, writer, host: str, target: str, headers: Dict[str, str]) -> int:
+    lines = [f"GET {target} HTTP/1.1", f"Host: {host}"]
+    lines += [f"{key}: {value}" for key, value in headers.items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1'))
+    await writer.drain()
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("连接已关闭")
+    status = int(status_line.split()[1])
+    response_headers = await _read_headers(reader)
+    await reader.readexactly(int(response_headers.get('content-length') or 0))
+    if response_headers.get('connection', '').lower() == 'close':
+        raise ConnectionResetError("服务器关闭了连接")
+    return status
+
+
+async def drive_load(providers: List[StandinProvider], requests: int = 1000,
+                     concurrency: int = 16, path: str = "/", timeout: float = 5.0) -> dict:
+    """
+    对替身服务器发起压测
+
+    concurrency 个工作协程各自保持一条长连接，按轮询顺序请求各个服务商
+
+    Returns:
+        {"total": 汇总统计, "providers": {名称: 统计}}，统计包含
+        n / errors / error_rate / p50 / p95 / p99（见 probe_apis.summarize），
+        以及 throughput（请求/秒）和 status（状态码计数）
+    """
+    if not providers:
+        raise ValueError("没有可压测的服务商")
+    samples: Dict[str, List[float]] = {p.name: [] for p in providers}
+    errors: Dict[str, int] = {p.name: 0 for p in providers}
+    statuses: Dict[str, Dict[int, int]] = {p.name: {} for p in providers}
+    counter = iter(range(requests))
+
+    async def worker():
+        connections = {}
+        try:
+            for i in counter:
+                provider = providers[i % len(providers)]
+                _, headers = provider.credentials()
+                start = time.perf_counter()
+                try:
+                    if provider.name not in connections:
+                        connections[provider.name] = await asyncio.wait_for(
+                            asyncio.open_connection('127.0.0.1', provider.port), timeout)
+                    reader, writer = connections[provider.name]
+                    status = await asyncio.wait_for(
+                        _http_get(reader, writer, f"127.0.0.1:{provider.port}",
+                                  provider.request_target(path), headers), timeout)
+                except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                    connection = connections.pop(provider.name, None)
+                    if connection:
+                        connection[1].close()
+                    status = 0
+                latency_ms = (time.perf_counter() - start) * 1000.0
+                statuses[provider.name][status] = statuses[provider.name].get(status, 0) + 1
+                if status == 200:
+                    samples[provider.name].append(latency_ms)
+                else:
+                    errors[provider.name] += 1
+        finally:
+            for _, writer in connections.values():
+                writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    def _report(latencies, n_errors, status_counts):
+        total = len(latencies) + n_errors
+        stats = summarize(latencies, n_errors, total)
+        stats["throughput"] = round(total / elapsed, 1) if elapsed else 0.0
+        stats["status"] = dict(sorted(status_counts.items()))
+        return stats
+
+    all_statuses: Dict[int, int] = {}
+    for counts in statuses.values():
+        for status, count in counts.items():
+            all_statuses[status] = all_statuses.get(status, 0) + count
+    return {
+        "elapsed": round(elapsed, 3),
+        "total": _report([v for values in samples.values() for v in values],
+                         sum(errors.values()), all_statuses),
+        "providers": {name: _report(samples[name], errors[name], statuses[name])
+                      for name in samples},
+    }
+
+
+# ============================================================
+# 入口点
+# ============================================================
+
+async def _run(args) -> int:
+    apis = load_all_apis()
+    if args.category:
+        apis = [api for api in apis if args.category.lower() in api['category'].lower()]
+    config = StandinConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                           error_rate=args.error_rate, rate_limit=args.rate_limit, seed=args.seed)
+    async with StandinFleet(apis, config) as fleet:
+        if args.serve:
+            for provider in fleet.providers.values():
+                print(f"{provider.url}{provider.request_target()}  {provider.name} "
+                      f"({provider.auth or '无认证'})")
+            print("按 Ctrl+C 停止")
+            await asyncio.Event().wait()
+
+        report = await drive_load(list(fleet.providers.values()), args.requests, args.concurrency)
+        total = report["total"]
+        print(f"{total['n']} 个请求，耗时 {report['elapsed']}s，吞吐量 {total['throughput']} 请求/秒")
+        print(f"p50 {total['p50']}ms / p95 {total['p95']}ms / p99 {total['p99']}ms，"
+              f"错误率 {total['error_rate']:.1%}，状态码 {total['status']}")
+        if args.verbose:
+            for name, stats in report["providers"].items():
+                print(f"  {name}: p50 {stats['p50']}ms, p99 {stats['p99']}ms, "
+                      f"错误率 {stats['error_rate']:.1%}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="启动本地替身服务商集群并压测")
+    parser.add_argument("--category", help="只为该分类启动替身服务器")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="注入的固定延迟（毫秒）")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="注入的随机延迟上限（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回 503 的概率")
+    parser.add_argument("--rate-limit", type=float, help="每个服务商每秒允许的请求数")
+    parser.add_argument("--seed", type=int, help="随机数种子")
+    parser.add_argument("--requests", type=int, default=2000, help="压测请求总数")
+    parser.add_argument("--concurrency", type=int, default=32, help="并发连接数")
+    parser.add_argument("--serve", action="store_true", help="只启动集群，不压测")
+    parser.add_argument("-v", "--verbose", action="store_true", help="输出每个服务商的统计")
+    args = parser.parse_args(argv)
+    try:
+        return asyncio.run(_run(args))
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,429 @@
+"""
+地图瓦片缓存工具
+
+为 Mapping Services 分类中配置了 tile_url 的提供商提供 z/x/y 瓦片获取层：
+- 瓦片内容按 SHA-256 内容寻址存储在磁盘上，按总大小进行 LRU 淘汰
+- 过期瓦片通过 ETag / If-Modified-Since 进行条件请求重新验证
+- 支持按经纬度范围和缩放级别并发预取，并按提供商限速
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+try:
+    from utils.rate_limit import TokenBucket
+except ImportError:  # 作为脚本直接运行
+    from rate_limit import TokenBucket
+
+
+DEFAULT_CACHE_DIR = ".tile_cache"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+DEFAULT_RATE_LIMIT = 2.0
+ACCESS_WRITE_INTERVAL = 60.0    # 访问时间写回磁盘的最小间隔（秒）
+USER_AGENT = "public-st-apis-tile-cache/1.0"
+
+TileKey = Tuple[str, int, int, int]
+
+
+class TileFetchError(Exception):
+    """瓦片获取失败"""
+    pass
+
+
+# ============================================================
+# 瓦片坐标
+# ============================================================
+
+def lonlat_to_tile(lon: float, lat: float, zoom: int) -> Tuple[int, int]:
+    """
+    将经纬度转换为 Web Mercator 瓦片坐标
+
+    Args:
+        lon: 经度
+        lat: 纬度
+        zoom: 缩放级别
+
+    Returns:
+        (x, y)
+    """
+    n = 2 ** zoom
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tiles_in_bbox(min_lon: float, min_lat: float, max_lon: float, max_lat: float,
+                  zooms) -> Iterator[Tuple[int, int, int]]:
+    """
+    逐个生成覆盖经纬度范围的瓦片坐标
+
+    Args:
+        min_lon, min_lat, max_lon, max_lat: 经纬度范围
+        zooms: 缩放级别的可迭代对象
+
+    Yields:
+        (z, x, y)
+    """
+    for z in zooms:
+        x0, y0 = lonlat_to_tile(min_lon, max_lat, z)
+        x1, y1 = lonlat_to_tile(max_lon, min_lat, z)
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                yield z, x, y
+
+
+def provider_slug(name: str) -> str:
+    """
+    将提供商名称转换为可用作目录名的唯一标识
+
+    非 ASCII 字符会被丢弃（高德地图 JS API 与 百度地图 JS API 都只剩 js-api），
+    因此总是附加名称的 sha1 前缀以区分不同的提供商
+    """
+    slug = re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+    digest = hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]
+    return f"{slug}-{digest}" if slug else digest
+
+
+def load_tile_providers(apis) -> Dict[str, dict]:
+    """从API条目中挑出配置了 tile_url 的提供商"""
+    return {api['name']: api for api in apis if api.get('tile_url')}
+
+
+# ============================================================
+# 磁盘缓存
+# ============================================================
+
+class TileCache:
+    """
+    内容寻址的磁盘瓦片缓存
+
+    目录结构:
+        objects/<hash前2位>/<hash>         瓦片内容，相同内容只存一份
+        tiles/<提供商>/<z>/<x>/<y>.json    元数据（hash、ETag、Last-Modified、过期时间）
+
+    总大小按唯一内容计算，超过 max_bytes 时淘汰最久未使用的瓦片。
+    访问时间以 ACCESS_WRITE_INTERVAL 为粒度写回元数据，重启后仍按最近使用排序
+    """
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._lru: "OrderedDict[TileKey, dict]" = OrderedDict()
+        self._refcount: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._load_index()
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / digest
+
+    def _meta_path(self, key: TileKey) -> Path:
+        provider, z, x, y = key
+        return self.root / "tiles" / provider / str(z) / str(x) / f"{y}.json"
+
+    def _load_index(self):
+        """启动时扫描元数据，按访问时间重建 LRU 顺序"""
+        tiles_dir = self.root / "tiles"
+        if not tiles_dir.exists():
+            return
+        entries = []
+        for meta_path in tiles_dir.glob("*/*/*/*.json"):
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if not self._object_path(meta['hash']).exists():
+                continue
+            provider, z, x = meta_path.parts[-4:-1]
+            entries.append(((provider, int(z), int(x), int(meta_path.stem)), meta))
+        for key, meta in sorted(entries, key=lambda item: item[1].get('accessed', 0)):
+            self._lru[key] = meta
+            self._add_ref(meta['hash'], meta['size'])
+        self._evict()
+
+    def _add_ref(self, digest: str, size: int):
+        count = self._refcount.get(digest, 0)
+        if count == 0:
+            self.total_bytes += size
+        self._refcount[digest] = count + 1
+
+    def _drop_ref(self, digest: str, size: int):
+        count = self._refcount.get(digest, 0) - 1
+        if count <= 0:
+            self._refcount.pop(digest, None)
+            self.total_bytes -= size
+            try:
+                self._object_path(digest).unlink()
+            except FileNotFoundError:
+                pass
+        else:
+            self._refcount[digest] = count
+
+    def _write_meta(self, key: TileKey, meta: dict):
+        path = self._meta_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, path)
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self._lru:
+            key, meta = self._lru.popitem(last=False)
+            try:
+                self._meta_path(key).unlink()
+            except FileNotFoundError:
+                pass
+            self._drop_ref(meta['hash'], meta['size'])
+
+    def lookup(self, key: TileKey) -> Optional[dict]:
+        """返回瓦片元数据并标记为最近使用，未缓存时返回 None"""
+        with self._lock:
+            meta = self._lru.get(key)
+            if meta is not None:
+                self._lru.move_to_end(key)
+                now = time.time()
+                if now - meta.get('accessed', 0) >= ACCESS_WRITE_INTERVAL:
+                    meta['accessed'] = now
+                    try:
+                        self._write_meta(key, meta)
+                    except OSError:
+                        pass  # 只影响重启后的淘汰顺序
+            return meta
+
+    def read(self, meta: dict) -> bytes:
+        """读取瓦片内容；瓦片在 lookup 之后被淘汰时抛出 FileNotFoundError"""
+        with open(self._object_path(meta['hash']), 'rb') as f:
+            return f.read()
+
+    def put(self, key: TileKey, content: bytes, etag: Optional[str] = None,
+            last_modified: Optional[str] = None, max_age: float = DEFAULT_MAX_AGE) -> dict:
+        """写入瓦片内容及其验证信息"""
+        digest = hashlib.sha256(content).hexdigest()
+        object_path = self._object_path(digest)
+        if not object_path.exists():
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = object_path.with_name(f"{digest}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, object_path)
+
+        now = time.time()
+        meta = {"hash": digest, "size": len(content), "etag": etag,
+                "last_modified": last_modified, "expires": now + max_age, "accessed": now}
+        with self._lock:
+            old = self._lru.pop(key, None)
+            self._lru[key] = meta
+            self._add_ref(digest, len(content))
+            if old is not None:
+                self._drop_ref(old['hash'], old['size'])
+            self._write_meta(key, meta)
+            self._evict()
+        return meta
+
+    def refresh(self, key: TileKey, max_age: float = DEFAULT_MAX_AGE) -> Optional[dict]:
+        """重新验证成功（304）后延长瓦片的有效期"""
+        with self._lock:
+            meta = self._lru.get(key)
+            if meta is None:
+                return None
+            meta['expires'] = time.time() + max_age
+            self._write_meta(key, meta)
+            return meta
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+
+# ============================================================
+# 瓦片获取
+# ============================================================
+
+def _parse_max_age(cache_control: Optional[str]) -> Optional[int]:
+    match = re.search(r'max-age=(\d+)', cache_control or '')
+    return int(match.group(1)) if match else None
+
+
+class TileFetcher:
+    """
+    带缓存的瓦片获取器
+
+    新鲜的缓存命中不产生任何上游请求；过期瓦片先做条件请求，
+    上游返回 304 时直接续期缓存内容
+    """
+    def __init__(self, cache: TileCache, providers: Dict[str, dict],
+                 api_keys: Optional[Dict[str, str]] = None,
+                 rate_limits: Optional[Dict[str, float]] = None,
+                 max_age: float = DEFAULT_MAX_AGE, timeout: float = 10.0):
+        self.cache = cache
+        self.providers = providers
+        self.api_keys = api_keys or {}
+        self.max_age = max_age
+        self.timeout = timeout
+        rate_limits = rate_limits or {}
+        self._buckets = {name: TokenBucket(rate_limits.get(name, DEFAULT_RATE_LIMIT))
+                         for name in providers}
+        self._lock = threading.Lock()
+        self.upstream_calls = 0
+
+    def tile_url(self, provider: str, z: int, x: int, y: int) -> str:
+        """按目录中的 tile_url 模板生成瓦片地址"""
+        try:
+            template = self.providers[provider]['tile_url']
+        except KeyError:
+            raise TileFetchError(f"未配置瓦片地址的提供商: {provider}")
+        return template.format(z=z, x=x, y=y, api_key=self.api_keys.get(provider, ''))
+
+    def get_tile(self, provider: str, z: int, x: int, y: int) -> bytes:
+        """获取单个瓦片，优先使用缓存"""
+        key = (provider_slug(provider), z, x, y)
+        meta = self.cache.lookup(key)
+        if meta is not None and meta['expires'] > time.time():
+            content = self._read_cached(meta)
+            if content is not None:
+                return content
+            meta = None  # 查找之后被其他线程淘汰，重新完整请求
+        content = self._request(provider, key, meta)
+        if content is None:
+            # 304，但缓存内容已被淘汰
+            content = self._request(provider, key, None)
+        return content
+
+    def _read_cached(self, meta: dict) -> Optional[bytes]:
+        try:
+            return self.cache.read(meta)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            raise TileFetchError(f"瓦片缓存读取失败: {e}")
+
+    def _request(self, provider: str, key: TileKey, meta: Optional[dict]) -> Optional[bytes]:
+        """请求上游并写入缓存；有 meta 时做条件请求，304 且缓存内容已不在时返回 None"""
+        _, z, x, y = key
+        url = self.tile_url(provider, z, x, y)
+        headers = {"User-Agent": USER_AGENT}
+        if meta is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        self._buckets[provider].acquire()
+        with self._lock:
+            self.upstream_calls += 1
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                content = response.read()
+                response_headers = response.headers
+        except urllib.error.HTTPError as e:
+            e.close()
+            if e.code == 304 and meta is not None:
+                max_age = _parse_max_age(e.headers.get('Cache-Control')) or self.max_age
+                try:
+                    meta = self.cache.refresh(key, max_age)
+                except OSError as error:
+                    raise TileFetchError(f"瓦片缓存写入失败: {error}")
+                return None if meta is None else self._read_cached(meta)
+            raise TileFetchError(f"瓦片请求失败 ({e.code}): {url}")
+        except (urllib.error.URLError, OSError) as e:
+            raise TileFetchError(f"瓦片请求失败: {url} ({e})")
+
+        max_age = _parse_max_age(response_headers.get('Cache-Control'))
+        try:
+            self.cache.put(key, content,
+                           etag=response_headers.get('ETag'),
+                           last_modified=response_headers.get('Last-Modified'),
+                           max_age=self.max_age if max_age is None else max_age)
+        except OSError as e:
+            raise TileFetchError(f"瓦片缓存写入失败: {e}")
+        return content
+
+    def prefetch(self, provider: str, bbox: Tuple[float, float, float, float],
+                 zooms, concurrency: int = 4) -> dict:
+        """
+        并发预取经纬度范围内的全部瓦片
+
+        Args:
+            provider: 提供商名称
+            bbox: (min_lon, min_lat, max_lon, max_lat)
+            zooms: 缩放级别的可迭代对象
+            concurrency: 最大并发数（实际上游速率仍受该提供商的限速约束）
+
+        Returns:
+            {"tiles": 瓦片数, "failed": 失败数, "upstream_calls": 上游请求数}
+        """
+        calls_before = self.upstream_calls
+
+        def _fetch(tile):
+            try:
+                self.get_tile(provider, *tile)
+                return True
+            except TileFetchError:
+                return False
+
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            outcomes = list(pool.map(_fetch, tiles_in_bbox(*bbox, zooms)))
+        return {"tiles": len(outcomes), "failed": outcomes.count(False),
+                "upstream_calls": self.upstream_calls - calls_before}
+
+
+# ============================================================
+# 入口点
+# ============================================================
+
+def main(argv=None) -> int:
+    try:
+        from utils.search_apis import load_all_apis
+    except ImportError:  # 作为脚本直接运行
+        from search_apis import load_all_apis
+
+    parser = argparse.ArgumentParser(description="预取地图瓦片到本地缓存")
+    parser.add_argument("provider", help="提供商名称，如 'OpenStreetMap Tiles'")
+    parser.add_argument("--bbox", required=True,
+                        help="经纬度范围: min_lon,min_lat,max_lon,max_lat")
+    parser.add_argument("--zoom", default="0-3", help="缩放级别范围，如 10-14")
+    parser.add_argument("--api-key", default="", help="提供商的API密钥")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE_LIMIT, help="每秒请求数上限")
+    parser.add_argument("--concurrency", type=int, default=4, help="最大并发数")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="缓存目录")
+    parser.add_argument("--max-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="缓存大小上限（MB）")
+    args = parser.parse_args(argv)
+
+    bbox = tuple(float(v) for v in args.bbox.split(','))
+    low, _, high = args.zoom.partition('-')
+    zooms = range(int(low), int(high or low) + 1)
+
+    providers = load_tile_providers(load_all_apis())
+    if args.provider not in providers:
+        print(f"未配置瓦片地址的提供商: {args.provider}")
+        print(f"可用提供商: {', '.join(sorted(providers))}")
+        return 1
+
+    fetcher = TileFetcher(TileCache(args.cache_dir, args.max_mb * 1024 * 1024), providers,
+                          api_keys={args.provider: args.api_key},
+                          rate_limits={args.provider: args.rate})
+    stats = fetcher.prefetch(args.provider, bbox, zooms, concurrency=args.concurrency)
+    print(f"瓦片 {stats['tiles']} 个, 上游请求 {stats['upstream_calls']} 次, "
+          f"失败 {stats['failed']} 个")
+    return 0 if stats['failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,6 +10,11 @@ import sys
 from pathlib import Path
 from typing import Tuple, Optional
 
+try:
+    from utils.overlay import Roots, as_roots, load_overlay, roots_from_env
+except ImportError:  # 作为脚本直接运行
+    from overlay import Roots, as_roots, load_overlay, roots_from_env
+
 
 # ============================================================
 # 编码兼容层
@@ -156,8 +161,17 @@ def validate_api_entry(api_entry: dict) -> Tuple[bool, str]:
     url = api_entry['url'].strip()
     if not url.startswith(('http://', 'https://')):
         return False, f"url 字段格式无效: 必须以 'http://' 或 'https://' 开头"
-    
-    # 10. 可选：验证URL可访问性（基础检查）
+
+    # 10. 验证可选字段 - tile_url（瓦片地址模板）
+    if 'tile_url' in api_entry:
+        tile_url = api_entry['tile_url']
+        if not isinstance(tile_url, str) or not tile_url.startswith(('http://', 'https://')):
+            return False, "tile_url 字段格式无效: 必须是以 'http://' 或 'https://' 开头的字符串"
+        missing = [p for p in ('{z}', '{x}', '{y}') if p not in tile_url]
+        if missing:
+            return False, f"tile_url 字段缺少占位符: {', '.join(missing)}"
+
+    # 11. 可选：验证URL可访问性（基础检查）
     # 注意：此检查可能较慢，默认不启用
     # if not _is_url_accessible(url):
     #     return False, f"url 可能不可访问: {url}"
@@ -244,32 +258,33 @@ def validate_api_file(file_path: Path) -> Tuple[bool, str]:
     return True, f"{file_path} 验证通过，共 {len(data)} 个API条目"
 
 
-def validate_all_api_files(api_dir: str = "api") -> bool:
+def validate_all_api_files(api_dir: Roots = "api") -> bool:
     """
     验证所有API数据文件
     
     Args:
-        api_dir: API目录路径
+        api_dir: API目录路径，或按优先级从低到高排列的多个叠加目录
         
     Returns:
         所有文件是否有效
     """
-    api_path = Path(api_dir)
+    roots = as_roots(api_dir)
     
     # 1. 检查目录存在性
-    if not api_path.exists():
-        safe_print(f"[ERROR] API目录不存在: {api_path}")
-        return False
-    
-    if not api_path.is_dir():
-        safe_print(f"[ERROR] 路径不是目录: {api_path}")
-        return False
+    for api_path in roots:
+        if not api_path.exists():
+            safe_print(f"[ERROR] API目录不存在: {api_path}")
+            return False
+        
+        if not api_path.is_dir():
+            safe_print(f"[ERROR] 路径不是目录: {api_path}")
+            return False
     
     # 2. 查找所有JSON文件
-    all_files = list(api_path.rglob("*.json"))
+    all_files = [path for api_path in roots for path in sorted(api_path.rglob("*.json"))]
     
     if not all_files:
-        safe_print(f"[WARN] 未找到任何JSON文件在: {api_path}")
+        safe_print(f"[WARN] 未找到任何JSON文件在: {', '.join(map(str, roots))}")
         return False
     
     safe_print(f"[INFO] 找到 {len(all_files)} 个API数据文件")
@@ -280,7 +295,7 @@ def validate_all_api_files(api_dir: str = "api") -> bool:
     valid_count = 0
     invalid_count = 0
     
-    for file_path in sorted(all_files):
+    for file_path in all_files:
         is_valid, message = validate_api_file(file_path)
         if is_valid:
             safe_print(f"[PASS] {message}")
@@ -290,7 +305,14 @@ def validate_all_api_files(api_dir: str = "api") -> bool:
             invalid_count += 1
             all_valid = False
     
-    # 4. 输出汇总
+    # 4. 报告叠加目录之间的覆盖关系
+    if all_valid and len(roots) > 1:
+        _, shadowed = load_overlay(roots)
+        for item in shadowed:
+            safe_print(f"[INFO] {item.winner['source_file']} 中的 {item.winner['name']} "
+                       f"覆盖了 {item.entry['source_file']}")
+    
+    # 5. 输出汇总
     safe_print("-" * 60)
     safe_print(f"[SUMMARY] 验证完成: {valid_count} 成功, {invalid_count} 失败")
     
@@ -349,8 +371,8 @@ if __name__ == "__main__":
     safe_print("=" * 60)
     safe_print()
     
-    # 执行验证
-    success = validate_all_api_files()
+    # 执行验证（ST_API_ROOTS 可指定叠加的私有目录）
+    success = validate_all_api_files(roots_from_env())
     
     # 输出结果
     safe_print()
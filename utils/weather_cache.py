@@ -0,0 +1,252 @@
+"""
+天气请求缓存工具
+
+为 Weather APIs 分类中的提供商提供带缓存的获取层：
+- 坐标按可配置精度吸附到 geohash 网格，时间吸附到预报时段
+- 响应按提供商设置不同的缓存有效期（TTL）
+- 并发的相同请求合并为一次上游调用
+"""
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+DEFAULT_PRECISION = 5          # 约 4.9km x 4.9km
+DEFAULT_BUCKET_SECONDS = 3600  # 按小时分段
+DEFAULT_TTL = 600
+
+# 各提供商的缓存有效期（秒），与其数据更新频率大致对应
+PROVIDER_TTLS = {
+    "OpenWeatherMap": 600,
+    "WeatherAPI": 900,
+    "AccuWeather": 1800,
+    "Tomorrow.io": 300,
+    "Visual Crossing Weather": 3600,
+    "心知天气API": 1200,
+    "彩云天气API": 300,
+    "和风天气API": 600,
+}
+
+# 各提供商的预报请求地址模板，占位符: {lat} {lon} {api_key}
+WEATHER_URL_TEMPLATES = {
+    "OpenWeatherMap": "https://api.openweathermap.org/data/2.5/forecast?lat={lat}&lon={lon}&appid={api_key}",
+    "WeatherAPI": "https://api.weatherapi.com/v1/forecast.json?key={api_key}&q={lat},{lon}",
+    "彩云天气API": "https://api.caiyunapp.com/v2.6/{api_key}/{lon},{lat}/forecast",
+    "和风天气API": "https://devapi.qweather.com/v7/weather/3d?location={lon},{lat}&key={api_key}",
+}
+
+CacheKey = Tuple[str, str, str, int]
+
+
+class WeatherFetchError(Exception):
+    """天气数据获取失败"""
+    pass
+
+
+# ============================================================
+# 空间/时间分段
+# ============================================================
+
+def geohash_encode(lat: float, lon: float, precision: int = DEFAULT_PRECISION) -> str:
+    """
+    计算坐标的 geohash
+
+    Args:
+        lat: 纬度
+        lon: 经度
+        precision: geohash 长度
+
+    Returns:
+        geohash 字符串
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        rng, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+def geohash_center(geohash: str) -> Tuple[float, float]:
+    """
+    返回 geohash 网格的中心坐标
+
+    Returns:
+        (lat, lon)
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = GEOHASH_ALPHABET.index(char)
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
+
+
+def time_bucket(timestamp: float, bucket_seconds: int = DEFAULT_BUCKET_SECONDS) -> int:
+    """返回时间戳所在时段的起始时间"""
+    return int(timestamp // bucket_seconds) * bucket_seconds
+
+
+# ============================================================
+# 请求合并
+# ============================================================
+
+class _InflightCall:
+    """一次进行中的上游调用，后到的相同请求等待它的结果"""
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class WeatherClient:
+    """
+    带分段缓存和请求合并的天气客户端
+
+    fetch(provider, lat, lon, bucket_start, kind) 负责实际的上游请求；
+    传入的坐标是 geohash 网格中心，因此同一网格内的请求完全等价
+    """
+    def __init__(self, fetch: Callable, precision: int = DEFAULT_PRECISION,
+                 bucket_seconds: int = DEFAULT_BUCKET_SECONDS,
+                 ttls: Optional[Dict[str, float]] = None, default_ttl: float = DEFAULT_TTL,
+                 max_entries: int = 10000, clock: Callable[[], float] = time.time):
+        self.fetch = fetch
+        self.precision = precision
+        self.bucket_seconds = bucket_seconds
+        self.ttls = {**PROVIDER_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._cache: "OrderedDict[CacheKey, Tuple[float, object]]" = OrderedDict()
+        self._inflight: Dict[CacheKey, _InflightCall] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "upstream_calls": 0}
+
+    def cache_key(self, provider: str, lat: float, lon: float, kind: str = "forecast",
+                  timestamp: Optional[float] = None) -> CacheKey:
+        """计算请求的缓存键 (提供商, 类型, geohash, 时段起点)"""
+        timestamp = self.clock() if timestamp is None else timestamp
+        return (provider, kind, geohash_encode(lat, lon, self.precision),
+                time_bucket(timestamp, self.bucket_seconds))
+
+    def get(self, provider: str, lat: float, lon: float, kind: str = "forecast",
+            timestamp: Optional[float] = None):
+        """
+        获取天气数据
+
+        Args:
+            provider: 提供商名称
+            lat: 纬度
+            lon: 经度
+            kind: 请求类型，如 forecast / current
+            timestamp: 目标时间，默认为当前时间
+
+        Returns:
+            fetch 返回的响应
+        """
+        key = self.cache_key(provider, lat, lon, kind, timestamp)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] > self.clock():
+                self._cache.move_to_end(key)
+                self.stats["hits"] += 1
+                return cached[1]
+            call = self._inflight.get(key)
+            if call is not None:
+                self.stats["coalesced"] += 1
+                leader = False
+            else:
+                call = self._inflight[key] = _InflightCall()
+                self.stats["misses"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            center_lat, center_lon = geohash_center(key[2])
+            with self._lock:
+                self.stats["upstream_calls"] += 1
+            call.result = self.fetch(provider, center_lat, center_lon, key[3], kind)
+        except BaseException as e:
+            call.error = e
+            raise
+        else:
+            ttl = self.ttls.get(provider, self.default_ttl)
+            with self._lock:
+                self._cache[key] = (self.clock() + ttl, call.result)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+            return call.result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            call.done.set()
+
+
+def make_url_fetcher(api_keys: Dict[str, str],
+                     templates: Optional[Dict[str, str]] = None,
+                     timeout: float = 10.0) -> Callable:
+    """
+    基于地址模板创建上游请求函数
+
+    Args:
+        api_keys: 提供商名称 -> API密钥
+        templates: 提供商名称 -> 地址模板，默认使用 WEATHER_URL_TEMPLATES
+        timeout: 请求超时（秒）
+
+    Returns:
+        可传给 WeatherClient 的 fetch 函数，返回解析后的 JSON
+    """
+    templates = {**WEATHER_URL_TEMPLATES, **(templates or {})}
+
+    def fetch(provider, lat, lon, bucket_start, kind):
+        if provider not in templates:
+            raise WeatherFetchError(f"未配置请求地址的提供商: {provider}")
+        url = templates[provider].format(lat=f"{lat:.5f}", lon=f"{lon:.5f}",
+                                         api_key=api_keys.get(provider, ''))
+        try:
+            with urllib.request.urlopen(url, timeout=timeout) as response:
+                return json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            e.close()
+            raise WeatherFetchError(f"天气请求失败 ({e.code}): {provider}")
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            raise WeatherFetchError(f"天气请求失败: {provider} ({e})")
+
+    return fetch